@@ -0,0 +1,213 @@
+"""Headless batch planning across many business units.
+
+Reads a CSV or Parquet file with one row per business unit and streams the
+per-channel plan for every unit to a CSV or Parquet file, using the same
+planning engine as the app:
+
+    python batch_plan.py units.csv plans.parquet --workers 4
+
+Input columns: ``business_unit``, ``target``, ``reloan``,
+``avg_ticket_size`` (all amounts in ₹ Lakhs) and ``channel_set``. Channel
+sets come from the saved channel store, or from ``--channels FILE`` with a
+``channel_set`` column next to Channel, CPL, Conv % and Budget %.
+
+With ``--from-budget`` a ``budget`` column (marketing spend, ₹ Lakhs)
+replaces ``target`` and each unit is planned for the disbursement its budget
+can buy with the set's current splits.
+"""
+import argparse
+import os
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import channel_store
+import planning
+
+UNIT_COLUMNS = ['business_unit', 'target', 'reloan', 'avg_ticket_size', 'channel_set']
+BUDGET_UNIT_COLUMNS = ['business_unit', 'budget', 'reloan', 'avg_ticket_size', 'channel_set']
+OUTPUT_COLUMNS = ['Business Unit', 'Channel Set'] + planning.RESULT_COLUMNS
+
+# Channel set name -> (names, cpl, conv, split, curves); set per worker process
+_CHANNEL_SETS = {}
+
+
+def file_format(path):
+    """'csv' or 'parquet' from a file extension"""
+    return 'parquet' if path.lower().endswith(('.parquet', '.pq')) else 'csv'
+
+
+def read_units(path, chunk_size, columns=UNIT_COLUMNS):
+    """Yield business unit rows in chunks so the input never has to fit in memory"""
+    if file_format(path) == 'parquet':
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size, columns=columns):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, usecols=columns, chunksize=chunk_size)
+
+
+def load_channel_sets(names, channels_path=None, store_path=channel_store.DEFAULT_PATH):
+    """Channel arrays for every requested set, from a channels file or the channel store"""
+    if channels_path:
+        reader = pd.read_parquet if file_format(channels_path) == 'parquet' else pd.read_csv
+        channels_df = reader(channels_path)
+        sets = {
+            str(name): channel_store.frame_to_channels(group)
+            for name, group in channels_df.groupby('channel_set', sort=False)
+        }
+    else:
+        sets = {name: channel_store.load_set(name, store_path) for name in names}
+
+    missing = sorted(name for name in names if not sets.get(name))
+    if missing:
+        raise ValueError(f"Unknown or empty channel sets: {', '.join(missing)}")
+    return {name: planning.channel_arrays(sets[name]) + (planning.curve_arrays(sets[name]),) for name in names}
+
+
+def _init_worker(channel_sets):
+    """Give a worker process the channel arrays once instead of per chunk"""
+    _CHANNEL_SETS.update(channel_sets)
+
+
+def plan_chunk(units):
+    """Per-channel plans for a chunk of business units, one engine pass per channel set"""
+    frames, positions = [], []
+    for set_name, group in units.groupby('channel_set', sort=False):
+        names, cpl, conv, split, curves = _CHANNEL_SETS[set_name]
+        count, width = len(group), len(names)
+        tickets = group['avg_ticket_size'].to_numpy(dtype=float)
+        reloans = group['reloan'].to_numpy(dtype=float)
+        if 'budget' in group:
+            targets = reloans + planning.target_for_budget(
+                group['budget'].to_numpy(dtype=float), cpl, conv, split, tickets, curves
+            )
+        else:
+            targets = group['target'].to_numpy(dtype=float)
+        if curves is not None:
+            curves = (np.tile(curves[0], count), np.tile(curves[1], (1, count)))
+
+        # Tile the channels once per unit and repeat the unit inputs per channel
+        columns = planning.compute_plan(
+            np.tile(cpl, count),
+            np.tile(conv, count),
+            np.tile(split, count),
+            np.repeat(targets, width),
+            np.repeat(reloans, width),
+            np.repeat(tickets, width),
+            curves
+        )
+        columns['Business Unit'] = np.repeat(group['business_unit'].astype(str).to_numpy(), width)
+        columns['Channel Set'] = set_name
+        columns['Channel'] = np.tile(np.asarray(names, dtype=object), count)
+        frames.append(pd.DataFrame(columns, columns=OUTPUT_COLUMNS))
+        positions.append(np.repeat(group.index.to_numpy(), width))
+
+    if not frames:
+        return pd.DataFrame(columns=OUTPUT_COLUMNS)
+    # Restore input unit order across channel sets
+    order = np.argsort(np.concatenate(positions), kind='stable')
+    return pd.concat(frames, ignore_index=True).take(order).reset_index(drop=True)
+
+
+class ResultWriter:
+    """Append result chunks to a CSV or Parquet file without holding them in memory"""
+
+    def __init__(self, path):
+        self.path = path
+        self.format = file_format(path)
+        self.rows = 0
+        self._parquet = None
+
+    def write(self, df):
+        if self.format == 'parquet':
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if self._parquet is None:
+                self._parquet = pq.ParquetWriter(self.path, table.schema)
+            self._parquet.write_table(table)
+        else:
+            df.to_csv(self.path, mode='w' if self.rows == 0 else 'a', header=self.rows == 0, index=False)
+        self.rows += len(df)
+
+    def close(self):
+        if self._parquet is not None:
+            self._parquet.close()
+        elif self.rows == 0 and self.format == 'csv':
+            pd.DataFrame(columns=OUTPUT_COLUMNS).to_csv(self.path, index=False)
+
+
+def _ordered_map(func, chunks, workers, initargs):
+    """Map over chunks in order, in a process pool with a bounded number of chunks in flight"""
+    if workers <= 1:
+        _init_worker(*initargs)
+        for chunk in chunks:
+            yield func(chunk)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=initargs) as pool:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(pool.submit(func, chunk))
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def run(units_path, output_path, channels_path=None, store_path=channel_store.DEFAULT_PATH,
+        chunk_size=1000, workers=1, from_budget=False):
+    """Plan every business unit in ``units_path`` and stream the results to ``output_path``"""
+    # Channel set names are needed up front; this reads only that column
+    if file_format(units_path) == 'parquet':
+        set_names = pd.read_parquet(units_path, columns=['channel_set'])['channel_set']
+    else:
+        set_names = pd.read_csv(units_path, usecols=['channel_set'])['channel_set']
+    channel_sets = load_channel_sets(set_names.astype(str).unique().tolist(), channels_path, store_path)
+
+    def chunks():
+        offset = 0
+        for units in read_units(units_path, chunk_size, BUDGET_UNIT_COLUMNS if from_budget else UNIT_COLUMNS):
+            units = units.astype({'channel_set': str})
+            units.index = pd.RangeIndex(offset, offset + len(units))
+            offset += len(units)
+            yield units
+
+    writer = ResultWriter(output_path)
+    try:
+        for result in _ordered_map(plan_chunk, chunks(), workers, (channel_sets,)):
+            writer.write(result)
+    finally:
+        writer.close()
+    return writer.rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compute marketing plans for many business units.")
+    parser.add_argument('units', help="CSV or Parquet file with one row per business unit")
+    parser.add_argument('output', help="CSV or Parquet file for the per-channel results")
+    parser.add_argument('--channels', help="CSV or Parquet file of channel sets (default: the channel store)")
+    parser.add_argument('--store', default=channel_store.DEFAULT_PATH, help="Channel store path")
+    parser.add_argument('--chunk-size', type=int, default=1000, help="Business units per chunk")
+    parser.add_argument('--workers', type=int, default=1, help="Worker processes (1 runs in-process)")
+    parser.add_argument('--from-budget', action='store_true',
+                        help="Plan from a budget column (marketing spend, ₹ Lakhs) instead of target")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.units):
+        parser.error(f"{args.units} does not exist")
+    try:
+        rows = run(args.units, args.output, args.channels, args.store, args.chunk_size, args.workers, args.from_budget)
+    except ValueError as e:
+        sys.exit(f"error: {e}")
+    print(f"Wrote {rows} channel rows to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+"""Cold start benchmark for the marketing.py page.
+
+Each sample is a fresh Python process that imports Streamlit and runs the
+page once through the app-testing harness, as a container does after
+scaling from zero. Pages are measured with the charts hidden (the default)
+and shown. Reports import time, first-run time, peak RSS and whether
+plotly.express was loaded, and appends JSON lines tagged with the git commit:
+
+    python benchmarks/bench_cold_start.py --samples 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_PATH = os.path.join(ROOT, 'marketing.py')
+DEFAULT_OUTPUT = os.path.join(ROOT, 'benchmarks', 'results', 'cold_start.jsonl')
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def child(show_charts):
+    """One cold page load; prints its measurements as JSON"""
+    import resource
+
+    start = time.perf_counter()
+    sys.path.insert(0, ROOT)
+    from streamlit.testing.v1 import AppTest
+
+    imported = time.perf_counter()
+    at = AppTest.from_file(APP_PATH, default_timeout=600)
+    at.session_state['charts_mode'] = show_charts
+    at.run()
+    finished = time.perf_counter()
+    if at.exception:
+        raise SystemExit(f"marketing.py raised: {at.exception[0].message}")
+
+    print(json.dumps({
+        'import_s': imported - start,
+        'first_run_s': finished - imported,
+        'total_s': finished - start,
+        # ru_maxrss is in KiB on Linux
+        'max_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        'plotly_express_loaded': 'plotly.express' in sys.modules
+    }))
+
+
+def sample(show_charts):
+    output = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--child', 'charts' if show_charts else 'plain'],
+        capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark marketing.py cold start.")
+    parser.add_argument('--samples', type=int, default=5, help="Fresh processes per mode; the median is kept")
+    parser.add_argument('--output', default=DEFAULT_OUTPUT, help="JSON lines file results are appended to")
+    parser.add_argument('--child', choices=['plain', 'charts'], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child == 'charts')
+        return
+
+    run = {'commit': git_commit(), 'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'), 'python': sys.version.split()[0]}
+    os.makedirs(os.path.dirname(args.output), exist_ok=True)
+    print(f"{'charts':>8}{'import':>10}{'first run':>12}{'total':>10}{'max RSS MB':>12}{'plotly.express':>16}")
+    with open(args.output, 'a') as f:
+        for show_charts in (False, True):
+            samples = [sample(show_charts) for _ in range(args.samples)]
+            record = {
+                **run,
+                'charts': show_charts,
+                **{key: statistics.median(s[key] for s in samples) for key in ('import_s', 'first_run_s', 'total_s', 'max_rss_mb')},
+                'plotly_express_loaded': samples[-1]['plotly_express_loaded']
+            }
+            f.write(json.dumps(record) + '\n')
+            print(
+                f"{'shown' if show_charts else 'hidden':>8}{record['import_s']:>10.3f}{record['first_run_s']:>12.3f}"
+                f"{record['total_s']:>10.3f}{record['max_rss_mb']:>12.1f}{str(record['plotly_express_loaded']):>16}"
+            )
+
+
+if __name__ == '__main__':
+    main()
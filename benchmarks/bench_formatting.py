@@ -0,0 +1,43 @@
+"""Benchmark column-level Indian number formatting against the per-cell function.
+
+Run from the repository root:
+
+    python benchmarks/bench_formatting.py --rows 100000
+"""
+import argparse
+import os
+import sys
+import timeit
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from formatting import format_indian_array, format_indian_number  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100000, help="Values per column")
+    parser.add_argument('--repeat', type=int, default=5, help="Timing repeats; the best is reported")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    columns = {
+        'int (leads)': rng.integers(0, 10 ** 9, args.rows),
+        'float (spend)': rng.uniform(0, 10 ** 9, args.rows)
+    }
+
+    print(f"{'column':<16}{'per-cell (s)':>14}{'vectorized (s)':>16}{'speed-up':>10}")
+    for name, values in columns.items():
+        expected = [format_indian_number(v) for v in values]
+        if list(format_indian_array(values)) != expected:
+            sys.exit(f"{name}: vectorized output differs from format_indian_number")
+
+        per_cell = min(timeit.repeat(lambda: [format_indian_number(v) for v in values], number=1, repeat=args.repeat))
+        vectorized = min(timeit.repeat(lambda: format_indian_array(values), number=1, repeat=args.repeat))
+        print(f"{name:<16}{per_cell:>14.4f}{vectorized:>16.4f}{per_cell / vectorized:>9.1f}x")
+
+
+if __name__ == '__main__':
+    main()
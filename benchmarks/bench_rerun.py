@@ -0,0 +1,173 @@
+"""Rerun latency benchmark for the marketing.py page.
+
+Drives the page headlessly through Streamlit's app-testing harness with
+several channel counts and times the pieces a rerun is made of. Each run
+appends one JSON line per channel count to the results file, tagged with
+the git commit, so runs can be compared across commits:
+
+    python benchmarks/bench_rerun.py
+    python benchmarks/bench_rerun.py --channels 5 50 --compare
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import timeit
+import tracemalloc
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import streamlit as st  # noqa: E402
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+import charts  # noqa: E402
+import planning  # noqa: E402
+import summary_table  # noqa: E402
+
+APP_PATH = os.path.join(ROOT, 'marketing.py')
+DEFAULT_OUTPUT = os.path.join(ROOT, 'benchmarks', 'results', 'rerun.jsonl')
+
+
+def make_channels(count, seed=0):
+    """Synthetic channel config with a budget split adding up to 100%"""
+    rng = np.random.default_rng(seed)
+    split = rng.dirichlet(np.ones(count)) * 100
+    split[-1] = 100 - split[:-1].sum()
+    return [
+        {
+            'name': f'Channel {i + 1}',
+            'cpl': float(rng.choice([50.0, 100.0, 200.0])),
+            'conv': float(rng.choice([2.0, 4.8, 9.6])),
+            'budget': float(split[i])
+        }
+        for i in range(count)
+    ]
+
+
+def best_of(func, repeat):
+    """Best wall time of ``func`` in seconds"""
+    return min(timeit.repeat(func, number=1, repeat=repeat))
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def bench_sections(channels, repeat):
+    """Time the calculation, table rendering and figure construction outside the page"""
+    results_df = planning.plan_results(channels, 250.0, 150.0, 0.25)
+
+    def render_table():
+        detailed_df = summary_table.summary_frame(results_df)
+        footer = summary_table.footer_strings(summary_table.summary_totals(detailed_df))
+        summary_table.summary_html(summary_table.display_strings(detailed_df), footer, 0, summary_table.PAGE_SIZE)
+
+    def build_figures():
+        for build in charts.FIGURES.values():
+            build(results_df).to_json()
+
+    return {
+        'calculation_s': best_of(lambda: planning.plan_results(channels, 250.0, 150.0, 0.25), repeat),
+        'table_s': best_of(render_table, repeat),
+        'figures_s': best_of(build_figures, repeat)
+    }
+
+
+def bench_page(channels, repeat):
+    """Wall time of a cold run and of a rerun after a sidebar edit, plus peak traced memory"""
+    at = AppTest.from_file(APP_PATH, default_timeout=600)
+    at.session_state['channels'] = channels
+    # Time the full page, charts included
+    at.session_state['charts_mode'] = True
+
+    st.cache_data.clear()
+    tracemalloc.start()
+    start = time.perf_counter()
+    at.run()
+    cold = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    if at.exception:
+        raise RuntimeError(f"marketing.py raised: {at.exception[0].message}")
+
+    # Each edit is a new target, so the rerun misses the plan cache like a real keystroke
+    edits = []
+    for i in range(repeat):
+        at.sidebar.number_input[0].set_value(250.0 + 10 * (i + 1))
+        start = time.perf_counter()
+        at.run()
+        edits.append(time.perf_counter() - start)
+
+    return {'cold_run_s': cold, 'edit_rerun_s': min(edits), 'peak_memory_mb': peak / 2 ** 20}
+
+
+def compare(records, commit):
+    """Print this commit's results next to the most recent other commit's"""
+    current = {r['channels']: r for r in records if r['commit'] == commit}
+    previous = {}
+    for r in records:
+        if r['commit'] != commit:
+            previous[r['channels']] = r
+    if not previous:
+        print("No earlier commit to compare against")
+        return
+
+    metrics = ['edit_rerun_s', 'calculation_s', 'table_s', 'figures_s', 'peak_memory_mb']
+    print(f"{'channels':>8}  " + ''.join(f"{m:>22}" for m in metrics))
+    for count in sorted(current):
+        if count not in previous:
+            continue
+        cells = []
+        for m in metrics:
+            before, after = previous[count][m], current[count][m]
+            change = (after - before) / before * 100 if before else 0.0
+            cells.append(f"{after:>12.4f} ({change:+6.1f}%)")
+        print(f"{count:>8}  " + ''.join(f"{c:>22}" for c in cells))
+    print(f"(compared with commit {next(iter(previous.values()))['commit']})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark marketing.py rerun latency.")
+    parser.add_argument('--channels', type=int, nargs='+', default=[5, 50, 500, 2000], help="Channel counts to run")
+    parser.add_argument('--repeat', type=int, default=3, help="Repeats per timing; the best is kept")
+    parser.add_argument('--output', default=DEFAULT_OUTPUT, help="JSON lines file results are appended to")
+    parser.add_argument('--compare', action='store_true', help="Compare with the previous commit in the output file")
+    args = parser.parse_args()
+
+    commit = git_commit()
+    run = {
+        'commit': commit,
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'streamlit': st.__version__
+    }
+
+    os.makedirs(os.path.dirname(args.output), exist_ok=True)
+    print(f"{'channels':>8}{'cold run':>12}{'edit rerun':>12}{'calc':>10}{'table':>10}{'figures':>10}{'peak MB':>10}")
+    with open(args.output, 'a') as f:
+        for count in args.channels:
+            channels = make_channels(count)
+            record = {**run, 'channels': count, **bench_page(channels, args.repeat), **bench_sections(channels, args.repeat)}
+            f.write(json.dumps(record) + '\n')
+            print(
+                f"{count:>8}{record['cold_run_s']:>12.3f}{record['edit_rerun_s']:>12.3f}"
+                f"{record['calculation_s']:>10.4f}{record['table_s']:>10.4f}{record['figures_s']:>10.4f}"
+                f"{record['peak_memory_mb']:>10.1f}"
+            )
+
+    if args.compare:
+        with open(args.output) as f:
+            compare([json.loads(line) for line in f if line.strip()], commit)
+
+
+if __name__ == '__main__':
+    main()
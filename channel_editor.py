@@ -0,0 +1,155 @@
+"""Grid-based bulk editor for the channel configuration.
+
+Edits are collected by one ``st.data_editor`` inside a fragment, so typing
+in the grid only reruns the fragment. Applying them patches
+``st.session_state.channels`` from the editor's row diff and reruns the page
+once.
+"""
+import csv
+import io
+
+import pandas as pd
+import streamlit as st
+
+# Grid column -> channel dict key
+EDITOR_COLUMNS = {
+    'Channel': 'name',
+    'CPL': 'cpl',
+    'Conv %': 'conv',
+    'Budget %': 'budget'
+}
+
+NEW_CHANNEL = {'cpl': 100.0, 'conv': 2.0, 'budget': 0.0}
+
+
+def channels_frame(channels):
+    """Channel dicts as an editor grid"""
+    return pd.DataFrame(
+        {column: [ch[key] for ch in channels] for column, key in EDITOR_COLUMNS.items()},
+        columns=list(EDITOR_COLUMNS)
+    ).astype({'CPL': float, 'Conv %': float, 'Budget %': float})
+
+
+def _row_to_channel(row, base, position):
+    """Merge grid values into a channel dict, filling blanks from ``base``"""
+    channel = dict(base)
+    for column, key in EDITOR_COLUMNS.items():
+        value = row.get(column)
+        if value is None or (not isinstance(value, str) and pd.isna(value)):
+            continue
+        channel[key] = str(value) if key == 'name' else float(value)
+    channel.setdefault('name', f'Channel {position + 1}')
+    return channel
+
+
+def apply_diff(channels, diff):
+    """Apply a data_editor diff, touching only edited, added and deleted rows.
+
+    ``diff`` is the editor's widget state: ``edited_rows`` maps row
+    positions to changed cells, ``deleted_rows`` lists positions and
+    ``added_rows`` lists new rows. Unchanged channel dicts are reused as is,
+    so extra keys such as optimizer constraints survive.
+    """
+    updated = list(channels)
+    for position, changes in diff.get('edited_rows', {}).items():
+        position = int(position)
+        updated[position] = _row_to_channel(changes, updated[position], position)
+
+    deleted = {int(position) for position in diff.get('deleted_rows', [])}
+    if deleted:
+        updated = [ch for position, ch in enumerate(updated) if position not in deleted]
+
+    for row in diff.get('added_rows', []):
+        updated.append(_row_to_channel(row, NEW_CHANNEL, len(updated)))
+    return updated
+
+
+def parse_pasted(text):
+    """Parse rows copied from a spreadsheet (tab or comma separated, header optional)"""
+    text = text.strip()
+    if not text:
+        return []
+    delimiter = '\t' if '\t' in text else ','
+    rows = [row for row in csv.reader(io.StringIO(text), delimiter=delimiter) if any(cell.strip() for cell in row)]
+    if rows and rows[0] and rows[0][0].strip() in EDITOR_COLUMNS:
+        rows = rows[1:]
+
+    channels = []
+    for line, row in enumerate(rows, start=1):
+        if len(row) < len(EDITOR_COLUMNS):
+            raise ValueError(f"Row {line} has {len(row)} columns; expected Channel, CPL, Conv %, Budget %")
+        name, cpl, conv, budget = (cell.strip() for cell in row[:len(EDITOR_COLUMNS)])
+        try:
+            channels.append({
+                'name': name,
+                'cpl': float(cpl.replace(',', '').lstrip('₹')),
+                'conv': float(conv.rstrip('%')),
+                'budget': float(budget.rstrip('%'))
+            })
+        except ValueError:
+            raise ValueError(f"Row {line} has a non-numeric CPL, Conv % or Budget %")
+    return channels
+
+
+def _pending_changes(diff):
+    """Number of rows touched by a data_editor diff"""
+    return len(diff.get('edited_rows', {})) + len(diff.get('added_rows', [])) + len(diff.get('deleted_rows', []))
+
+
+def reset_editor():
+    """Start the grid afresh from st.session_state.channels"""
+    st.session_state.channel_editor_version = st.session_state.get('channel_editor_version', 0) + 1
+
+
+@st.fragment
+def bulk_editor():
+    """Channel grid with paste-from-spreadsheet; only this fragment reruns while editing"""
+    editor_key = f"channel_editor_{st.session_state.get('channel_editor_version', 0)}"
+    st.data_editor(
+        channels_frame(st.session_state.channels),
+        num_rows="dynamic",
+        hide_index=True,
+        use_container_width=True,
+        key=editor_key,
+        column_config={
+            'Channel': st.column_config.TextColumn("Channel", required=True),
+            'CPL': st.column_config.NumberColumn("CPL", min_value=0.0, max_value=10000000.0, step=0.1),
+            'Conv %': st.column_config.NumberColumn("Conv %", min_value=0.1, max_value=100.0, step=0.1),
+            'Budget %': st.column_config.NumberColumn("Budget %", min_value=0.0, max_value=100.0, step=1.0)
+        }
+    )
+    st.caption("Select rows and press Delete to remove several channels at once")
+
+    diff = st.session_state.get(editor_key, {})
+    pending = _pending_changes(diff)
+
+    col1, col2 = st.columns(2)
+    with col1:
+        if st.button(f"✅ Apply ({pending})", disabled=not pending, use_container_width=True, key="channel_editor_apply"):
+            st.session_state.channels = apply_diff(st.session_state.channels, diff)
+            reset_editor()
+            st.rerun()
+    with col2:
+        if st.button("↩️ Discard", disabled=not pending, use_container_width=True, key="channel_editor_discard"):
+            reset_editor()
+            st.rerun(scope="fragment")
+
+    with st.expander("📋 Paste from Spreadsheet"):
+        pasted = st.text_area(
+            "Rows: Channel, CPL, Conv %, Budget %",
+            key="channel_editor_paste",
+            help="Copy cells from Excel or Google Sheets and paste them here"
+        )
+        replace = st.checkbox("Replace all channels", key="channel_editor_paste_replace")
+        if st.button("Import Pasted Rows", use_container_width=True, key="channel_editor_paste_import"):
+            try:
+                pasted_channels = parse_pasted(pasted)
+            except ValueError as e:
+                st.error(f"⚠️ {e}")
+            else:
+                if replace:
+                    st.session_state.channels = pasted_channels
+                else:
+                    st.session_state.channels = st.session_state.channels + pasted_channels
+                reset_editor()
+                st.rerun()
@@ -0,0 +1,160 @@
+"""Persistent store for named channel sets.
+
+Channel sets live in a local SQLite file, one row per channel. The
+(set_name, position) primary key doubles as the index for loading a set.
+Bulk import and export go through pandas so CSV and Parquet files
+round-trip with the same columns as the channel editor.
+"""
+import io
+import json
+import os
+import sqlite3
+import time
+from contextlib import closing
+
+import pandas as pd
+
+DEFAULT_PATH = os.environ.get(
+    'MARKETING_STORE_PATH',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'channel_store.sqlite3')
+)
+
+# Set loaded automatically when a new session starts
+DEFAULT_SET = 'default'
+
+# File column -> channel dict key
+FILE_COLUMNS = {
+    'Channel': 'name',
+    'CPL': 'cpl',
+    'Conv %': 'conv',
+    'Budget %': 'budget'
+}
+CORE_KEYS = set(FILE_COLUMNS.values())
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS channel_sets (
+    name TEXT PRIMARY KEY,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS channels (
+    set_name TEXT NOT NULL REFERENCES channel_sets(name) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    cpl REAL NOT NULL,
+    conv REAL NOT NULL,
+    budget REAL NOT NULL,
+    extra TEXT,
+    PRIMARY KEY (set_name, position)
+);
+"""
+
+
+def connect(path=DEFAULT_PATH):
+    """Open the store, creating the schema on first use"""
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA foreign_keys = ON")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def list_sets(path=DEFAULT_PATH):
+    """Saved set names with their last update time, newest first"""
+    with closing(connect(path)) as conn:
+        return conn.execute("SELECT name, updated_at FROM channel_sets ORDER BY updated_at DESC").fetchall()
+
+
+def set_version(name, path=DEFAULT_PATH):
+    """Last update time of a set, or None if it doesn't exist"""
+    with closing(connect(path)) as conn:
+        row = conn.execute("SELECT updated_at FROM channel_sets WHERE name = ?", (name,)).fetchone()
+    return row[0] if row else None
+
+
+def _extra_json(channel):
+    """Optional per-channel settings (optimizer limits, variation) as JSON"""
+    extra = {k: v for k, v in channel.items() if k not in CORE_KEYS}
+    return json.dumps(extra) if extra else None
+
+
+def save_set(name, channels, path=DEFAULT_PATH):
+    """Create or replace a named set in one transaction"""
+    rows = [
+        (
+            name,
+            position,
+            str(ch['name']),
+            float(ch['cpl']),
+            float(ch['conv']),
+            float(ch['budget']),
+            _extra_json(ch)
+        )
+        for position, ch in enumerate(channels)
+    ]
+    with closing(connect(path)) as conn, conn:
+        conn.execute("DELETE FROM channels WHERE set_name = ?", (name,))
+        conn.execute(
+            "INSERT INTO channel_sets (name, updated_at) VALUES (?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET updated_at = excluded.updated_at",
+            (name, time.time())
+        )
+        conn.executemany("INSERT INTO channels VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+
+
+def load_set(name, path=DEFAULT_PATH):
+    """Channel dicts of a named set, or None if it doesn't exist"""
+    with closing(connect(path)) as conn:
+        if conn.execute("SELECT 1 FROM channel_sets WHERE name = ?", (name,)).fetchone() is None:
+            return None
+        rows = conn.execute(
+            "SELECT name, cpl, conv, budget, extra FROM channels WHERE set_name = ? ORDER BY position",
+            (name,)
+        ).fetchall()
+    return [
+        {**(json.loads(extra) if extra else {}), 'name': ch_name, 'cpl': cpl, 'conv': conv, 'budget': budget}
+        for ch_name, cpl, conv, budget, extra in rows
+    ]
+
+
+def delete_set(name, path=DEFAULT_PATH):
+    """Remove a named set and its channels"""
+    with closing(connect(path)) as conn, conn:
+        conn.execute("DELETE FROM channel_sets WHERE name = ?", (name,))
+
+
+def channels_to_frame(channels):
+    """Channel dicts as a file-shaped frame"""
+    return pd.DataFrame(
+        {column: [ch[key] for ch in channels] for column, key in FILE_COLUMNS.items()},
+        columns=list(FILE_COLUMNS)
+    )
+
+
+def frame_to_channels(df):
+    """Channel dicts from a frame with either file columns or channel dict keys"""
+    df = df.rename(columns=FILE_COLUMNS)
+    missing = CORE_KEYS - set(df.columns)
+    if missing:
+        raise ValueError(f"Missing columns: {', '.join(sorted(missing))}")
+    df = df.astype({'name': str, 'cpl': float, 'conv': float, 'budget': float})
+    return df[['name', 'cpl', 'conv', 'budget']].to_dict('records')
+
+
+def read_file(source, fmt):
+    """Read channels from a CSV or Parquet path or file-like object"""
+    if fmt == 'csv':
+        return frame_to_channels(pd.read_csv(source))
+    if fmt == 'parquet':
+        return frame_to_channels(pd.read_parquet(source))
+    raise ValueError(f"Unsupported format: {fmt}")
+
+
+def to_bytes(channels, fmt):
+    """Serialize channels to CSV or Parquet bytes for download"""
+    df = channels_to_frame(channels)
+    if fmt == 'csv':
+        return df.to_csv(index=False).encode('utf-8')
+    if fmt == 'parquet':
+        buffer = io.BytesIO()
+        df.to_parquet(buffer, index=False)
+        return buffer.getvalue()
+    raise ValueError(f"Unsupported format: {fmt}")
@@ -0,0 +1,125 @@
+"""Plotly figures for the Visual Analytics section.
+
+plotly is imported inside each builder, so pages and processes that never
+draw a chart don't pay for loading it.
+"""
+from formatting import format_indian_array
+
+
+def budget_pie(results_df):
+    """Budget allocation pie chart"""
+    import plotly.express as px
+
+    fig_budget = px.pie(
+        results_df, 
+        values='Marketing Spend (₹ Lakhs)', 
+        names='Channel',
+        title='Marketing Budget Allocation',
+        hole=0.4
+    )
+    fig_budget.update_traces(textposition='inside', textinfo='percent+label')
+    return fig_budget
+
+
+def leads_bar(results_df):
+    """Leads distribution by channel"""
+    import plotly.express as px
+
+    fig_leads = px.bar(
+        results_df,
+        x='Channel',
+        y='Leads Required',
+        title='Leads Required by Channel',
+        color='Conversion %',
+        color_continuous_scale='Blues',
+        text='Leads Required'
+    )
+    # Format text labels with Indian numbering
+    fig_leads.update_traces(
+        texttemplate=format_indian_array(results_df['Leads Required'].to_numpy()),
+        textposition='outside'
+    )
+    # Add padding to top for labels
+    max_val = results_df['Leads Required'].max()
+    fig_leads.update_layout(
+        yaxis=dict(range=[0, max_val * 1.15])  # Add 15% padding at top
+    )
+    return fig_leads
+
+
+def spend_vs_disburse_bar(results_df):
+    """Comparison bar chart: Amount to Spend vs Amount to Disburse"""
+    import plotly.express as px
+
+    comparison_df = results_df[['Channel', 'Marketing Spend (₹ Lakhs)', 'Amount to Disburse (₹ Lakhs)']].copy()
+    comparison_df_melted = comparison_df.melt(
+        id_vars='Channel',
+        value_vars=['Marketing Spend (₹ Lakhs)', 'Amount to Disburse (₹ Lakhs)'],
+        var_name='Type',
+        value_name='Amount (₹ Lakhs)'
+    )
+    
+    fig_comparison = px.bar(
+        comparison_df_melted,
+        x='Channel',
+        y='Amount (₹ Lakhs)',
+        color='Type',
+        title='Spend vs Disburse Comparison by Channel',
+        barmode='group',
+        color_discrete_map={
+            'Marketing Spend (₹ Lakhs)': '#EF553B',
+            'Amount to Disburse (₹ Lakhs)': '#00CC96'
+        },
+        text='Amount (₹ Lakhs)'
+    )
+    fig_comparison.update_traces(texttemplate='₹%{text:.2f}L', textposition='outside')
+    # Add padding to top for labels
+    max_val = comparison_df_melted['Amount (₹ Lakhs)'].max()
+    fig_comparison.update_layout(
+        xaxis_title="Channel",
+        yaxis_title="Amount (₹ Lakhs)",
+        yaxis=dict(range=[0, max_val * 1.15]),  # Add 15% padding at top
+        legend_title="",
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+    )
+    return fig_comparison
+
+
+def roi_bar(results_df):
+    """ROI comparison by channel"""
+    import plotly.express as px
+
+    fig_roi = px.bar(
+        results_df.sort_values('ROI', ascending=True),
+        x='ROI',
+        y='Channel',
+        orientation='h',
+        title='Return on Investment by Channel',
+        color='ROI',
+        color_continuous_scale='Greens',
+        text='ROI'
+    )
+    fig_roi.update_traces(texttemplate='%{text:.2f}x', textposition='outside')
+    # Add padding to right for labels
+    max_val = results_df['ROI'].max()
+    fig_roi.update_layout(
+        showlegend=False,
+        xaxis=dict(range=[0, max_val * 1.15])  # Add 15% padding on right
+    )
+    return fig_roi
+
+
+# Visual Analytics charts in page order
+FIGURES = {
+    'budget': budget_pie,
+    'leads': leads_bar,
+    'comparison': spend_vs_disburse_bar,
+    'roi': roi_bar
+}
+
+TITLES = {
+    'budget': 'Budget Allocation',
+    'leads': 'Leads by Channel',
+    'comparison': 'Spend vs Disburse',
+    'roi': 'ROI by Channel'
+}
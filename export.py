@@ -0,0 +1,177 @@
+"""Streaming export of Channel Performance Summary reports.
+
+A report holds any number of scenarios, each a name and a per-channel
+results frame, written one after another to Excel, Parquet or CSV. Rows go
+out in chunks through streaming writers (openpyxl write-only workbooks,
+pyarrow's ParquetWriter, appended CSV), so only one scenario is held in
+memory at a time. Each scenario ends with its TOTAL row.
+
+With ``formatted`` the cells are the page's display strings (Indian digit
+grouping, ₹ and L units) instead of numbers.
+
+    python export.py plans.xlsx --sets north south --target 250 --reloan 150 --avg-ticket-size 0.25
+"""
+import argparse
+import sys
+
+import numpy as np
+import pandas as pd
+
+import channel_store
+import planning
+import summary_table
+
+REPORT_COLUMNS = ['Scenario'] + summary_table.SUMMARY_COLUMNS
+FORMATS = ['xlsx', 'parquet', 'csv']
+
+# Excel's row limit per sheet, header included
+EXCEL_MAX_ROWS = 1048576
+
+
+def report_format(path):
+    """'xlsx', 'parquet' or 'csv' from a file extension"""
+    lower = path.lower()
+    if lower.endswith('.xlsx'):
+        return 'xlsx'
+    return 'parquet' if lower.endswith(('.parquet', '.pq')) else 'csv'
+
+
+def _arrow_schema(formatted):
+    import pyarrow as pa
+
+    if formatted:
+        return pa.schema([(column, pa.string()) for column in REPORT_COLUMNS])
+    types = {'Scenario': pa.string(), 'S.No': pa.int64(), 'Channel': pa.string(),
+             'Leads Required': pa.int64(), 'Leads to Disburse': pa.int64()}
+    return pa.schema([(column, types.get(column, pa.float64())) for column in REPORT_COLUMNS])
+
+
+def report_chunks(scenarios, formatted=False, chunk_rows=100000):
+    """Yield report rows in frames of at most ``chunk_rows``, scenario by scenario"""
+    for name, results_df in scenarios:
+        detailed_df = summary_table.summary_frame(results_df)
+        for start in range(0, len(detailed_df), chunk_rows):
+            chunk = detailed_df.iloc[start:start + chunk_rows]
+            if formatted:
+                chunk = summary_table.display_strings(chunk, escape=False)
+            chunk = chunk.reset_index(drop=True)
+            chunk.insert(0, 'Scenario', name)
+            yield chunk
+
+        totals = summary_table.summary_totals(detailed_df)
+        if formatted:
+            total_row = summary_table.footer_strings(totals)
+        else:
+            total_row = dict.fromkeys(summary_table.SUMMARY_COLUMNS, np.nan)
+            total_row.update(Channel='TOTAL', **totals)
+        yield pd.DataFrame([{'Scenario': name, **total_row}], columns=REPORT_COLUMNS)
+
+
+class ReportWriter:
+    """Write report chunks to an Excel, Parquet or CSV path or binary file object"""
+
+    def __init__(self, destination, fmt, formatted=False):
+        if fmt not in FORMATS:
+            raise ValueError(f"Unsupported format: {fmt}")
+        self.destination = destination
+        self.format = fmt
+        self.formatted = formatted
+        self.rows = 0
+        self._file = None
+        self._parquet = None
+        self._workbook = None
+        self._sheet = None
+        self._sheet_rows = 0
+
+        if fmt == 'xlsx':
+            try:
+                from openpyxl import Workbook
+            except ImportError:
+                raise ValueError("Excel export needs openpyxl (pip install openpyxl)")
+            self._workbook = Workbook(write_only=True)
+        elif fmt == 'parquet':
+            import pyarrow.parquet as pq
+
+            self._parquet = pq.ParquetWriter(destination, _arrow_schema(formatted))
+        else:
+            self._file = open(destination, 'wb') if isinstance(destination, str) else destination
+
+    def _new_sheet(self):
+        count = len(self._workbook.worksheets)
+        self._sheet = self._workbook.create_sheet('Summary' if count == 0 else f'Summary {count + 1}')
+        self._sheet.append(REPORT_COLUMNS)
+        self._sheet_rows = 1
+
+    def write(self, chunk):
+        if self.format == 'xlsx':
+            # Excel has no NaN; blank cells instead
+            values = chunk.astype(object).where(chunk.notna(), None)
+            for row in values.itertuples(index=False, name=None):
+                if self._sheet is None or self._sheet_rows >= EXCEL_MAX_ROWS:
+                    self._new_sheet()
+                self._sheet.append(row)
+                self._sheet_rows += 1
+        elif self.format == 'parquet':
+            import pyarrow as pa
+
+            self._parquet.write_table(pa.Table.from_pandas(chunk, schema=self._parquet.schema, preserve_index=False))
+        else:
+            self._file.write(chunk.to_csv(index=False, header=self.rows == 0).encode('utf-8'))
+        self.rows += len(chunk)
+
+    def close(self):
+        if self.format == 'xlsx':
+            if self._sheet is None:
+                self._new_sheet()
+            self._workbook.save(self.destination)
+        elif self.format == 'parquet':
+            self._parquet.close()
+        else:
+            if self.rows == 0:
+                self._file.write(pd.DataFrame(columns=REPORT_COLUMNS).to_csv(index=False).encode('utf-8'))
+            if isinstance(self.destination, str):
+                self._file.close()
+
+
+def export_report(scenarios, destination, fmt, formatted=False, chunk_rows=100000):
+    """Stream every scenario's summary rows and TOTAL row to ``destination``; returns rows written"""
+    writer = ReportWriter(destination, fmt, formatted)
+    try:
+        for chunk in report_chunks(scenarios, formatted, chunk_rows):
+            writer.write(chunk)
+    finally:
+        writer.close()
+    return writer.rows
+
+
+def store_scenarios(set_names, target, reloan, avg_ticket_size, store_path=channel_store.DEFAULT_PATH):
+    """Lazily plan saved channel sets as report scenarios, one set in memory at a time"""
+    for name in set_names:
+        channels = channel_store.load_set(name, store_path)
+        if channels is None:
+            raise ValueError(f"Unknown channel set: {name}")
+        yield name, planning.plan_results(channels, target, reloan, avg_ticket_size)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export Channel Performance Summary reports for saved channel sets.")
+    parser.add_argument('output', help="Excel (.xlsx), Parquet or CSV file")
+    parser.add_argument('--sets', nargs='*', help="Channel sets to include (default: all saved sets)")
+    parser.add_argument('--target', type=float, required=True, help="Target (₹ Lakhs)")
+    parser.add_argument('--reloan', type=float, default=0.0, help="Reloan (₹ Lakhs)")
+    parser.add_argument('--avg-ticket-size', type=float, required=True, help="Average Ticket Size (₹ Lakhs)")
+    parser.add_argument('--formatted', action='store_true', help="Write display strings (Indian grouping, ₹ L)")
+    parser.add_argument('--store', default=channel_store.DEFAULT_PATH, help="Channel store path")
+    args = parser.parse_args(argv)
+
+    set_names = args.sets or [name for name, _ in channel_store.list_sets(args.store)]
+    scenarios = store_scenarios(set_names, args.target, args.reloan, args.avg_ticket_size, args.store)
+    try:
+        rows = export_report(scenarios, args.output, report_format(args.output), args.formatted)
+    except ValueError as e:
+        sys.exit(f"error: {e}")
+    print(f"Wrote {rows} rows for {len(set_names)} scenarios to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
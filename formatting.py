@@ -0,0 +1,112 @@
+"""Number formatting helpers for the Marketing Budget Calculator."""
+import numpy as np
+import pandas as pd
+
+
+# Indian number formatting function
+def format_indian_number(number):
+    """Format number according to Indian numbering system with commas"""
+    if pd.isna(number) or number == 0:
+        return "0"
+    
+    s = str(int(number))
+    if len(s) <= 3:
+        return s
+    
+    # Split into last 3 digits and remaining
+    last_three = s[-3:]
+    remaining = s[:-3]
+    
+    # Add commas every 2 digits for remaining part
+    result = ''
+    for i, digit in enumerate(reversed(remaining)):
+        if i > 0 and i % 2 == 0:
+            result = ',' + result
+        result = digit + result
+    
+    return result + ',' + last_three
+
+
+# Powers of ten covering every int64 value
+POWERS_OF_TEN = 10 ** np.arange(19, dtype=np.int64)
+
+
+def _digit_codes(values, width):
+    """Character codes of the last ``width`` digits of non-negative integers, most significant first"""
+    return (values[:, None] // POWERS_OF_TEN[width - 1::-1]) % 10 + ord('0')
+
+
+def format_indian_array(values, decimals=0, na_rep="0"):
+    """Format a whole column according to the Indian numbering system.
+
+    Vectorized counterpart of ``format_indian_number``: with ``decimals=0``
+    values are truncated and the output matches it for integers, while
+    negatives keep their sign in front of the first group. Rows are built as
+    character-code matrices, one batch per digit count and sign, so no
+    Python code runs per value. Non-finite values get ``na_rep``, and the
+    rare floats too large for int64 fall back to ``format_indian_number``.
+    Accepts a list, array or Series and returns a string array, or a Series
+    with the same index for Series input.
+    """
+    index = values.index if isinstance(values, pd.Series) else None
+    values = np.asarray(values)
+    shape = values.shape
+    oversized = np.zeros(values.size, dtype=bool)
+    if values.dtype.kind in 'iu':
+        values = values.astype(np.int64).ravel()
+        missing = np.zeros(values.shape, dtype=bool)
+        whole = np.abs(values)
+        fraction = np.zeros(values.shape, dtype=np.int64)
+        negative = values < 0
+    else:
+        values = values.astype(float).ravel()
+        magnitude = np.abs(values)
+        # Scaled magnitudes from 2**63 up don't fit the int64 digit arithmetic
+        with np.errstate(invalid='ignore', over='ignore'):
+            oversized = np.isfinite(values) & (np.round(magnitude * 10 ** decimals) >= 2.0 ** 63)
+        missing = ~np.isfinite(values) | oversized
+        magnitude = np.where(missing, 0, magnitude)
+        if decimals > 0:
+            whole, fraction = np.divmod(np.round(magnitude * 10 ** decimals).astype(np.int64), 10 ** decimals)
+        else:
+            whole = np.trunc(magnitude).astype(np.int64)
+            fraction = np.zeros(values.shape, dtype=np.int64)
+        negative = (values < 0) & ((whole > 0) | (fraction > 0))
+
+    lengths = np.maximum(np.searchsorted(POWERS_OF_TEN, whole, side='right'), 1)
+    suffix = decimals + 1 if decimals > 0 else 0
+    text = np.full(values.shape, na_rep, dtype=f'<U{max(28 + suffix, len(na_rep))}')
+
+    batch_keys = lengths * 2 + negative
+    for key in np.unique(batch_keys[~missing]):
+        length, is_negative = divmod(int(key), 2)
+        rows = (batch_keys == key) & ~missing
+
+        # Commas go before the last three digits and then every two digits
+        comma_before = np.arange(length - 3, 0, -2)[::-1]
+        offset = int(is_negative)
+        positions = offset + np.arange(length) + np.searchsorted(comma_before, np.arange(length), side='right')
+        width = offset + length + len(comma_before) + suffix
+
+        chars = np.full((int(rows.sum()), width), ord(','), dtype=np.uint32)
+        if is_negative:
+            chars[:, 0] = ord('-')
+        chars[:, positions] = _digit_codes(whole[rows], length)
+        if decimals > 0:
+            chars[:, -suffix] = ord('.')
+            chars[:, -decimals:] = _digit_codes(fraction[rows], decimals)
+        text[rows] = chars.view(f'<U{width}').ravel()
+
+    if oversized.any():
+        suffix_text = '.' + '0' * decimals if decimals > 0 else ''
+        large = [
+            ('-' if value < 0 else '') + format_indian_number(abs(value)) + suffix_text
+            for value in values[oversized]
+        ]
+        text = text.astype(f'<U{max(text.dtype.itemsize // 4, max(map(len, large)))}')
+        text[oversized] = large
+
+    text = text.reshape(shape)
+    if index is not None:
+        return pd.Series(text, index=index, dtype=object)
+    return text
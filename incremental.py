@@ -0,0 +1,154 @@
+"""Incrementally maintained channel plan.
+
+Keeps the per-channel result columns, running totals and heaps for the Key
+Insights extremes. Editing k channels recomputes only those k rows, moves
+the totals by their deltas and pushes new heap entries, so an edit costs
+O(k log n) instead of a pass over every channel. Stale heap entries are
+skipped when they surface (lazy deletion) and the heaps are rebuilt once
+they grow to several times the channel count.
+
+A change to target, reloan or average ticket size touches every row, and
+so does adding or removing channels; those rebuild the whole plan. A
+rebuild can start from an already computed results frame (the app's
+cross-session cache) instead of recomputing the columns.
+"""
+import heapq
+
+import numpy as np
+import pandas as pd
+
+import planning
+
+SUM_COLUMNS = ['Amount to Disburse (₹ Lakhs)', 'Leads to Disburse', 'Leads Required', 'Marketing Spend (₹ Lakhs)']
+
+# Above this share of changed rows one vectorized rebuild beats row updates
+REBUILD_FRACTION = 0.25
+
+
+def _channel_values(ch):
+    return ch['name'], ch['cpl'], ch['conv'], ch['budget'], ch.get('curve')
+
+
+class IncrementalPlan:
+    """Per-channel results with O(log n) updates to totals and ROI / spend extremes"""
+
+    def __init__(self, channels, target, reloan, avg_ticket_size, results=None):
+        self.inputs = (target, reloan, avg_ticket_size)
+        self.channels = list(channels)
+        self.names, cpl, conv, split = planning.channel_arrays(self.channels)
+        if results is not None:
+            # Seeded from a results frame for these exact inputs
+            self.columns = {name: results[name].to_numpy(copy=True) for name in planning.RESULT_COLUMNS[1:]}
+        else:
+            self.columns = planning.compute_plan(
+                cpl, conv, split, target, reloan, avg_ticket_size, planning.curve_arrays(self.channels)
+            )
+        self.totals = {
+            name: (int(self.columns[name].sum()) if self.columns[name].dtype.kind == 'i' else float(self.columns[name].sum()))
+            for name in SUM_COLUMNS
+        }
+        self.last_recomputed = len(self.channels)
+        self._versions = np.zeros(len(self.channels), dtype=np.int64)
+        self._frame = None
+        self._rebuild_heaps()
+
+    def _rebuild_heaps(self):
+        roi = self.columns['ROI']
+        spend = self.columns['Marketing Spend (₹ Lakhs)']
+        valid = np.flatnonzero(~np.isnan(roi))
+        self._roi_max = [(-roi[i], i, 0) for i in valid]
+        self._roi_min = [(roi[i], i, 0) for i in valid]
+        self._spend_max = [(-spend[i], i, 0) for i in range(len(spend))]
+        for heap in (self._roi_max, self._roi_min, self._spend_max):
+            heapq.heapify(heap)
+        self._versions[:] = 0
+
+    def _valid(self, entry):
+        return entry[2] == self._versions[entry[1]]
+
+    def _top(self, heap):
+        """Smallest live entry, discarding stale ones on the way"""
+        while heap and not self._valid(heap[0]):
+            heapq.heappop(heap)
+        return heap[0] if heap else None
+
+    def _ties(self, heap):
+        """All live entries sharing the top key, in channel order"""
+        top = self._top(heap)
+        if top is None:
+            return np.nan, []
+        popped = []
+        while heap and (heap[0][0] == top[0] or not self._valid(heap[0])):
+            entry = heapq.heappop(heap)
+            if self._valid(entry):
+                popped.append(entry)
+        for entry in popped:
+            heapq.heappush(heap, entry)
+        return top[0], sorted(entry[1] for entry in popped)
+
+    def update(self, index, channel):
+        """Recompute one channel row and move the totals and heaps by its change"""
+        self.channels[index] = channel
+        self.names[index] = channel['name']
+        row = planning.compute_plan(
+            [channel['cpl']], [channel['conv']], [channel['budget']], *self.inputs, planning.curve_arrays([channel])
+        )
+        for name, values in row.items():
+            old = self.columns[name][index]
+            self.columns[name][index] = values[0]
+            if name in self.totals:
+                if np.isfinite(old) and np.isfinite(values[0]):
+                    self.totals[name] += values[0].item() - old.item()
+                else:
+                    # Infinite spend (a lead count beyond a Hill curve's ceiling) can't be subtracted back out
+                    self.totals[name] = float(self.columns[name].sum())
+
+        self._versions[index] += 1
+        version = self._versions[index]
+        roi = row['ROI'][0]
+        if not np.isnan(roi):
+            heapq.heappush(self._roi_max, (-roi, index, version))
+            heapq.heappush(self._roi_min, (roi, index, version))
+        heapq.heappush(self._spend_max, (-row['Marketing Spend (₹ Lakhs)'][0], index, version))
+        self._frame = None
+
+        if len(self._spend_max) > 4 * len(self.channels) + 64:
+            self._rebuild_heaps()
+
+    def sync(self, channels, target, reloan, avg_ticket_size):
+        """Bring the plan up to date with ``channels``; False when a full rebuild is needed.
+
+        Unchanged channel dicts are usually the same objects, so most rows are
+        skipped on an identity check.
+        """
+        if (target, reloan, avg_ticket_size) != self.inputs or len(channels) != len(self.channels):
+            return False
+        changed = [
+            i for i, (old, new) in enumerate(zip(self.channels, channels))
+            if old is not new and _channel_values(old) != _channel_values(new)
+        ]
+        if len(changed) > REBUILD_FRACTION * len(channels):
+            return False
+        for i in changed:
+            self.update(i, channels[i])
+        self.last_recomputed = len(changed)
+        return True
+
+    def roi_extremes(self):
+        """(max ROI, best channel names, min ROI, worst channel names), NaN ROIs ignored"""
+        max_key, best = self._ties(self._roi_max)
+        min_roi, worst = self._ties(self._roi_min)
+        return -max_key, [self.names[i] for i in best], min_roi, [self.names[i] for i in worst]
+
+    def highest_spend_channel(self):
+        """Channel with the largest marketing spend (the first one on ties)"""
+        top = self._top(self._spend_max)
+        return None if top is None else self.names[top[1]]
+
+    def frame(self):
+        """Per-channel results frame, built once per change"""
+        if self._frame is None:
+            columns = {name: values.copy() for name, values in self.columns.items()}
+            columns['Channel'] = list(self.names)
+            self._frame = pd.DataFrame(columns, columns=planning.RESULT_COLUMNS)
+        return self._frame
@@ -0,0 +1,196 @@
+"""Derive channel CPL and Conversion % from lead and disbursal event logs.
+
+Event files are read in chunks (CSV) or record batches from memory-mapped
+Parquet, so memory is bounded by the chunk size rather than the log size.
+Each file is reduced to per-channel, per-window counts that are stored in a
+checkpoint directory; later runs only read files that are new or changed.
+
+Lead files need ``channel``, ``created_at`` and ``cost`` (₹ per lead).
+Disbursal files need ``channel`` and ``disbursed_at``.
+
+    python ingest.py --leads leads/*.parquet --disbursals disbursals/*.csv --checkpoint ingest_state
+"""
+import argparse
+import json
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+LEAD_COLUMNS = ['channel', 'created_at', 'cost']
+DISBURSAL_COLUMNS = ['channel', 'disbursed_at']
+
+AGGREGATE_COLUMNS = ['source', 'kind', 'channel', 'window_start', 'events', 'cost']
+
+DEFAULT_CHECKPOINT = os.environ.get(
+    'MARKETING_INGEST_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'ingest_state')
+)
+
+
+def read_chunks(path, columns, chunk_size):
+    """Yield a file's columns in bounded chunks"""
+    if path.lower().endswith(('.parquet', '.pq')):
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(path, memory_map=True).iter_batches(batch_size=chunk_size, columns=columns):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, usecols=columns, chunksize=chunk_size)
+
+
+def window_starts(timestamps, window):
+    """Start of the day ('D'), week ('W') or month ('M') containing each timestamp"""
+    timestamps = pd.to_datetime(timestamps)
+    if window == 'D':
+        return timestamps.dt.normalize()
+    return timestamps.dt.to_period(window).dt.start_time
+
+
+def aggregate_file(path, kind, window, chunk_size):
+    """Per-channel, per-window event counts (and lead cost) for one file"""
+    columns, time_column = (LEAD_COLUMNS, 'created_at') if kind == 'lead' else (DISBURSAL_COLUMNS, 'disbursed_at')
+    partials = []
+    for chunk in read_chunks(path, columns, chunk_size):
+        grouped = pd.DataFrame({
+            'channel': chunk['channel'].astype(str),
+            'window_start': window_starts(chunk[time_column], window),
+            'events': 1,
+            'cost': chunk['cost'].astype(float) if kind == 'lead' else 0.0
+        }).groupby(['channel', 'window_start'], as_index=False).sum()
+        partials.append(grouped)
+
+    if not partials:
+        return pd.DataFrame(columns=AGGREGATE_COLUMNS)
+    result = pd.concat(partials).groupby(['channel', 'window_start'], as_index=False).sum()
+    result.insert(0, 'kind', kind)
+    result.insert(0, 'source', os.path.abspath(path))
+    return result[AGGREGATE_COLUMNS]
+
+
+def _file_identity(path):
+    stat = os.stat(path)
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def checkpoint_version(checkpoint_dir):
+    """Modification time of the checkpoint manifest, or None before the first run"""
+    manifest_path = os.path.join(checkpoint_dir, 'manifest.json')
+    return os.path.getmtime(manifest_path) if os.path.exists(manifest_path) else None
+
+
+def load_checkpoint(checkpoint_dir):
+    """Processed-file manifest and stored per-file aggregates"""
+    manifest_path = os.path.join(checkpoint_dir, 'manifest.json')
+    aggregates_path = os.path.join(checkpoint_dir, 'aggregates.csv')
+    if not os.path.exists(manifest_path):
+        return {}, pd.DataFrame(columns=AGGREGATE_COLUMNS)
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+    aggregates = pd.read_csv(aggregates_path, parse_dates=['window_start'])
+    return manifest, aggregates
+
+
+def _save_checkpoint(checkpoint_dir, manifest, aggregates):
+    """Write the checkpoint atomically so an interrupted run leaves the last good state"""
+    os.makedirs(checkpoint_dir, exist_ok=True)
+    aggregates_path = os.path.join(checkpoint_dir, 'aggregates.csv')
+    manifest_path = os.path.join(checkpoint_dir, 'manifest.json')
+    aggregates.to_csv(aggregates_path + '.tmp', index=False)
+    with open(manifest_path + '.tmp', 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(aggregates_path + '.tmp', aggregates_path)
+    os.replace(manifest_path + '.tmp', manifest_path)
+
+
+def ingest(lead_files, disbursal_files, checkpoint_dir=DEFAULT_CHECKPOINT, window='W', chunk_size=1000000):
+    """Fold new or changed event files into the checkpoint and return all aggregates.
+
+    Aggregates are kept per source file, so a file that changed since the
+    last run replaces its earlier contribution instead of double counting.
+    """
+    manifest, aggregates = load_checkpoint(checkpoint_dir)
+    if manifest.get('window', window) != window:
+        raise ValueError(f"Checkpoint uses window '{manifest['window']}'; use a new checkpoint for '{window}'")
+    manifest['window'] = window
+    files = manifest.setdefault('files', {})
+
+    for kind, paths in (('lead', lead_files), ('disbursal', disbursal_files)):
+        for path in paths:
+            source = os.path.abspath(path)
+            identity = _file_identity(path)
+            if files.get(source) == identity:
+                continue
+            file_aggregates = aggregate_file(path, kind, window, chunk_size)
+            aggregates = pd.concat(
+                [aggregates[aggregates['source'] != source], file_aggregates],
+                ignore_index=True
+            )
+            files[source] = identity
+            _save_checkpoint(checkpoint_dir, manifest, aggregates)
+    return aggregates
+
+
+def channel_metrics(aggregates, start=None, end=None):
+    """Actual CPL and Conversion % per channel over windows starting in [start, end]"""
+    selected = aggregates
+    if start is not None:
+        selected = selected[selected['window_start'] >= pd.Timestamp(start)]
+    if end is not None:
+        selected = selected[selected['window_start'] <= pd.Timestamp(end)]
+
+    totals = selected.pivot_table(
+        index='channel', columns='kind', values=['events', 'cost'], aggfunc='sum', fill_value=0
+    )
+    leads = totals.get(('events', 'lead'), pd.Series(0, index=totals.index))
+    disbursals = totals.get(('events', 'disbursal'), pd.Series(0, index=totals.index))
+    cost = totals.get(('cost', 'lead'), pd.Series(0.0, index=totals.index))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        metrics = pd.DataFrame({
+            'Leads': leads.astype(np.int64),
+            'Disbursals': disbursals.astype(np.int64),
+            'Cost (₹)': cost.astype(float),
+            'CPL (₹)': np.where(leads > 0, cost / leads, np.nan),
+            'Conversion %': np.where(leads > 0, disbursals / leads * 100, np.nan)
+        }, index=totals.index)
+    return metrics.rename_axis('Channel').reset_index()
+
+
+def apply_to_channels(channels, metrics, decimals=2):
+    """Channel dicts with CPL and Conversion % replaced where the logs have data for that channel name"""
+    by_name = metrics.set_index('Channel')
+    updated = []
+    for ch in channels:
+        if ch['name'] in by_name.index:
+            row = by_name.loc[ch['name']]
+            ch = dict(ch)
+            if pd.notna(row['CPL (₹)']):
+                ch['cpl'] = round(float(row['CPL (₹)']), decimals)
+            if pd.notna(row['Conversion %']):
+                # The app's conversion inputs start at 0.1%
+                ch['conv'] = max(round(float(row['Conversion %']), decimals), 0.1)
+        updated.append(ch)
+    return updated
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Aggregate lead and disbursal logs into channel CPL and Conversion %.")
+    parser.add_argument('--leads', nargs='*', default=[], help="Lead event files (CSV or Parquet)")
+    parser.add_argument('--disbursals', nargs='*', default=[], help="Disbursal event files (CSV or Parquet)")
+    parser.add_argument('--checkpoint', default=DEFAULT_CHECKPOINT, help="Checkpoint directory")
+    parser.add_argument('--window', choices=['D', 'W', 'M'], default='W', help="Aggregation window")
+    parser.add_argument('--chunk-size', type=int, default=1000000, help="Rows per chunk")
+    parser.add_argument('--start', help="First window to include in the printed metrics (YYYY-MM-DD)")
+    parser.add_argument('--end', help="Last window to include in the printed metrics (YYYY-MM-DD)")
+    args = parser.parse_args(argv)
+
+    try:
+        aggregates = ingest(args.leads, args.disbursals, args.checkpoint, args.window, args.chunk_size)
+    except ValueError as e:
+        sys.exit(f"error: {e}")
+    print(channel_metrics(aggregates, args.start, args.end).to_string(index=False))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,155 @@
+"""Background jobs for long computations.
+
+A job runs a function on a shared thread pool so the Streamlit script
+thread never waits for it. The function gets a ``Job`` handle to report
+progress and partial results and to check for cancellation between steps;
+heavy numeric work can still fan out to processes inside it.
+
+Jobs are keyed on their inputs, so identical requests from any number of
+sessions share one run. Each session that asks for a job is one of its
+owners; cancelling removes an owner and the job stops when none are left.
+Finished jobs are kept for later reruns up to ``MAX_FINISHED``.
+"""
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+MAX_RUNNING = 2
+MAX_FINISHED = 32
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+CANCELLED = 'cancelled'
+FAILED = 'failed'
+ACTIVE = (QUEUED, RUNNING)
+
+
+class JobCancelled(Exception):
+    """Raised inside a job function once its job has been cancelled"""
+
+
+def job_key(kind, *parts):
+    """Stable key for a job kind and its JSON-serialisable inputs"""
+    payload = json.dumps([kind, *parts], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class Job:
+    """State of one background job, safe to read from any thread"""
+
+    def __init__(self, key, label):
+        self.key = key
+        self.label = label
+        self.status = QUEUED
+        self.progress = 0.0
+        self.message = ''
+        self.result = None
+        self.error = None
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.owners = set()
+        self._cancel = threading.Event()
+        self._future = None
+
+    @property
+    def active(self):
+        return self.status in ACTIVE
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def report(self, progress, result=None, message=''):
+        """Publish progress (0-1) and, optionally, the latest partial result"""
+        if self.cancelled:
+            raise JobCancelled()
+        self.progress = min(max(float(progress), 0.0), 1.0)
+        if result is not None:
+            self.result = result
+        self.message = message
+
+    def elapsed(self):
+        if self.started_at is None:
+            return 0.0
+        return (self.finished_at or time.time()) - self.started_at
+
+
+class JobManager:
+    """Run, share and cancel background jobs"""
+
+    def __init__(self, max_running=MAX_RUNNING, max_finished=MAX_FINISHED):
+        self.max_finished = max_finished
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=max_running, thread_name_prefix='job')
+
+    def submit(self, key, label, func, owner=None):
+        """The job for ``key``, started with ``func(job)`` unless an identical one is queued, running or done"""
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is None or job.status in (CANCELLED, FAILED):
+                job = Job(key, label)
+                self._jobs[key] = job
+                job._future = self._pool.submit(self._run, job, func)
+            self._jobs.move_to_end(key)
+            if owner is not None and job.active:
+                job.owners.add(owner)
+            self._evict()
+            return job
+
+    def get(self, key):
+        with self._lock:
+            return self._jobs.get(key)
+
+    def cancel(self, key, owner=None):
+        """Drop ``owner`` from the job (or all owners) and stop it once nobody is waiting on it"""
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is None or not job.active:
+                return job
+            job.owners.discard(owner)
+            if owner is None or not job.owners:
+                job._cancel.set()
+                if job._future.cancel():
+                    job.status = CANCELLED
+                    job.finished_at = time.time()
+            return job
+
+    def jobs(self):
+        """Every known job, most recently submitted last"""
+        with self._lock:
+            return list(self._jobs.values())
+
+    def _run(self, job, func):
+        if job.cancelled:
+            job.status = CANCELLED
+            job.finished_at = time.time()
+            return
+        job.status = RUNNING
+        job.started_at = time.time()
+        try:
+            result = func(job)
+            if job.cancelled:
+                raise JobCancelled()
+            job.result = result
+            job.progress = 1.0
+            job.status = DONE
+        except JobCancelled:
+            job.status = CANCELLED
+        except Exception as e:
+            job.error = f"{type(e).__name__}: {e}"
+            job.status = FAILED
+        finally:
+            job.finished_at = time.time()
+            job.owners.clear()
+
+    def _evict(self):
+        """Forget the oldest finished jobs beyond ``max_finished``"""
+        finished = [key for key, job in self._jobs.items() if not job.active]
+        for key in finished[:max(len(finished) - self.max_finished, 0)]:
+            del self._jobs[key]
@@ -1,30 +1,30 @@
+import io
+import itertools
+import time
+import uuid
+from contextlib import closing
+
 import streamlit as st
 import pandas as pd
-import plotly.graph_objects as go
-import plotly.express as px
-
-# Indian number formatting function
-def format_indian_number(number):
-    """Format number according to Indian numbering system with commas"""
-    if pd.isna(number) or number == 0:
-        return "0"
-    
-    s = str(int(number))
-    if len(s) <= 3:
-        return s
-    
-    # Split into last 3 digits and remaining
-    last_three = s[-3:]
-    remaining = s[:-3]
-    
-    # Add commas every 2 digits for remaining part
-    result = ''
-    for i, digit in enumerate(reversed(remaining)):
-        if i > 0 and i % 2 == 0:
-            result = ',' + result
-        result = digit + result
-    
-    return result + ',' + last_three
+import planning
+import attribution
+import optimizer
+import montecarlo
+import charts
+import summary_table
+import channel_editor
+import channel_store
+import export
+import incremental
+import jobs
+import ingest
+import pacing
+import plan_cube
+import snapshots
+import profiling
+import reloan_forecast
+import response_curves
+from formatting import format_indian_number
 
 # Set page configuration
 st.set_page_config(
@@ -33,6 +33,22 @@ st.set_page_config(
     layout="wide"
 )
 
+# Opt-in section timing. The admin switches live in the Performance panel at
+# the end of the page and apply from the next rerun
+if 'profile_session' not in st.session_state:
+    st.session_state.profile_session = uuid.uuid4().hex[:8]
+if '_run_profile' in st.session_state:
+    # A rerun interrupted by a widget change never reaches finish()
+    st.session_state._run_profile.abandon()
+run_profile = profiling.RunProfile(
+    enabled=profiling.PROFILE_ENV or st.session_state.get('profile_mode', False),
+    write_log=profiling.PROFILE_ENV or st.session_state.get('profile_log', False),
+    cprofile=st.session_state.get('profile_cprofile', False),
+    session=st.session_state.profile_session
+)
+st.session_state._run_profile = run_profile
+run_profile.checkpoint("Page setup")
+
 # Custom CSS
 st.markdown("""
 <style>
@@ -113,40 +129,104 @@ st.markdown("""
 st.markdown("<h1 class='main-header'>💰 Marketing Budget Calculator</h1>", unsafe_allow_html=True)
 
 # Sidebar for inputs
+run_profile.checkpoint("Sidebar")
 st.sidebar.header("Input Parameters")
 st.sidebar.markdown("*All amounts are in Lakhs (₹)*")
 
-# New Input parameters
-target = st.sidebar.number_input(
-    "Target (₹ Lakhs)", 
-    min_value=0.0, 
-    max_value=10000000.0, 
-    value=250.0, 
-    step=10.0,
-    help="Total target disbursement amount in lakhs"
+# New Input parameters - plan from a disbursement target, or work out the
+# disbursement a fixed marketing budget buys
+plan_from = st.sidebar.radio(
+    "Plan From",
+    ['Target', 'Marketing Budget'],
+    horizontal=True,
+    key="plan_from",
+    help="Start from a disbursement target, or from the marketing budget available"
 )
+budget_mode = plan_from == 'Marketing Budget'
 
-reloan = st.sidebar.number_input(
-    "Reloan (₹ Lakhs)", 
-    min_value=0.0, 
-    max_value=10000000.0, 
-    value=150.0, 
-    step=10.0,
-    help="Expected reloan amount in lakhs"
-)
+if budget_mode:
+    marketing_budget = st.sidebar.number_input(
+        "Marketing Budget (₹ Lakhs)",
+        min_value=0.0,
+        max_value=10000000.0,
+        value=10.0,
+        step=1.0,
+        key="marketing_budget",
+        help="Marketing spend available in lakhs"
+    )
+else:
+    target = st.sidebar.number_input(
+        "Target (₹ Lakhs)", 
+        min_value=0.0, 
+        max_value=10000000.0, 
+        value=250.0, 
+        step=10.0,
+        help="Total target disbursement amount in lakhs"
+    )
 
-# Calculate Target from Marketing
-target_from_marketing = target - reloan
-
-# Display calculated value
-st.sidebar.markdown("### 📊 Calculated Value")
-st.sidebar.markdown(f"""
-<div class='calculated-value'>
-    <strong>Target from Marketing</strong><br>
-    <span style='font-size: 1.5rem; color: #1f77b4;'>₹{target_from_marketing:.2f} L</span><br>
-    <small style='color: #666;'>Target ({target:.0f}) - Reloan ({reloan:.0f})</small>
-</div>
-""", unsafe_allow_html=True)
+@st.cache_data(max_entries=8, show_spinner=False)
+def cached_reloan_cohorts(checkpoint_dir, version):
+    """Reloan cohort rows, re-read only when the checkpoint changes"""
+    return reloan_forecast.load_checkpoint(checkpoint_dir)[1]
+
+
+# Reloan forecast from repayment cohorts, once a cohort checkpoint exists
+reloan_forecast_total = None
+reloan_version = reloan_forecast.checkpoint_version(reloan_forecast.DEFAULT_CHECKPOINT)
+if reloan_version is not None:
+    with st.sidebar.expander("📉 Reloan Forecast"):
+        reloan_cohorts = cached_reloan_cohorts(reloan_forecast.DEFAULT_CHECKPOINT, reloan_version)
+        reloan_start = st.date_input(
+            "Planning period starts",
+            value=(pd.Timestamp.today().normalize() + pd.offsets.MonthBegin(1)).date(),
+            key="reloan_start"
+        )
+        reloan_months = st.number_input("Months", min_value=1, max_value=24, value=1, step=1, key="reloan_months")
+        reloan_df = reloan_forecast.forecast(reloan_cohorts, reloan_start, reloan_months)
+        st.dataframe(
+            reloan_df.assign(Month=reloan_df['Month'].dt.strftime('%b %Y')).round(2),
+            hide_index=True,
+            use_container_width=True
+        )
+        if st.toggle("Use forecast as Reloan", key="reloan_use_forecast"):
+            reloan_forecast_total = min(round(float(reloan_df['Reloan (₹ Lakhs)'].sum()), 2), 10000000.0)
+
+if reloan_forecast_total is None:
+    reloan = st.sidebar.number_input(
+        "Reloan (₹ Lakhs)", 
+        min_value=0.0, 
+        max_value=10000000.0, 
+        value=150.0, 
+        step=10.0,
+        help="Expected reloan amount in lakhs"
+    )
+else:
+    reloan = st.sidebar.number_input(
+        "Reloan (₹ Lakhs)",
+        min_value=0.0,
+        max_value=10000000.0,
+        value=reloan_forecast_total,
+        step=10.0,
+        disabled=True,
+        help="Forecast from repayment cohorts"
+    )
+
+# Calculate Target from Marketing - in budget mode it is solved from the
+# budget once the channel splits are known
+if budget_mode:
+    target_from_marketing = None
+else:
+    target_from_marketing = target - reloan
+
+    # Display calculated value
+    st.sidebar.markdown("### 📊 Calculated Value")
+    st.sidebar.markdown(f"""
+    <div class='calculated-value'>
+        <strong>Target from Marketing</strong><br>
+        <span style='font-size: 1.5rem; color: #1f77b4;'>₹{target_from_marketing:.2f} L</span><br>
+        <small style='color: #666;'>Target ({target:.0f}) - Reloan ({reloan:.0f})</small>
+    </div>
+    """, unsafe_allow_html=True)
 
 st.sidebar.markdown("---")
 
@@ -159,6 +239,14 @@ avg_ticket_size = st.sidebar.number_input(
     help="Average loan amount per customer in lakhs"
 )
 
+def budget_target_from_marketing(channels):
+    """Target from marketing the marketing budget pays for with these channels' splits"""
+    _, budget_cpl, budget_conv, budget_split = planning.channel_arrays(channels)
+    return float(planning.target_for_budget(
+        marketing_budget, budget_cpl, budget_conv, budget_split, avg_ticket_size, planning.curve_arrays(channels)
+    )[0])
+
+
 # Channel configuration
 st.sidebar.header("Channel Configuration")
 
@@ -181,9 +269,46 @@ if admin_password and not is_admin:
 elif is_admin:
     st.sidebar.success("✅ Admin access granted")
 
-# Initialize session state for channels if not exists
+@st.cache_data(max_entries=64, show_spinner=False)
+def cached_channel_set(name, version):
+    """Saved channel set, parsed once per saved version"""
+    return channel_store.load_set(name)
+
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def cached_ingest_aggregates(checkpoint_dir, version):
+    """Lead log aggregates, re-read only when the checkpoint changes"""
+    return ingest.load_checkpoint(checkpoint_dir)[1]
+
+
+@st.cache_data(max_entries=4, show_spinner="Attributing conversions...")
+def cached_attribution(touch_uploads, conversion_uploads, model):
+    """Per-channel attribution, matched and total converting users for uploaded (file name, bytes) files"""
+    def frames(uploads, columns):
+        for name, data in uploads:
+            if name.endswith('.parquet'):
+                yield pd.read_parquet(io.BytesIO(data), columns=columns)
+            else:
+                yield from pd.read_csv(io.BytesIO(data), usecols=columns, chunksize=1000000)
+    
+    paths = attribution.build_paths(
+        frames(touch_uploads, attribution.TOUCH_COLUMNS),
+        frames(conversion_uploads, attribution.CONVERSION_COLUMNS)
+    )
+    return attribution.channel_rates(paths, model), int(paths.converted.sum()), paths.conversions
+
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def cached_curve_fit(checkpoint_dir, version, kind, start, end):
+    """Fitted response curves per channel for one checkpoint, curve type and window range"""
+    return response_curves.fit_curves(cached_ingest_aggregates(checkpoint_dir, version), kind, start, end)
+
+
+# Initialize session state for channels if not exists - from the saved
+# default set when there is one
 if 'channels' not in st.session_state:
-    st.session_state.channels = [
+    saved_channels = cached_channel_set(channel_store.DEFAULT_SET, channel_store.set_version(channel_store.DEFAULT_SET))
+    st.session_state.channels = saved_channels if saved_channels is not None else [
         {'name': 'Google Ads', 'cpl': 50.0, 'conv': 9.60, 'budget': 45.0},
         {'name': 'Meta Ads', 'cpl': 50.0, 'conv': 4.80, 'budget': 40.0},
         {'name': 'RCS & SMS', 'cpl': 200.0, 'conv': 2.00, 'budget': 5.0},
@@ -194,140 +319,376 @@ if 'channels' not in st.session_state:
 # Only show channel editing section if admin is authenticated
 if is_admin:
     st.sidebar.markdown("---")
-    
-    # Add new channel button
     st.sidebar.markdown("### Edit Channel Parameters")
-    col1, col2 = st.sidebar.columns([3, 1])
-    with col1:
-        if st.button("➕ Add New Channel", use_container_width=True):
-            st.session_state.channels.append({
-                'name': f'Channel {len(st.session_state.channels) + 1}',
-                'cpl': 100.0,
-                'conv': 2.0,
-                'budget': 0.0
-            })
-            st.rerun()
-
-    # Display and edit channels
-    edited_channels = []
-    channels_to_remove = []
-
-    for idx, channel in enumerate(st.session_state.channels):
-        st.sidebar.markdown(f"**Channel {idx + 1}**")
-        
-        col1, col2 = st.sidebar.columns([4, 1])
-        
+    
+    # Bulk grid editor runs as a fragment so edits don't rerun the whole page
+    with st.sidebar:
+        channel_editor.bulk_editor()
+    
+    # Saved channel sets
+    st.sidebar.markdown("### 💾 Saved Channel Sets")
+    saved_sets = [name for name, _ in channel_store.list_sets()]
+    if saved_sets:
+        selected_set = st.sidebar.selectbox("Channel Set", saved_sets, key="selected_channel_set")
+        col1, col2 = st.sidebar.columns(2)
         with col1:
-            channel_name = st.text_input(
-                "Channel Name",
-                value=channel['name'],
-                key=f"name_{idx}",
-                label_visibility="collapsed"
-            )
-        
+            if st.button("📂 Load", use_container_width=True, key="load_channel_set"):
+                st.session_state.channels = cached_channel_set(selected_set, channel_store.set_version(selected_set))
+                channel_editor.reset_editor()
+                st.rerun()
         with col2:
-            if st.button("🗑️", key=f"del_{idx}", help="Delete channel"):
-                channels_to_remove.append(idx)
-        
-        col1, col2, col3 = st.sidebar.columns(3)
+            if st.button("🗑️ Delete", use_container_width=True, key="delete_channel_set"):
+                channel_store.delete_set(selected_set)
+                st.rerun()
+    
+    save_name = st.sidebar.text_input(
+        "Save current channels as",
+        value=channel_store.DEFAULT_SET,
+        key="save_channel_set_name",
+        help=f"The '{channel_store.DEFAULT_SET}' set is loaded when a new session starts"
+    )
+    if st.sidebar.button("💾 Save Channel Set", use_container_width=True, disabled=not save_name.strip()):
+        channel_store.save_set(save_name.strip(), st.session_state.channels)
+        # Every saved plan is also kept as a versioned snapshot for audits
+        snapshot_target = reloan + budget_target_from_marketing(st.session_state.channels) if budget_mode else target
+        snapshots.save_snapshot(save_name.strip(), st.session_state.channels, snapshot_target, reloan, avg_ticket_size)
+        st.sidebar.success(f"Saved {len(st.session_state.channels)} channels as '{save_name.strip()}'")
+    
+    with st.sidebar.expander("📥 Import / 📤 Export"):
+        uploaded_channels = st.file_uploader("Import CSV or Parquet", type=['csv', 'parquet'], key="channel_file")
+        if uploaded_channels is not None and st.button("Replace Channels with File", use_container_width=True):
+            try:
+                st.session_state.channels = channel_store.read_file(
+                    uploaded_channels,
+                    'parquet' if uploaded_channels.name.endswith('.parquet') else 'csv'
+                )
+            except ValueError as e:
+                st.error(f"⚠️ {e}")
+            else:
+                channel_editor.reset_editor()
+                st.rerun()
         
+        # Files are only encoded when a download is clicked, not on every rerun
+        export_channels = st.session_state.channels
+        col1, col2 = st.columns(2)
         with col1:
-            cpl = st.number_input(
-                "CPL", 
-                min_value=0.0, 
-                max_value=10000000.0, 
-                value=float(channel['cpl']), 
-                step=0.1,
-                key=f"cpl_{idx}"
+            st.download_button(
+                "CSV",
+                lambda: channel_store.to_bytes(export_channels, 'csv'),
+                file_name="channels.csv",
+                mime="text/csv",
+                use_container_width=True
             )
-        
         with col2:
-            conv = st.number_input(
-                "Conv %", 
-                min_value=0.1, 
-                max_value=100.0, 
-                value=float(channel['conv']), 
-                step=0.1,
-                key=f"conv_{idx}"
+            st.download_button(
+                "Parquet",
+                lambda: channel_store.to_bytes(export_channels, 'parquet'),
+                file_name="channels.parquet",
+                mime="application/octet-stream",
+                use_container_width=True
             )
-        
-        with col3:
-            budget = st.number_input(
-                "Budget %", 
-                min_value=0.0, 
-                max_value=100.0, 
-                value=float(channel['budget']), 
-                step=1.0,
-                key=f"budget_{idx}"
+    
+    # Actual CPL and Conversion % from the lead log ingestion checkpoint
+    with st.sidebar.expander("📈 Update from Lead Logs"):
+        ingest_version = ingest.checkpoint_version(ingest.DEFAULT_CHECKPOINT)
+        if ingest_version is None:
+            st.caption("No lead log checkpoint yet. Run `python ingest.py` to build one.")
+        else:
+            ingest_aggregates = cached_ingest_aggregates(ingest.DEFAULT_CHECKPOINT, ingest_version)
+            first_window = ingest_aggregates['window_start'].min().date()
+            last_window = ingest_aggregates['window_start'].max().date()
+            ingest_range = st.date_input(
+                "Windows",
+                value=(first_window, last_window),
+                min_value=first_window,
+                max_value=last_window,
+                key="ingest_range"
             )
-        
-        edited_channels.append({
-            'name': channel_name,
-            'cpl': cpl,
-            'conv': conv,
-            'budget': budget
-        })
-        
-        st.sidebar.markdown("---")
-
-    # Remove channels marked for deletion
-    if channels_to_remove:
-        for idx in sorted(channels_to_remove, reverse=True):
-            st.session_state.channels.pop(idx)
-        st.rerun()
+            # The range is partial while the user is still picking the end date
+            ingest_start = ingest_range[0] if len(ingest_range) > 0 else first_window
+            ingest_end = ingest_range[1] if len(ingest_range) > 1 else last_window
+            ingest_metrics = ingest.channel_metrics(ingest_aggregates, ingest_start, ingest_end)
+            st.dataframe(
+                ingest_metrics[['Channel', 'CPL (₹)', 'Conversion %']].round(2),
+                hide_index=True,
+                use_container_width=True
+            )
+            if st.button("Apply Actual CPL & Conversion", use_container_width=True, key="apply_ingest"):
+                st.session_state.channels = ingest.apply_to_channels(st.session_state.channels, ingest_metrics)
+                channel_editor.reset_editor()
+                st.rerun()
 
-    # Update session state with edited values
-    st.session_state.channels = edited_channels
+            # Diminishing returns: required spend follows a fitted curve instead of a constant CPL
+            st.markdown("**Response Curves**")
+            curve_type = st.radio(
+                "Curve type",
+                response_curves.CURVE_TYPES,
+                format_func=lambda kind: {'power': 'Power', 'hill': 'Hill (saturating)'}[kind],
+                horizontal=True,
+                key="curve_type"
+            )
+            curve_fit = cached_curve_fit(ingest.DEFAULT_CHECKPOINT, ingest_version, curve_type, ingest_start, ingest_end)
+            st.dataframe(curve_fit.round(3), hide_index=True, use_container_width=True)
+            st.caption(f"Channels with fewer than {response_curves.MIN_WINDOWS} windows of spend and leads keep a constant CPL.")
+            curve_col1, curve_col2 = st.columns(2)
+            with curve_col1:
+                if st.button("Fit Response Curves", use_container_width=True, key="fit_curves", disabled=len(curve_fit) == 0):
+                    st.session_state.channels = response_curves.apply_to_channels(st.session_state.channels, curve_fit, curve_type)
+                    channel_editor.reset_editor()
+                    st.rerun()
+            with curve_col2:
+                if st.button("Use Constant CPL", use_container_width=True, key="clear_curves"):
+                    st.session_state.channels = response_curves.clear_curves(st.session_state.channels)
+                    channel_editor.reset_editor()
+                    st.rerun()
+    
+    # Multi-touch Conversion % from touchpoint logs instead of last-touch guesses
+    with st.sidebar.expander("🧭 Multi-Touch Attribution"):
+        touch_files = st.file_uploader(
+            "Touch events", type=['csv', 'parquet'], accept_multiple_files=True, key="attribution_touches",
+            help="Columns: user_id, channel, touched_at"
+        )
+        conversion_files = st.file_uploader(
+            "Conversions", type=['csv', 'parquet'], accept_multiple_files=True, key="attribution_conversions",
+            help="Columns: user_id, converted_at"
+        )
+        attribution_model = st.radio(
+            "Model",
+            attribution.MODELS,
+            format_func=lambda model: {'markov': 'Markov Chain', 'position': 'Position-Based'}[model],
+            horizontal=True,
+            key="attribution_model"
+        )
+        if touch_files:
+            try:
+                attribution_rates, matched_conversions, total_conversions = cached_attribution(
+                    [(f.name, f.getvalue()) for f in touch_files],
+                    [(f.name, f.getvalue()) for f in conversion_files or []],
+                    attribution_model
+                )
+            except (ValueError, KeyError) as e:
+                st.error(f"⚠️ {e}")
+            else:
+                st.dataframe(
+                    attribution_rates[['Channel', 'Last-Touch Conversion %', 'Effective Conversion %']].round(2),
+                    hide_index=True,
+                    use_container_width=True
+                )
+                st.caption(f"Matched conversions: {matched_conversions:,} of {total_conversions:,} converting users")
+                if matched_conversions == 0:
+                    st.warning("⚠️ No conversions match a touch path, so there is nothing to apply. Check that both files use the same user IDs.")
+                elif st.button("Apply Effective Conversion %", use_container_width=True, key="apply_attribution"):
+                    st.session_state.channels = attribution.apply_to_channels(st.session_state.channels, attribution_rates)
+                    channel_editor.reset_editor()
+                    st.rerun()
 else:
     # Show current channels as read-only information
     st.sidebar.markdown("---")
     st.sidebar.markdown("### 📊 Current Channels")
     st.sidebar.info("🔒 Enter admin password above to edit channels")
+    st.sidebar.dataframe(
+        channel_editor.channels_frame(st.session_state.channels),
+        hide_index=True,
+        use_container_width=True
+    )
+
+# Budget split mode - manual entry or optimizer
+st.sidebar.markdown("---")
+st.sidebar.markdown("### 🎯 Budget Split Mode")
+split_mode = st.sidebar.radio(
+    "Budget Split Mode",
+    ['Manual', 'Minimize Spend for Target', 'Maximize Disbursement for Spend Cap'],
+    key="split_mode",
+    label_visibility="collapsed",
+    help="Let the optimizer fill in Budget Split % from channel CPL and conversion"
+)
+
+plan_channels = st.session_state.channels
+
+if split_mode != 'Manual' and len(st.session_state.channels) > 0:
+    curve_channels = [ch['name'] for ch in st.session_state.channels if ch.get('curve')]
+    if curve_channels:
+        # The fill ranks channels by constant cost per disbursed lead
+        st.sidebar.warning(
+            f"⚠️ Fitted response curves are set for {', '.join(curve_channels)}, but the optimizer splits the "
+            "budget at each channel's constant CPL. The plan below prices the split on the curves, so its spend can "
+            "differ from the optimizer's and can be infinite past a Hill curve's ceiling."
+        )
+    if budget_mode:
+        # A fixed budget is the spend cap, so both optimizer modes maximize disbursement for it
+        spend_cap = marketing_budget
+    elif split_mode == 'Maximize Disbursement for Spend Cap':
+        spend_cap = st.sidebar.number_input(
+            "Marketing Spend Cap (₹ Lakhs)",
+            min_value=0.0,
+            max_value=10000000.0,
+            value=10.0,
+            step=1.0,
+            key="spend_cap",
+            help="Maximum marketing spend in lakhs"
+        )
     
-    for idx, channel in enumerate(st.session_state.channels):
-        st.sidebar.markdown(f"**{channel['name']}**")
-        st.sidebar.text(f"CPL: ₹{channel['cpl']} | Conv: {channel['conv']}% | Budget: {channel['budget']}%")
-
-# Create dataframe from current channels
-channel_df = pd.DataFrame([
-    {
-        'Channel': ch['name'],
-        'CPL': ch['cpl'],
-        'Conversion %': ch['conv'],
-        'Budget Split %': ch['budget']
-    }
-    for ch in st.session_state.channels
-])
+    # Per-channel limits live on the channel dicts so they survive edits
+    if is_admin:
+        with st.sidebar.expander("Optimizer Constraints"):
+            constraints_df = pd.DataFrame({
+                'Channel': [ch['name'] for ch in st.session_state.channels],
+                'Min %': [float(ch.get('min_share', 0.0)) for ch in st.session_state.channels],
+                'Max %': [float(ch.get('max_share', 100.0)) for ch in st.session_state.channels],
+                'Max Leads': [ch.get('max_leads') for ch in st.session_state.channels]
+            }).astype({'Max Leads': float})
+            edited_constraints = st.data_editor(
+                constraints_df,
+                disabled=['Channel'],
+                hide_index=True,
+                key="optimizer_constraints"
+            )
+            for channel, row in zip(st.session_state.channels, edited_constraints.itertuples(index=False)):
+                channel['min_share'] = float(row[1])
+                channel['max_share'] = float(row[2])
+                channel['max_leads'] = None if pd.isna(row[3]) else float(row[3])
+    
+    _, opt_cpl, opt_conv, _ = planning.channel_arrays(st.session_state.channels)
+    min_share = [ch.get('min_share', 0.0) for ch in st.session_state.channels]
+    max_share = [ch.get('max_share', 100.0) for ch in st.session_state.channels]
+    max_leads = [ch.get('max_leads') for ch in st.session_state.channels]
+    
+    try:
+        if split_mode == 'Minimize Spend for Target' and not budget_mode:
+            optimized_split = optimizer.min_spend_split(
+                opt_cpl, opt_conv, target_from_marketing, avg_ticket_size,
+                min_share, max_share, max_leads
+            )
+        else:
+            optimized_split, target_from_marketing = optimizer.max_disbursement_split(
+                opt_cpl, opt_conv, avg_ticket_size, spend_cap,
+                min_share, max_share, max_leads
+            )
+            target = reloan + target_from_marketing
+            st.sidebar.markdown(f"""
+            <div class='calculated-value'>
+                <strong>Achievable Target from Marketing</strong><br>
+                <span style='font-size: 1.5rem; color: #1f77b4;'>₹{target_from_marketing:.2f} L</span>
+            </div>
+            """, unsafe_allow_html=True)
+        
+        plan_channels = [
+            {**ch, 'budget': round(float(share), 6)}
+            for ch, share in zip(st.session_state.channels, optimized_split)
+        ]
+        st.sidebar.dataframe(
+            pd.DataFrame({
+                'Channel': [ch['name'] for ch in plan_channels],
+                'Budget Split %': [ch['budget'] for ch in plan_channels]
+            }).round(2),
+            hide_index=True,
+            use_container_width=True
+        )
+        
+        if is_admin and st.sidebar.button("Apply Optimized Split to Channels", use_container_width=True):
+            st.session_state.channels = plan_channels
+            channel_editor.reset_editor()
+            st.rerun()
+    except ValueError as e:
+        st.sidebar.error(f"⚠️ {e}")
+
+# Budget mode with the current splits: the largest target the budget pays for
+if budget_mode and target_from_marketing is None:
+    target_from_marketing = budget_target_from_marketing(plan_channels)
+    target = reloan + target_from_marketing
+    st.sidebar.markdown(f"""
+    <div class='calculated-value'>
+        <strong>Achievable Target from Marketing</strong><br>
+        <span style='font-size: 1.5rem; color: #1f77b4;'>₹{target_from_marketing:.2f} L</span><br>
+        <small style='color: #666;'>Total with Reloan: ₹{target:.2f} L</small>
+    </div>
+    """, unsafe_allow_html=True)
 
 # Validate budget split
-total_budget_split = channel_df['Budget Split %'].sum()
-if total_budget_split != 100:
+total_budget_split = planning.channel_arrays(plan_channels)[3].sum()
+if abs(total_budget_split - 100) > optimizer.SPLIT_TOLERANCE:
     st.sidebar.error(f"⚠️ Budget split must equal 100%. Current: {total_budget_split:.1f}%")
 
 # Calculate derived values using target_from_marketing
-disbursal_leads_required = int(target_from_marketing / avg_ticket_size) if target_from_marketing > 0 else 0
-
-# Main calculations
-results = []
-for idx, row in channel_df.iterrows():
-    channel_target = target_from_marketing * (row['Budget Split %'] / 100)
-    leads_to_disburse = int(channel_target / avg_ticket_size) if avg_ticket_size > 0 else 0
-    leads_required = int(leads_to_disburse / (row['Conversion %'] / 100)) if row['Conversion %'] > 0 else 0
-    amount_to_spend = (leads_required * row['CPL']) / 100000  # Convert to lakhs
-    
-    results.append({
-        'Channel': row['Channel'],
-        'Amount to Disburse (₹ Lakhs)': channel_target,
-        'Leads to Disburse': leads_to_disburse,
-        'Leads Required': leads_required,
-        'Marketing Spend (₹ Lakhs)': amount_to_spend,
-        'CPL (₹)': row['CPL'],
-        'Conversion %': row['Conversion %']
-    })
-
-results_df = pd.DataFrame(results)
+disbursal_leads_required = planning.disbursal_leads_required(target_from_marketing, avg_ticket_size)
+
+@st.cache_resource
+def job_manager():
+    """Background job manager shared by every session"""
+    return jobs.JobManager()
+
+
+# Seconds between refreshes of a running job's progress and partial results
+JOB_POLL_SECONDS = 0.5
+
+
+# Cached computation layer - shared across sessions and keyed on a hash of
+# the channel config plus the top-level inputs, so repeated inputs from any
+# planner are served without recomputing frames or rebuilding figures
+CACHE_MAX_ENTRIES = 512
+CACHE_TTL = "1h"
+
+
+@st.cache_data(max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL, show_spinner=False)
+def cached_results(plan_key, _channels, target, reloan, avg_ticket_size, _model=None):
+    """Per-channel results frame for one plan, taken from a session's up-to-date plan model when given"""
+    if _model is not None:
+        return _model.frame()
+    results = planning.plan_results(_channels, target, reloan, avg_ticket_size)
+    run_profile.count("Rows computed", len(results))
+    return results
+
+
+@st.cache_data(max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL, show_spinner=False)
+def cached_summary(plan_key, _results_df):
+    """Typed Channel Performance Summary frame, its display strings and the TOTAL footer"""
+    detailed_df = summary_table.summary_frame(_results_df)
+    footer = summary_table.footer_strings(summary_table.summary_totals(detailed_df))
+    return detailed_df, summary_table.display_strings(detailed_df), footer
+
+
+@st.cache_data(max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL, show_spinner=False)
+def cached_figure(plan_key, name, _results_df):
+    """One Visual Analytics figure serialized to JSON"""
+    run_profile.count("Figures built")
+    return charts.FIGURES[name](_results_df).to_json()
+
+
+def show_figure(name):
+    """Build (or fetch from cache) and render one Visual Analytics figure"""
+    import plotly.io as pio
+
+    run_profile.count("Figures rendered")
+    figure_json = cached_figure(plan_key, name, results_df)
+    st.plotly_chart(pio.from_json(figure_json, skip_invalid=True), use_container_width=True)
+
+
+# Main calculations - the plan model lives in the session and recomputes
+# only the channels that changed since the last rerun; full rebuilds start
+# from the cross-session results cache
+run_profile.checkpoint("Main calculations")
+plan_key = planning.plan_cache_key(plan_channels, target, reloan, avg_ticket_size)
+plan_model = st.session_state.get('plan_model')
+if plan_model is not None and plan_model.sync(plan_channels, target, reloan, avg_ticket_size):
+    run_profile.count("Rows computed", plan_model.last_recomputed)
+    if plan_model.last_recomputed > 0:
+        # Share the edited plan with other sessions that reach the same inputs
+        cached_results(plan_key, plan_channels, target, reloan, avg_ticket_size, plan_model)
+else:
+    plan_model = incremental.IncrementalPlan(
+        plan_channels, target, reloan, avg_ticket_size,
+        cached_results(plan_key, plan_channels, target, reloan, avg_ticket_size)
+    )
+    st.session_state.plan_model = plan_model
+results_df = plan_model.frame()
+
+# A Hill curve tops out at its ceiling, so some lead counts can't be bought at any spend
+saturated = results_df.loc[results_df['Marketing Spend (₹ Lakhs)'] == float('inf'), 'Channel']
+if len(saturated) > 0:
+    st.warning(f"⚠️ {', '.join(saturated)} can't reach the required leads on the fitted response curve. Lower the Budget % or the target.")
 
 # Main content area - Updated metrics with colorful cards
+run_profile.checkpoint("Metric cards")
 col1, col2, col3, col4, col5 = st.columns(5)
 
 with col1:
@@ -358,7 +719,7 @@ with col4:
     st.markdown(f"""
     <div class="metric-card card-purple">
         <h3>Total Leads Required</h3>
-        <p>{format_indian_number(results_df['Leads Required'].sum())}</p>
+        <p>{format_indian_number(plan_model.totals['Leads Required'])}</p>
     </div>
     """, unsafe_allow_html=True)
 
@@ -366,263 +727,153 @@ with col5:
     st.markdown(f"""
     <div class="metric-card card-teal">
         <h3>Total Marketing Spend</h3>
-        <p>₹{results_df['Marketing Spend (₹ Lakhs)'].sum():.1f} L</p>
+        <p>₹{plan_model.totals['Marketing Spend (₹ Lakhs)']:.1f} L</p>
     </div>
     """, unsafe_allow_html=True)
 
 # Main content sections - all on one page
 
 # Section 1: Detailed Results Table
+run_profile.checkpoint("Summary table")
 st.header("📊 Channel Performance Summary")
 
 if len(results_df) > 0:
     # Create comprehensive results table
-    detailed_df = results_df.copy()
+    detailed_df, summary_display_df, summary_footer = cached_summary(plan_key, results_df)
     
-    # Add ROI and Cost per Disbursed Lead columns
-    detailed_df['ROI'] = (detailed_df['Amount to Disburse (₹ Lakhs)'] / detailed_df['Marketing Spend (₹ Lakhs)']).replace([float('inf'), -float('inf')], 0).round(2)
-    detailed_df['Cost per Disbursed Lead'] = ((detailed_df['Marketing Spend (₹ Lakhs)'] * 100000) / (detailed_df['Amount to Disburse (₹ Lakhs)'] / avg_ticket_size)).replace([float('inf'), -float('inf')], 0).round(0)  # Round to whole number
+    # Paginate large channel counts; the header and TOTAL footer stay pinned
+    page_start, page_stop = 0, len(summary_display_df)
+    if len(summary_display_df) > summary_table.PAGE_SIZE:
+        page_count = -(-len(summary_display_df) // summary_table.PAGE_SIZE)
+        page = st.number_input("Page", min_value=1, max_value=page_count, value=1, step=1, key="summary_page")
+        page_start = (page - 1) * summary_table.PAGE_SIZE
+        page_stop = min(page_start + summary_table.PAGE_SIZE, len(summary_display_df))
+        st.caption(f"Showing channels {page_start + 1}-{page_stop} of {format_indian_number(len(summary_display_df))}")
     
-    # Add serial number column starting from 1
-    detailed_df.insert(0, 'S.No', range(1, len(detailed_df) + 1))
+    st.markdown(
+        summary_table.summary_html(summary_display_df, summary_footer, page_start, page_stop),
+        unsafe_allow_html=True
+    )
+    run_profile.count("Table rows rendered", page_stop - page_start)
     
-    # Reorder columns for better readability
-    detailed_df = detailed_df[[
-        'S.No',
-        'Channel',
-        'CPL (₹)',
-        'Conversion %',
-        'Leads Required',
-        'Leads to Disburse',
-        'Marketing Spend (₹ Lakhs)',
-        'Amount to Disburse (₹ Lakhs)',
-        'ROI',
-        'Cost per Disbursed Lead'
-    ]]
-    
-    # Add totals row
-    totals = {
-        'S.No': '-',
-        'Channel': 'TOTAL',
-        'CPL (₹)': '-',
-        'Conversion %': '-',
-        'Leads Required': detailed_df['Leads Required'].sum(),
-        'Leads to Disburse': detailed_df['Leads to Disburse'].sum(),
-        'Marketing Spend (₹ Lakhs)': detailed_df['Marketing Spend (₹ Lakhs)'].sum(),
-        'Amount to Disburse (₹ Lakhs)': detailed_df['Amount to Disburse (₹ Lakhs)'].sum(),
-        'ROI': '-',
-        'Cost per Disbursed Lead': '-'
-    }
-    
-    detailed_df = pd.concat([detailed_df, pd.DataFrame([totals])], ignore_index=True)
-    
-    # Display the table with formatting
-    styled_df = detailed_df.style.format({
-        'S.No': lambda x: x if x != '-' else '-',
-        'CPL (₹)': lambda x: f'₹{x}' if x != '-' else '-',
-        'Conversion %': lambda x: f'{x}%' if x != '-' else '-',
-        'Leads Required': lambda x: format_indian_number(x) if x != '-' else '-',
-        'Leads to Disburse': lambda x: format_indian_number(x) if x != '-' else '-',
-        'Marketing Spend (₹ Lakhs)': '₹{:.2f} L',
-        'Amount to Disburse (₹ Lakhs)': '₹{:.1f} L',
-        'ROI': lambda x: f'{x}x' if isinstance(x, (int, float)) and x != '-' else '-',
-        'Cost per Disbursed Lead': lambda x: f'₹{int(x)}' if isinstance(x, (int, float)) and x != '-' else '-'
-    })
-    
-    # Apply bold styling and background to TOTAL row
-    def highlight_total(row):
-        if row['Channel'] == 'TOTAL':
-            return ['font-weight: bold; background-color: #e3f2fd; color: #1565c0;'] * len(row)
-        return [''] * len(row)
-    
-    # Apply alternating row colors
-    def alternating_rows(row):
-        if row.name % 2 == 0 and row['Channel'] != 'TOTAL':
-            return ['background-color: #f8f9fa;'] * len(row)
-        elif row['Channel'] != 'TOTAL':
-            return ['background-color: white;'] * len(row)
-        return [''] * len(row)
-    
-    styled_df = styled_df.apply(highlight_total, axis=1)
-    styled_df = styled_df.apply(alternating_rows, axis=1)
-    
-    # Set table properties
-    styled_df = styled_df.set_properties(**{
-        'text-align': 'center',
-        'vertical-align': 'middle',
-        'padding': '12px',
-        'border': '1px solid #dee2e6'
-    })
-    
-    # Style the header
-    styled_df = styled_df.set_table_styles([
-        {'selector': 'thead th', 
-         'props': [
-             ('background-color', '#1565c0'),
-             ('color', 'white'),
-             ('font-weight', 'bold'),
-             ('text-align', 'center'),
-             ('vertical-align', 'middle'),
-             ('padding', '12px'),
-             ('border', '1px solid #1565c0')
-         ]},
-        {'selector': 'tbody td', 
-         'props': [
-             ('border', '1px solid #dee2e6'),
-             ('text-align', 'center'),
-             ('vertical-align', 'middle')
-         ]}
-    ])
-    
-    st.dataframe(styled_df, use_container_width=True, hide_index=True)
+    # Report export - the file is only built when asked for
+    with st.expander("📤 Export Report"):
+        col1, col2 = st.columns(2)
+        with col1:
+            export_format = st.radio("Format", ['Excel', 'Parquet', 'CSV'], horizontal=True, key="export_format")
+            export_formatted = st.checkbox("Indian number formatting (₹ L)", key="export_formatted")
+        with col2:
+            export_sets = st.multiselect(
+                "Also include saved channel sets",
+                [name for name, _ in channel_store.list_sets()],
+                key="export_sets",
+                help="Each set is planned with the current Target, Reloan and Average Ticket Size"
+            )
+        
+        if st.button("Prepare Export", key="export_prepare"):
+            fmt = {'Excel': 'xlsx', 'Parquet': 'parquet', 'CSV': 'csv'}[export_format]
+            buffer = io.BytesIO()
+            try:
+                export_rows = export.export_report(
+                    itertools.chain(
+                        [("Current plan", results_df)],
+                        export.store_scenarios(export_sets, target, reloan, avg_ticket_size)
+                    ),
+                    buffer,
+                    fmt,
+                    export_formatted
+                )
+            except ValueError as e:
+                st.error(f"⚠️ {e}")
+            else:
+                st.download_button(
+                    f"Download {format_indian_number(export_rows)} rows",
+                    buffer.getvalue(),
+                    file_name=f"marketing_plan.{fmt}",
+                    mime="application/octet-stream",
+                    on_click="ignore",
+                    key="export_download"
+                )
 else:
     st.info("Add channels to see detailed results.")
 
 st.markdown("---")
 
 # Section 2: Visual Analytics
+run_profile.checkpoint("Charts")
 st.header("📈 Visual Analytics")
 
 if len(results_df) > 0:
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        # Budget allocation pie chart
-        fig_budget = px.pie(
-            results_df, 
-            values='Marketing Spend (₹ Lakhs)', 
-            names='Channel',
-            title='Marketing Budget Allocation',
-            hole=0.4
-        )
-        fig_budget.update_traces(textposition='inside', textinfo='percent+label')
-        st.plotly_chart(fig_budget, use_container_width=True)
-    
-    with col2:
-        # Leads distribution
-        fig_leads = px.bar(
-            results_df,
-            x='Channel',
-            y='Leads Required',
-            title='Leads Required by Channel',
-            color='Conversion %',
-            color_continuous_scale='Blues',
-            text='Leads Required'
-        )
-        # Format text labels with Indian numbering
-        fig_leads.update_traces(
-            texttemplate=[format_indian_number(val) for val in results_df['Leads Required']],
-            textposition='outside'
-        )
-        # Add padding to top for labels
-        max_val = results_df['Leads Required'].max()
-        fig_leads.update_layout(
-            yaxis=dict(range=[0, max_val * 1.15])  # Add 15% padding at top
-        )
-        st.plotly_chart(fig_leads, use_container_width=True)
-    
-    # Comparison bar chart: Amount to Spend vs Amount to Disburse
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        # Create comparison dataframe
-        comparison_df = results_df[['Channel', 'Marketing Spend (₹ Lakhs)', 'Amount to Disburse (₹ Lakhs)']].copy()
-        comparison_df_melted = comparison_df.melt(
-            id_vars='Channel',
-            value_vars=['Marketing Spend (₹ Lakhs)', 'Amount to Disburse (₹ Lakhs)'],
-            var_name='Type',
-            value_name='Amount (₹ Lakhs)'
-        )
-        
-        fig_comparison = px.bar(
-            comparison_df_melted,
-            x='Channel',
-            y='Amount (₹ Lakhs)',
-            color='Type',
-            title='Spend vs Disburse Comparison by Channel',
-            barmode='group',
-            color_discrete_map={
-                'Marketing Spend (₹ Lakhs)': '#EF553B',
-                'Amount to Disburse (₹ Lakhs)': '#00CC96'
-            },
-            text='Amount (₹ Lakhs)'
-        )
-        fig_comparison.update_traces(texttemplate='₹%{text:.2f}L', textposition='outside')
-        # Add padding to top for labels
-        max_val = comparison_df_melted['Amount (₹ Lakhs)'].max()
-        fig_comparison.update_layout(
-            xaxis_title="Channel",
-            yaxis_title="Amount (₹ Lakhs)",
-            yaxis=dict(range=[0, max_val * 1.15]),  # Add 15% padding at top
-            legend_title="",
-            legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
-        )
-        st.plotly_chart(fig_comparison, use_container_width=True)
-    
-    with col2:
-        # ROI comparison
-        roi_df = results_df.copy()
-        roi_df['ROI'] = (roi_df['Amount to Disburse (₹ Lakhs)'] / roi_df['Marketing Spend (₹ Lakhs)']).replace([float('inf'), -float('inf')], 0)
-        
-        fig_roi = px.bar(
-            roi_df.sort_values('ROI', ascending=True),
-            x='ROI',
-            y='Channel',
-            orientation='h',
-            title='Return on Investment by Channel',
-            color='ROI',
-            color_continuous_scale='Greens',
-            text='ROI'
-        )
-        fig_roi.update_traces(texttemplate='%{text:.2f}x', textposition='outside')
-        # Add padding to right for labels
-        max_val = roi_df['ROI'].max()
-        fig_roi.update_layout(
-            showlegend=False,
-            xaxis=dict(range=[0, max_val * 1.15])  # Add 15% padding on right
+    # Charts are drawn only when asked for - plotly isn't even imported until
+    # then. Tabs and expanders would still run every chart on each rerun
+    if st.toggle("Show charts", key="charts_mode"):
+        chart_choice = st.radio(
+            "Chart",
+            ['All'] + list(charts.TITLES.values()),
+            horizontal=True,
+            key="chart_choice",
+            label_visibility="collapsed"
         )
-        st.plotly_chart(fig_roi, use_container_width=True)
+        if chart_choice == 'All':
+            col1, col2 = st.columns(2)
+            
+            with col1:
+                # Budget allocation pie chart
+                show_figure('budget')
+            
+            with col2:
+                # Leads distribution
+                show_figure('leads')
+            
+            # Comparison bar chart: Amount to Spend vs Amount to Disburse
+            col1, col2 = st.columns(2)
+            
+            with col1:
+                show_figure('comparison')
+            
+            with col2:
+                # ROI comparison
+                show_figure('roi')
+        else:
+            show_figure(next(name for name, title in charts.TITLES.items() if title == chart_choice))
 else:
     st.info("Add channels to see the charts.")
 
 st.markdown("---")
 
 # Section 3: Key Insights & Recommendations
+run_profile.checkpoint("Key Insights")
 st.header("💡 Key Insights")
 
 if len(results_df) > 0:
-    # Calculate insights
-    roi_df = results_df.copy()
-    roi_df['ROI'] = (roi_df['Amount to Disburse (₹ Lakhs)'] / roi_df['Marketing Spend (₹ Lakhs)']).replace([float('inf'), -float('inf')], 0)
-    
-    # Find best and worst performing channels
-    max_roi = roi_df['ROI'].max()
-    min_roi = roi_df['ROI'].min()
-    
-    best_roi_channels = roi_df[roi_df['ROI'] == max_roi]['Channel'].tolist()
-    worst_roi_channels = roi_df[roi_df['ROI'] == min_roi]['Channel'].tolist()
+    # Find best and worst performing channels - kept up to date by the plan model
+    max_roi, best_roi_channels, min_roi, worst_roi_channels = plan_model.roi_extremes()
     
-    highest_spend_channel = results_df.loc[results_df['Marketing Spend (₹ Lakhs)'].idxmax(), 'Channel']
+    highest_spend_channel = plan_model.highest_spend_channel()
     
     col1, col2 = st.columns(2)
     
     with col1:
-        best_channels_text = ', '.join(best_roi_channels) if len(best_roi_channels) > 1 else best_roi_channels[0]
-        st.info(f"""
-        **🏆 Best Performing Channel{'s' if len(best_roi_channels) > 1 else ''}**
-        
-        {best_channels_text} show{'s' if len(best_roi_channels) == 1 else ''} the highest ROI of {max_roi:.2f}x
-        """)
-        
-        worst_channels_text = ', '.join(worst_roi_channels) if len(worst_roi_channels) > 1 else worst_roi_channels[0]
-        st.warning(f"""
-        **⚠️ Channel{'s' if len(worst_roi_channels) > 1 else ''} Requiring Attention**
-        
-        {worst_channels_text} ha{'s' if len(worst_roi_channels) == 1 else 've'} the lowest ROI of {min_roi:.2f}x
-        """)
+        if not best_roi_channels:
+            # Every channel has no spend or infinite spend on a saturated response curve
+            st.info("No channel has a finite ROI in this plan.")
+        else:
+            best_channels_text = ', '.join(best_roi_channels) if len(best_roi_channels) > 1 else best_roi_channels[0]
+            st.info(f"""
+            **🏆 Best Performing Channel{'s' if len(best_roi_channels) > 1 else ''}**
+            
+            {best_channels_text} show{'s' if len(best_roi_channels) == 1 else ''} the highest ROI of {max_roi:.2f}x
+            """)
+            
+            worst_channels_text = ', '.join(worst_roi_channels) if len(worst_roi_channels) > 1 else worst_roi_channels[0]
+            st.warning(f"""
+            **⚠️ Channel{'s' if len(worst_roi_channels) > 1 else ''} Requiring Attention**
+            
+            {worst_channels_text} ha{'s' if len(worst_roi_channels) == 1 else 've'} the lowest ROI of {min_roi:.2f}x
+            """)
     
     with col2:
-        total_spend = results_df['Marketing Spend (₹ Lakhs)'].sum()
+        total_spend = plan_model.totals['Marketing Spend (₹ Lakhs)']
         if total_spend > 0:
             st.success(f"""
             **💰 Budget Efficiency**
@@ -639,6 +890,557 @@ if len(results_df) > 0:
 else:
     st.info("Add channels to see insights and recommendations.")
 
+st.markdown("---")
+
+# Section 4: Scenario Sweep
+run_profile.checkpoint("Scenario Sweep")
+st.header("🔁 Scenario Sweep")
+
+if len(results_df) > 0:
+    if st.toggle("Sweep Target, Reloan and Average Ticket Size", key="sweep_mode"):
+        import plotly.express as px
+
+        st.markdown("*Computes leads required and marketing spend for every combination of the ranges below*")
+        col1, col2, col3 = st.columns(3)
+        
+        with col1:
+            sweep_target_min = st.number_input("Target from (₹ Lakhs)", min_value=0.0, value=max(target - 100.0, 0.0), step=10.0, key="sweep_target_min")
+            sweep_target_max = st.number_input("Target to (₹ Lakhs)", min_value=0.0, value=target + 100.0, step=10.0, key="sweep_target_max")
+            sweep_target_step = st.number_input("Target step", min_value=0.0, value=10.0, step=1.0, key="sweep_target_step")
+        
+        with col2:
+            sweep_reloan_min = st.number_input("Reloan from (₹ Lakhs)", min_value=0.0, value=max(reloan - 50.0, 0.0), step=10.0, key="sweep_reloan_min")
+            sweep_reloan_max = st.number_input("Reloan to (₹ Lakhs)", min_value=0.0, value=reloan + 50.0, step=10.0, key="sweep_reloan_max")
+            sweep_reloan_step = st.number_input("Reloan step", min_value=0.0, value=10.0, step=1.0, key="sweep_reloan_step")
+        
+        with col3:
+            sweep_ticket_min = st.number_input("Ticket Size from (₹ Lakhs)", min_value=0.0, value=max(avg_ticket_size - 0.1, 0.05), step=0.05, key="sweep_ticket_min")
+            sweep_ticket_max = st.number_input("Ticket Size to (₹ Lakhs)", min_value=0.0, value=avg_ticket_size + 0.1, step=0.05, key="sweep_ticket_max")
+            sweep_ticket_step = st.number_input("Ticket Size step", min_value=0.0, value=0.05, step=0.01, key="sweep_ticket_step")
+        
+        _, sweep_cpl, sweep_conv, sweep_split = planning.channel_arrays(plan_channels)
+        sweep_df = planning.sweep_grid(
+            sweep_cpl,
+            sweep_conv,
+            sweep_split,
+            planning.value_range(sweep_target_min, sweep_target_max, sweep_target_step),
+            planning.value_range(sweep_reloan_min, sweep_reloan_max, sweep_reloan_step),
+            planning.value_range(sweep_ticket_min, sweep_ticket_max, sweep_ticket_step),
+            curves=planning.curve_arrays(plan_channels)
+        )
+        st.caption(f"{format_indian_number(len(sweep_df))} scenarios computed")
+        
+        # Slice the grid at one ticket size for the heatmap
+        sweep_metric = st.radio(
+            "Metric",
+            ['Marketing Spend (₹ Lakhs)', 'Leads Required'],
+            horizontal=True,
+            key="sweep_metric"
+        )
+        ticket_values = sweep_df['Average Ticket Size (₹ Lakhs)'].unique()
+        sweep_ticket = st.select_slider(
+            "Average Ticket Size (₹ Lakhs)",
+            options=ticket_values.tolist(),
+            format_func=lambda x: f'{x:.2f}',
+            key="sweep_ticket"
+        ) if len(ticket_values) > 1 else ticket_values[0]
+        
+        sweep_slice = sweep_df[sweep_df['Average Ticket Size (₹ Lakhs)'] == sweep_ticket]
+        heatmap_df = sweep_slice.pivot(
+            index='Reloan (₹ Lakhs)',
+            columns='Target (₹ Lakhs)',
+            values=sweep_metric
+        )
+        fig_sweep = px.imshow(
+            heatmap_df,
+            aspect='auto',
+            origin='lower',
+            color_continuous_scale='Blues',
+            title=f'{sweep_metric} at Average Ticket Size ₹{sweep_ticket:.2f} L',
+            labels={'color': sweep_metric}
+        )
+        st.plotly_chart(fig_sweep, use_container_width=True)
+        
+        st.dataframe(sweep_slice, use_container_width=True, hide_index=True)
+    
+    # Budget frontier - every budget level solved at once with the current splits
+    if st.toggle("Chart disbursement across marketing budgets", key="frontier_mode"):
+        import plotly.express as px
+
+        current_spend = plan_model.totals['Marketing Spend (₹ Lakhs)']
+        default_max = round(current_spend * 2, 1) if 0 < current_spend < float('inf') else 100.0
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            frontier_min = st.number_input("Budget from (₹ Lakhs)", min_value=0.0, value=0.0, step=1.0, key="frontier_min")
+        with col2:
+            frontier_max = st.number_input("Budget to (₹ Lakhs)", min_value=0.0, value=default_max, step=1.0, key="frontier_max")
+        with col3:
+            frontier_step = st.number_input("Budget step", min_value=0.0, value=max(round(default_max / 50, 2), 0.01), step=0.1, key="frontier_step")
+        
+        _, frontier_cpl, frontier_conv, frontier_split = planning.channel_arrays(plan_channels)
+        frontier_df = planning.budget_frontier(
+            planning.value_range(frontier_min, frontier_max, frontier_step),
+            frontier_cpl,
+            frontier_conv,
+            frontier_split,
+            reloan,
+            avg_ticket_size,
+            planning.curve_arrays(plan_channels)
+        )
+        st.caption(f"{format_indian_number(len(frontier_df))} budget levels computed")
+        
+        fig_frontier = px.line(
+            frontier_df,
+            x='Marketing Budget (₹ Lakhs)',
+            y='Disbursement from Marketing (₹ Lakhs)',
+            hover_data=['Total Disbursement (₹ Lakhs)', 'Leads Required', 'Marketing Spend (₹ Lakhs)', 'ROI'],
+            title='Disbursement from Marketing by Budget',
+            markers=len(frontier_df) <= 60
+        )
+        if 0 < current_spend < float('inf'):
+            fig_frontier.add_scatter(
+                x=[current_spend],
+                y=[plan_model.totals['Amount to Disburse (₹ Lakhs)']],
+                mode='markers',
+                marker={'size': 12, 'color': '#d62728'},
+                name='Current plan'
+            )
+        st.plotly_chart(fig_frontier, use_container_width=True)
+        
+        st.dataframe(frontier_df.round(2), use_container_width=True, hide_index=True)
+else:
+    st.info("Add channels to run a scenario sweep.")
+
+st.markdown("---")
+
+# Section 5: Uncertainty Simulation
+run_profile.checkpoint("Uncertainty Simulation")
+st.header("🎲 Uncertainty Simulation")
+
+if len(results_df) > 0:
+    if st.toggle("Simulate week-to-week variation in CPL and Conversion %", key="simulation_mode"):
+        curve_channels = [ch['name'] for ch in plan_channels if ch.get('curve')]
+        if curve_channels:
+            # The simulation draws around a constant CPL per channel
+            st.warning(
+                f"⚠️ Fitted response curves are set for {', '.join(curve_channels)}, but the simulation varies "
+                "each channel's CPL input at constant cost per lead. Its bands won't match the plan above for these channels."
+            )
+        col1, col2, col3, col4 = st.columns(4)
+        
+        with col1:
+            sim_draws = st.number_input("Draws", min_value=1000, max_value=10000000, value=100000, step=10000, key="sim_draws")
+        with col2:
+            default_cpl_cv = st.number_input("Default CPL Variation (%)", min_value=0.0, max_value=200.0, value=20.0, step=1.0, key="sim_cpl_cv")
+        with col3:
+            default_conv_cv = st.number_input("Default Conversion Variation (%)", min_value=0.0, max_value=200.0, value=20.0, step=1.0, key="sim_conv_cv")
+        with col4:
+            sim_workers = st.number_input("Worker Processes", min_value=1, max_value=32, value=1, step=1, key="sim_workers")
+        
+        # Per-channel variation overrides live on the channel dicts
+        if is_admin:
+            with st.expander("Per-Channel Variation"):
+                variation_df = pd.DataFrame({
+                    'Channel': [ch['name'] for ch in st.session_state.channels],
+                    'CPL Variation (%)': [ch.get('cpl_cv') for ch in st.session_state.channels],
+                    'Conversion Variation (%)': [ch.get('conv_cv') for ch in st.session_state.channels]
+                }).astype({'CPL Variation (%)': float, 'Conversion Variation (%)': float})
+                edited_variation = st.data_editor(
+                    variation_df,
+                    disabled=['Channel'],
+                    hide_index=True,
+                    key="simulation_variation"
+                )
+                for channel, row in zip(st.session_state.channels, edited_variation.itertuples(index=False)):
+                    channel['cpl_cv'] = None if pd.isna(row[1]) else float(row[1])
+                    channel['conv_cv'] = None if pd.isna(row[2]) else float(row[2])
+        
+        sim_names, sim_cpl, sim_conv, sim_split = planning.channel_arrays(plan_channels)
+        sim_cpl_cv = [default_cpl_cv if ch.get('cpl_cv') is None else ch['cpl_cv'] for ch in plan_channels]
+        sim_conv_cv = [default_conv_cv if ch.get('conv_cv') is None else ch['conv_cv'] for ch in plan_channels]
+        
+        # Runs as a background job shared by identical requests; the results
+        # below refresh in a fragment while it improves
+        sim_inputs = [sim_cpl.tolist(), sim_conv.tolist(), sim_split.tolist(), target, reloan, avg_ticket_size,
+                      sim_cpl_cv, sim_conv_cv, int(sim_draws)]
+        sim_key = jobs.job_key('simulation', *sim_inputs)
+        previous_key = st.session_state.get('simulation_job')
+        if previous_key is not None and previous_key != sim_key:
+            job_manager().cancel(previous_key, st.session_state.profile_session)
+        st.session_state.simulation_job = sim_key
+        
+        if st.session_state.get('simulation_stopped') != sim_key:
+            def run_simulation(job, inputs=sim_inputs, workers=int(sim_workers)):
+                draws = inputs[-1]
+                chunks, reported = [], 0.0
+                with closing(montecarlo.simulate_chunks(*inputs[:-1], draws=draws, workers=workers)) as simulated:
+                    for done, chunk in simulated:
+                        chunks.append(chunk)
+                        # Percentiles over every draw so far are recomputed at most once per poll
+                        if done < draws and time.time() - reported >= JOB_POLL_SECONDS:
+                            job.report(done / draws, (done, *montecarlo.summarize(chunks)))
+                            reported = time.time()
+                        elif job.cancelled:
+                            raise jobs.JobCancelled()
+                return (draws, *montecarlo.summarize(chunks))
+            
+            job_manager().submit(
+                sim_key,
+                f"Simulation: {format_indian_number(int(sim_draws))} draws",
+                run_simulation,
+                owner=st.session_state.profile_session
+            )
+        
+        def show_simulation(key, names):
+            job = job_manager().get(key)
+            if job is None or st.session_state.get('simulation_stopped') == key:
+                st.info("Simulation stopped.")
+                if st.button("▶️ Run Simulation", key="sim_restart"):
+                    st.session_state.simulation_stopped = None
+                    st.rerun()
+                return
+            was_active = job.active
+            
+            if job.status == jobs.QUEUED:
+                st.progress(0.0, text="Waiting for a free worker...")
+            elif job.status == jobs.RUNNING:
+                st.progress(job.progress, text=f"{job.label} - {job.progress * 100:.0f}% after {job.elapsed():.1f}s")
+            elif job.status == jobs.FAILED:
+                st.error(f"⚠️ Simulation failed: {job.error}")
+            elif job.status == jobs.CANCELLED:
+                st.warning("Simulation cancelled.")
+            if job.active and st.button("⏹️ Cancel", key="sim_cancel"):
+                job_manager().cancel(key, st.session_state.profile_session)
+                st.session_state.simulation_stopped = key
+                st.rerun()
+            
+            if job.result is not None:
+                import plotly.express as px
+
+                done, overall_df, channel_df = job.result
+                channel_df = channel_df.copy()
+                channel_df.insert(0, 'Channel', names)
+                if job.active:
+                    st.caption(f"Partial results from {format_indian_number(done)} draws")
+                
+                st.subheader("Overall")
+                st.dataframe(overall_df.round(2), use_container_width=True, hide_index=True)
+                
+                fig_sim = px.bar(
+                    channel_df,
+                    x='Channel',
+                    y='Marketing Spend P50 (₹ Lakhs)',
+                    error_y=channel_df['Marketing Spend P90 (₹ Lakhs)'] - channel_df['Marketing Spend P50 (₹ Lakhs)'],
+                    error_y_minus=channel_df['Marketing Spend P50 (₹ Lakhs)'] - channel_df['Marketing Spend P10 (₹ Lakhs)'],
+                    title='Marketing Spend by Channel (P50 with P10-P90 band)'
+                )
+                st.plotly_chart(fig_sim, use_container_width=True)
+                
+                st.subheader("By Channel")
+                st.dataframe(channel_df.round(2), use_container_width=True, hide_index=True)
+            
+            # Stop polling once the job settles
+            if was_active and not job.active:
+                st.rerun()
+        
+        sim_job = job_manager().get(sim_key)
+        sim_polling = sim_job is not None and sim_job.active and st.session_state.get('simulation_stopped') != sim_key
+        st.fragment(run_every=JOB_POLL_SECONDS if sim_polling else None)(show_simulation)(sim_key, sim_names)
+    elif st.session_state.get('simulation_job') is not None:
+        # Nobody is looking at this session's run any more
+        job_manager().cancel(st.session_state.simulation_job, st.session_state.profile_session)
+else:
+    st.info("Add channels to run a simulation.")
+
+st.markdown("---")
+
+# Section 6: Pacing Plan
+run_profile.checkpoint("Pacing Plan")
+st.header("📅 Pacing Plan")
+
+if len(results_df) > 0:
+    if st.toggle("Spread the plan into daily or weekly budgets", key="pacing_mode"):
+        import plotly.express as px
+
+        col1, col2, col3, col4 = st.columns(4)
+        
+        with col1:
+            pacing_start = st.date_input("Disbursal Start", value=pd.Timestamp.today().date(), key="pacing_start")
+        with col2:
+            pacing_days = st.number_input("Horizon (days)", min_value=1, max_value=730, value=30, step=1, key="pacing_days")
+        with col3:
+            pacing_lag = st.number_input("Lead-to-Disbursal Lag (days)", min_value=0, max_value=180, value=7, step=1, key="pacing_lag")
+        with col4:
+            pacing_freq = st.radio("Granularity", ['Daily', 'Weekly'], horizontal=True, key="pacing_freq")
+        
+        with st.expander("Seasonality Weights"):
+            weekday_df = st.data_editor(
+                pd.DataFrame([[1.0] * 7], columns=pacing.WEEKDAYS),
+                hide_index=True,
+                key="pacing_weekday_weights"
+            )
+            month_df = st.data_editor(
+                pd.DataFrame([[1.0] * 12], columns=pacing.MONTHS),
+                hide_index=True,
+                key="pacing_month_weights"
+            )
+        
+        pacing_schedules = pacing.pacing_plan(
+            results_df,
+            pacing_start,
+            int(pacing_days),
+            lag_days=int(pacing_lag),
+            weekday_weights=weekday_df.iloc[0].to_numpy(dtype=float),
+            month_weights=month_df.iloc[0].to_numpy(dtype=float),
+            freq='W' if pacing_freq == 'Weekly' else 'D'
+        )
+        
+        pacing_metric = st.radio(
+            "Schedule",
+            list(pacing_schedules),
+            horizontal=True,
+            key="pacing_metric"
+        )
+        schedule_df = pacing_schedules[pacing_metric]
+        
+        fig_pacing = px.imshow(
+            schedule_df,
+            aspect='auto',
+            color_continuous_scale='Blues',
+            title=f'{pacing_metric} by Channel and {"Week" if pacing_freq == "Weekly" else "Day"}',
+            labels={'x': 'Period', 'y': 'Channel', 'color': pacing_metric}
+        )
+        st.plotly_chart(fig_pacing, use_container_width=True)
+        
+        fig_cumulative = px.line(
+            x=schedule_df.columns,
+            y=schedule_df.to_numpy().sum(axis=0).cumsum(),
+            title=f'Cumulative {pacing_metric}',
+            labels={'x': 'Period', 'y': pacing_metric}
+        )
+        st.plotly_chart(fig_cumulative, use_container_width=True)
+        
+        st.dataframe(
+            schedule_df.rename(columns=lambda d: d.strftime('%d %b %Y')).round(4),
+            use_container_width=True
+        )
+        
+        # Actual against plan
+        st.subheader("Actual vs Plan")
+        actuals_file = st.file_uploader(
+            "Actuals CSV with channel, date and Marketing Spend (₹ Lakhs) / Leads Required columns",
+            type=['csv'],
+            key="pacing_actuals"
+        )
+        if actuals_file is not None:
+            actuals_df = pd.read_csv(actuals_file)
+            if {'channel', 'date', pacing_metric} <= set(actuals_df.columns):
+                pacing_as_of = st.date_input("As of", value=pd.Timestamp.today().date(), key="pacing_as_of")
+                st.dataframe(
+                    pacing.compare_to_actuals(pacing_schedules, actuals_df, pacing_as_of, pacing_metric).round(2),
+                    use_container_width=True,
+                    hide_index=True
+                )
+            else:
+                st.warning(f"⚠️ Actuals need channel, date and {pacing_metric} columns")
+else:
+    st.info("Add channels to build a pacing plan.")
+
+st.markdown("---")
+
+# Section 7: Plan History
+run_profile.checkpoint("Plan History")
+st.header("🗂️ Plan History")
+
+if st.toggle("Save and compare plan versions", key="history_mode"):
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        history_name = st.text_input("Plan name", value=channel_store.DEFAULT_SET, key="history_plan_name")
+    with col2:
+        st.markdown("<br>", unsafe_allow_html=True)
+        if st.button("📸 Save Snapshot", use_container_width=True, disabled=not history_name.strip() or len(results_df) == 0):
+            saved_version, _ = snapshots.save_snapshot(history_name.strip(), plan_channels, target, reloan, avg_ticket_size)
+            st.success(f"Saved '{history_name.strip()}' version {saved_version}")
+    
+    history_plans = snapshots.list_plans()
+    if history_plans:
+        history_plan = st.selectbox("Saved plan", history_plans, key="history_plan")
+        history_versions = snapshots.list_versions(history_plan)
+        st.dataframe(
+            history_versions.assign(saved_at=pd.to_datetime(history_versions['saved_at'], unit='s').dt.strftime('%Y-%m-%d %H:%M'))
+            .rename(columns={
+                'version': 'Version',
+                'saved_at': 'Saved At',
+                'snapshot_id': 'Snapshot',
+                'target': 'Target (₹ Lakhs)',
+                'reloan': 'Reloan (₹ Lakhs)',
+                'avg_ticket_size': 'Average Ticket Size (₹ Lakhs)'
+            }),
+            use_container_width=True,
+            hide_index=True
+        )
+        
+        version_numbers = history_versions['version'].tolist()
+        if len(version_numbers) > 1:
+            col1, col2 = st.columns(2)
+            with col1:
+                old_version = st.selectbox("Compare version", version_numbers, index=1, key="history_old")
+            with col2:
+                new_version = st.selectbox("With version", version_numbers, index=0, key="history_new")
+            version_diff = snapshots.diff_versions(history_plan, old_version, new_version)
+            if len(version_diff) > 0:
+                st.caption(
+                    f"{(version_diff['Status'] == 'changed').sum()} changed, "
+                    f"{(version_diff['Status'] == 'added').sum()} added, "
+                    f"{(version_diff['Status'] == 'removed').sum()} removed"
+                )
+                st.dataframe(version_diff.round(2), use_container_width=True, hide_index=True)
+            else:
+                st.info("No channel differences between these versions.")
+    else:
+        st.caption("No saved plan versions yet.")
+
+st.markdown("---")
+
+# Section 8: Region x Product Planning
+run_profile.checkpoint("Region x Product")
+st.header("🌐 Region × Product Planning")
+
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def cached_cube(cells, channels, overrides):
+    """Planned region x product x channel cube with its rollups"""
+    return plan_cube.PlanCube(cells, channels, overrides)
+
+
+if len(st.session_state.channels) > 0:
+    if st.toggle("Plan targets per region and product", key="cube_mode"):
+        st.markdown("*Every region and product starts from the channels above. Overrides use * for all regions or products; blank values inherit.*")
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            cells_file = st.file_uploader("Targets CSV", type=['csv'], key="cube_cells_file")
+            if cells_file is not None:
+                cube_cells = pd.read_csv(cells_file)
+            else:
+                cube_cells = st.data_editor(
+                    pd.DataFrame(
+                        [[region, product, target, reloan, avg_ticket_size]
+                         for region in ['North', 'South'] for product in ['Personal', 'Business']],
+                        columns=plan_cube.CELL_COLUMNS
+                    ),
+                    num_rows="dynamic",
+                    use_container_width=True,
+                    hide_index=True,
+                    key="cube_cells"
+                )
+        
+        with col2:
+            overrides_file = st.file_uploader("Overrides CSV", type=['csv'], key="cube_overrides_file")
+            if overrides_file is not None:
+                cube_overrides = pd.read_csv(overrides_file)
+            else:
+                cube_overrides = st.data_editor(
+                    pd.DataFrame(columns=plan_cube.OVERRIDE_COLUMNS).astype(
+                        {'Region': str, 'Product': str, 'Channel': str, 'CPL': float, 'Conv %': float, 'Budget %': float}
+                    ),
+                    column_config={
+                        'Channel': st.column_config.SelectboxColumn(
+                            options=[ch['name'] for ch in st.session_state.channels], required=True
+                        )
+                    },
+                    num_rows="dynamic",
+                    use_container_width=True,
+                    hide_index=True,
+                    key="cube_overrides"
+                )
+        
+        missing_columns = (set(plan_cube.CELL_COLUMNS) - set(cube_cells.columns)) | (set(plan_cube.OVERRIDE_COLUMNS) - set(cube_overrides.columns))
+        if missing_columns:
+            st.warning(f"⚠️ Missing columns: {', '.join(sorted(missing_columns))}")
+        elif len(cube_cells.dropna()) > 0:
+            cube = cached_cube(cube_cells.dropna(), st.session_state.channels, cube_overrides.dropna(subset=['Region', 'Product', 'Channel']))
+            run_profile.count("Cube leaves", len(cube.leaves))
+            
+            if len(cube.errors) > 0:
+                st.warning(
+                    "⚠️ Budget split doesn't add up to 100% for "
+                    + ', '.join(f"{region} / {product} ({total:.1f}%)" for region, product, total in cube.errors.itertuples(index=False))
+                )
+            
+            col1, col2, col3 = st.columns(3)
+            col1.metric("Total Leads Required", format_indian_number(cube.total['Leads Required'].iloc[0]))
+            col2.metric("Total Marketing Spend", f"₹{cube.total['Marketing Spend (₹ Lakhs)'].iloc[0]:.1f} L")
+            col3.metric("Blended ROI", f"{cube.total['ROI'].iloc[0]:.2f}x")
+            
+            # Drill-down reads the rollups stored with the cube
+            regions = cube.rollups[('Region',)].index.tolist()
+            products = cube.rollups[('Product',)].index.tolist()
+            col1, col2 = st.columns(2)
+            with col1:
+                cube_region = st.selectbox("Region", ['All Regions'] + regions, key="cube_region")
+            cube_region = None if cube_region == 'All Regions' else cube_region
+            if cube_region is not None:
+                # Only the products planned in the chosen region
+                products = cube.rollups[('Region', 'Product')].loc[cube_region].index.tolist()
+            with col2:
+                cube_product = st.selectbox("Product", ['All Products'] + products, key="cube_product")
+            cube_product = None if cube_product == 'All Products' else cube_product
+            
+            drilldown = cube.drilldown(cube_region, cube_product)
+            if len(drilldown) == 0:
+                st.info(f"No {cube_product} plan in {cube_region}.")
+            else:
+                st.dataframe(drilldown.round(2), use_container_width=True, hide_index=True)
+            if cube_product is None:
+                st.markdown(f"**Channel mix – {cube_region or 'all regions'}**")
+                st.dataframe(cube.channel_mix(cube_region).round(2), use_container_width=True, hide_index=True)
+else:
+    st.info("Add channels to plan by region and product.")
+
 # Footer
+run_profile.checkpoint("Footer")
 st.markdown("---")
 st.markdown("")
+
+run_profile.finish()
+
+# Performance panel - admin only, shows this rerun's section timings
+if is_admin:
+    st.sidebar.markdown("---")
+    st.sidebar.markdown("### ⏱️ Performance")
+    st.sidebar.toggle("Time page sections", key="profile_mode", disabled=profiling.PROFILE_ENV)
+    if run_profile.enabled:
+        st.sidebar.checkbox("Write timing log", key="profile_log", disabled=profiling.PROFILE_ENV)
+        st.sidebar.checkbox("Save cProfile dump", key="profile_cprofile")
+        st.sidebar.caption(f"Last rerun: {run_profile.total * 1000:.0f} ms")
+        st.sidebar.dataframe(
+            pd.DataFrame(run_profile.rows(), columns=['Section', 'ms', '% of Rerun']).round(1),
+            use_container_width=True,
+            hide_index=True
+        )
+        if run_profile.counts:
+            st.sidebar.dataframe(
+                pd.DataFrame(list(run_profile.counts.items()), columns=['Counter', 'Count']),
+                use_container_width=True,
+                hide_index=True
+            )
+        if run_profile.write_log:
+            st.sidebar.caption(f"Logging to {profiling.DEFAULT_DIR}/{profiling.TIMING_LOG}")
+        if run_profile.profile_path:
+            st.sidebar.caption(f"cProfile dump: {run_profile.profile_path}")
+    
+    background_jobs = job_manager().jobs()
+    if background_jobs:
+        st.sidebar.markdown("**Background Jobs**")
+        st.sidebar.dataframe(
+            pd.DataFrame({
+                'Job': [job.label for job in background_jobs],
+                'Status': [job.status for job in background_jobs],
+                'Progress %': [round(job.progress * 100) for job in background_jobs],
+                'Sessions': [len(job.owners) for job in background_jobs],
+                'Seconds': [round(job.elapsed(), 1) for job in background_jobs]
+            }),
+            use_container_width=True,
+            hide_index=True
+        )
@@ -0,0 +1,130 @@
+"""Monte Carlo uncertainty bands for channel CPL and conversion.
+
+Each channel's CPL is drawn from a mean-preserving lognormal and its
+Conversion % from a normal clipped to the app's 0.1-100 range, both with a
+coefficient of variation given in percent. Draws run through the planning
+engine's leads-required and spend formulas in fixed-size chunks.
+"""
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from planning import LAKH, compute_plan
+
+PERCENTILES = [10, 50, 90]
+
+# Upper bound on values held per chunk and on per-channel draws kept for percentiles
+MAX_CHUNK_CELLS = 2000000
+MAX_KEPT_CELLS = 5000000
+
+
+def _simulate_chunk(args):
+    """Run one chunk of draws; module level so it can run in a process pool"""
+    seed, rows, keep, leads_to_disburse, cpl, conv, cpl_cv, conv_cv = args
+    rng = np.random.default_rng(seed)
+    n = len(cpl)
+
+    sigma = np.sqrt(np.log1p((cpl_cv / 100) ** 2))
+    cpl_draws = cpl * np.exp(rng.standard_normal((rows, n)) * sigma - sigma ** 2 / 2)
+    conv_draws = np.clip(conv + rng.standard_normal((rows, n)) * conv * conv_cv / 100, 0.1, 100)
+    conv_draws[:, conv <= 0] = 0
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        leads_required = np.where(conv_draws > 0, np.trunc(leads_to_disburse / (conv_draws / 100)), 0)
+    spend = leads_required * cpl_draws / LAKH
+
+    return (
+        leads_required.sum(axis=1),
+        spend.sum(axis=1),
+        leads_required[:keep].astype(np.float32),
+        spend[:keep].astype(np.float32)
+    )
+
+
+def simulate_chunks(cpl, conv, split, target, reloan, avg_ticket_size, cpl_cv, conv_cv,
+                    draws=100000, seed=None, workers=1, chunk_cells=MAX_CHUNK_CELLS, kept_cells=MAX_KEPT_CELLS):
+    """Yield ``(draws done, chunk)`` as each chunk of draws finishes, in order.
+
+    Per-channel draws are kept for a uniform subset of at most
+    ``kept_cells / channels`` draws so memory stays bounded however many
+    draws are requested. ``workers > 1`` spreads chunks over a process pool
+    with a bounded number in flight; closing the generator early cancels
+    the chunks that haven't started.
+    """
+    cpl = np.asarray(cpl, dtype=float)
+    conv = np.asarray(conv, dtype=float)
+    n = max(len(cpl), 1)
+    cpl_cv = np.broadcast_to(np.asarray(cpl_cv, dtype=float), cpl.shape)
+    conv_cv = np.broadcast_to(np.asarray(conv_cv, dtype=float), cpl.shape)
+    leads_to_disburse = compute_plan(cpl, conv, split, target, reloan, avg_ticket_size)['Leads to Disburse'].astype(float)
+
+    rows_per_chunk = max(int(chunk_cells // n), 1)
+    keep_fraction = min(kept_cells / (n * draws), 1.0)
+    seeds = np.random.SeedSequence(seed).spawn((draws + rows_per_chunk - 1) // rows_per_chunk)
+    tasks = []
+    for i, child in enumerate(seeds):
+        rows = min(rows_per_chunk, draws - i * rows_per_chunk)
+        keep = int(np.ceil(rows * keep_fraction))
+        tasks.append((child, rows, keep, leads_to_disburse, cpl, conv, cpl_cv, conv_cv))
+
+    done = 0
+    if workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pending = deque()
+            try:
+                for task in tasks:
+                    pending.append((task[1], pool.submit(_simulate_chunk, task)))
+                    if len(pending) >= workers * 2:
+                        rows, future = pending.popleft()
+                        done += rows
+                        yield done, future.result()
+                while pending:
+                    rows, future = pending.popleft()
+                    done += rows
+                    yield done, future.result()
+            finally:
+                for _, future in pending:
+                    future.cancel()
+    else:
+        for task in tasks:
+            done += task[1]
+            yield done, _simulate_chunk(task)
+
+
+def summarize(chunks):
+    """P10/P50/P90 ``(overall_df, channel_df)`` from the chunks simulated so far"""
+    total_leads = np.concatenate([c[0] for c in chunks])
+    total_spend = np.concatenate([c[1] for c in chunks])
+    channel_leads = np.concatenate([c[2] for c in chunks])
+    channel_spend = np.concatenate([c[3] for c in chunks])
+
+    overall_df = pd.DataFrame(
+        [np.percentile(total_leads, PERCENTILES), np.percentile(total_spend, PERCENTILES)],
+        index=['Leads Required', 'Marketing Spend (₹ Lakhs)'],
+        columns=[f'P{p}' for p in PERCENTILES]
+    ).rename_axis('Metric').reset_index()
+
+    leads_pct = np.percentile(channel_leads, PERCENTILES, axis=0)
+    spend_pct = np.percentile(channel_spend, PERCENTILES, axis=0)
+    channel_df = pd.DataFrame({
+        **{f'Leads Required P{p}': leads_pct[i] for i, p in enumerate(PERCENTILES)},
+        **{f'Marketing Spend P{p} (₹ Lakhs)': spend_pct[i] for i, p in enumerate(PERCENTILES)}
+    })
+    return overall_df, channel_df
+
+
+def simulate(cpl, conv, split, target, reloan, avg_ticket_size, cpl_cv, conv_cv,
+             draws=100000, seed=None, workers=1, chunk_cells=MAX_CHUNK_CELLS, kept_cells=MAX_KEPT_CELLS):
+    """Simulate total and per-channel leads required and spend.
+
+    Totals use every draw; per-channel percentiles use the kept subset (see
+    ``simulate_chunks``). Returns ``(overall_df, channel_df)`` with
+    P10/P50/P90 columns.
+    """
+    chunks = [chunk for _, chunk in simulate_chunks(
+        cpl, conv, split, target, reloan, avg_ticket_size, cpl_cv, conv_cv,
+        draws, seed, workers, chunk_cells, kept_cells
+    )]
+    return summarize(chunks)
@@ -0,0 +1,122 @@
+"""Budget split optimizer built on the planning engine's cost model.
+
+Before truncation to whole leads, a channel's spend is linear in its budget
+share, so both optimizer modes reduce to filling the cheapest channels first
+(a fractional knapsack) within each channel's min/max share and lead cap.
+"""
+import numpy as np
+
+from planning import LAKH
+
+SPLIT_TOLERANCE = 1e-6
+
+
+def _bounds(n, min_share, max_share):
+    """Per-channel share bounds in percent, defaulting to 0-100"""
+    lo = np.zeros(n) if min_share is None else np.asarray(min_share, dtype=float)
+    hi = np.full(n, 100.0) if max_share is None else np.asarray(max_share, dtype=float)
+    if np.any(lo > hi):
+        raise ValueError("Min share is above max share for at least one channel")
+    return lo, hi
+
+
+def _lead_cap_shares(conv, avg_ticket_size, disbursement, max_leads):
+    """Largest share per channel that keeps leads required under its cap"""
+    if max_leads is None or disbursement <= 0 or avg_ticket_size <= 0:
+        return np.full(len(conv), np.inf)
+    max_leads = np.asarray(max_leads, dtype=float)
+    capped = ~np.isnan(max_leads)
+    shares = np.full(len(conv), np.inf)
+    shares[capped] = max_leads[capped] * (conv[capped] / 100) * avg_ticket_size * 100 / disbursement
+    return shares
+
+
+def _cost_rank(cpl, conv):
+    """Spend per lead disbursed, which orders channels for every target and ticket size.
+
+    Channels with no conversion never disburse, so they rank last at infinity.
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(conv > 0, cpl / (conv / 100), np.inf)
+
+
+def _spend_rate(unit_spend, split):
+    """Spend per lakh disbursed for a split; unused channels add nothing even at infinite cost"""
+    with np.errstate(invalid='ignore'):
+        return np.where(split > 0, unit_spend * split, 0.0).sum()
+
+
+def _fill(rank, lo, hi, total=100.0):
+    """Give every channel its minimum, then fill the cheapest channels up to their maximum"""
+    if lo.sum() > total + SPLIT_TOLERANCE:
+        raise ValueError(f"Minimum shares add up to {lo.sum():.1f}%, above {total:.0f}%")
+    if hi.sum() < total - SPLIT_TOLERANCE:
+        raise ValueError(f"Maximum shares and lead caps only allow {hi.sum():.1f}% of the budget")
+
+    order = np.argsort(rank, kind='stable')
+    room = (hi - lo)[order]
+    filled_before = np.cumsum(room) - room
+    split = lo.copy()
+    split[order] += np.clip(total - lo.sum() - filled_before, 0, room)
+    return split
+
+
+def min_spend_split(cpl, conv, target_from_marketing, avg_ticket_size,
+                    min_share=None, max_share=None, max_leads=None):
+    """Budget split (in %) that minimizes total marketing spend for the target"""
+    cpl = np.asarray(cpl, dtype=float)
+    conv = np.asarray(conv, dtype=float)
+    lo, hi = _bounds(len(cpl), min_share, max_share)
+    hi = np.minimum(hi, _lead_cap_shares(conv, avg_ticket_size, target_from_marketing, max_leads))
+    return _fill(_cost_rank(cpl, conv), lo, hi)
+
+
+def max_disbursement_split(cpl, conv, avg_ticket_size, spend_cap,
+                           min_share=None, max_share=None, max_leads=None, iterations=60):
+    """Budget split (in %) and disbursement (₹ Lakhs) that maximize disbursement within a spend cap.
+
+    Without lead caps this is closed form. Lead caps tighten as disbursement
+    grows, so the largest feasible disbursement is found by bisection, each
+    step being one vectorized fill.
+    """
+    cpl = np.asarray(cpl, dtype=float)
+    conv = np.asarray(conv, dtype=float)
+    lo, hi = _bounds(len(cpl), min_share, max_share)
+    rank = _cost_rank(cpl, conv)
+    if avg_ticket_size <= 0 or spend_cap <= 0:
+        return _fill(rank, lo, hi), 0.0
+
+    # Spend in lakhs per lakh disbursed for each percentage point of share
+    unit_spend = rank / LAKH / avg_ticket_size / 100
+
+    split = _fill(rank, lo, hi)
+    spend_rate = _spend_rate(unit_spend, split)
+    if spend_rate <= 0:
+        raise ValueError("Disbursement is unbounded: the selected channels have zero cost")
+    disbursement = spend_cap / spend_rate
+    if max_leads is None:
+        return split, disbursement
+
+    def feasible_split(amount):
+        capped = np.minimum(hi, _lead_cap_shares(conv, avg_ticket_size, amount, max_leads))
+        if capped.sum() < 100 - SPLIT_TOLERANCE:
+            return None
+        candidate = _fill(rank, lo, capped)
+        return candidate if amount * _spend_rate(unit_spend, candidate) <= spend_cap * (1 + SPLIT_TOLERANCE) else None
+
+    best = feasible_split(disbursement)
+    if best is not None:
+        return best, disbursement
+
+    low, high = 0.0, disbursement
+    best = feasible_split(low)
+    if best is None:
+        raise ValueError("No budget split satisfies the share limits")
+    for _ in range(iterations):
+        mid = (low + high) / 2
+        candidate = feasible_split(mid)
+        if candidate is None:
+            high = mid
+        else:
+            low, best = mid, candidate
+    return best, low
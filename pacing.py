@@ -0,0 +1,130 @@
+"""Time-phased pacing of a channel plan into daily or weekly schedules.
+
+Each channel's Leads to Disburse are spread over the planning horizon with
+day-of-week and monthly seasonality weights. Leads and spend are needed
+``lag_days`` earlier than the disbursals they turn into, so their schedule
+starts that many days before the horizon. Whole leads per period come from
+rounding cumulative sums, which keeps every channel's total exact.
+"""
+import numpy as np
+import pandas as pd
+
+from planning import LAKH
+
+WEEKDAYS = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
+MONTHS = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
+
+
+def daily_weights(start, days, weekday_weights=None, month_weights=None):
+    """Normalized per-day weights from day-of-week and month seasonality"""
+    dates = pd.date_range(start, periods=days, freq='D')
+    weights = np.ones(days)
+    if weekday_weights is not None:
+        weights *= np.asarray(weekday_weights, dtype=float)[dates.dayofweek]
+    if month_weights is not None:
+        weights *= np.asarray(month_weights, dtype=float)[dates.month - 1]
+    total = weights.sum()
+    return dates, (weights / total if total > 0 else np.full(days, 1 / max(days, 1)))
+
+
+def _paced_counts(totals, weights):
+    """Whole counts per period whose row sums equal ``totals``"""
+    cumulative = np.rint(totals[:, None] * np.cumsum(weights)[None, :])
+    return np.diff(cumulative, axis=1, prepend=0).astype(np.int64)
+
+
+def _to_weeks(matrix, dates):
+    """Sum daily columns into weeks starting on Monday"""
+    week_starts = dates.to_period('W').start_time
+    boundaries = np.flatnonzero(np.r_[True, week_starts[1:] != week_starts[:-1]])
+    return np.add.reduceat(matrix, boundaries, axis=1), pd.DatetimeIndex(week_starts[boundaries], freq='W-MON')
+
+
+def pacing_plan(results_df, start, days, lag_days=0, weekday_weights=None, month_weights=None, freq='D'):
+    """Channels x periods schedules for leads, spend and disbursals.
+
+    Returns a dict of frames indexed by channel with one column per period
+    start date: 'Leads Required', 'Marketing Spend (₹ Lakhs)' and
+    'Leads to Disburse'. The lead and spend columns begin ``lag_days``
+    before ``start``. Each frame's ``attrs['window']`` holds the first day
+    of the schedule and the day after its last, since weekly columns start
+    on the Monday before the first day.
+    """
+    dates, weights = daily_weights(start, days, weekday_weights, month_weights)
+    channels = results_df['Channel'].to_numpy()
+    leads_required = results_df['Leads Required'].to_numpy(dtype=float)
+    leads_to_disburse = results_df['Leads to Disburse'].to_numpy(dtype=float)
+    cpl = results_df['CPL (₹)'].to_numpy(dtype=float)
+
+    # One extended daily axis: lead generation starts lag_days before disbursal
+    axis = pd.date_range(dates[0] - pd.Timedelta(days=lag_days), periods=days + lag_days, freq='D')
+    n = len(channels)
+    leads = np.zeros((n, len(axis)), dtype=np.int64)
+    disbursals = np.zeros((n, len(axis)), dtype=np.int64)
+    leads[:, :days] = _paced_counts(leads_required, weights)
+    disbursals[:, lag_days:] = _paced_counts(leads_to_disburse, weights)
+    spend = leads * cpl[:, None] / LAKH
+
+    if freq == 'W':
+        leads, periods = _to_weeks(leads, axis)
+        disbursals, _ = _to_weeks(disbursals, axis)
+        spend, _ = _to_weeks(spend, axis)
+    else:
+        periods = axis
+
+    def frame(matrix):
+        df = pd.DataFrame(matrix, index=pd.Index(channels, name='Channel'), columns=periods)
+        # ISO strings keep the attrs serializable when the frame is shown
+        df.attrs['window'] = [axis[0].isoformat(), (axis[-1] + pd.Timedelta(days=1)).isoformat()]
+        return df
+
+    return {
+        'Leads Required': frame(leads),
+        'Marketing Spend (₹ Lakhs)': frame(spend),
+        'Leads to Disburse': frame(disbursals)
+    }
+
+
+def compare_to_actuals(plan, actuals, as_of, metric='Marketing Spend (₹ Lakhs)'):
+    """Plan-to-date against actual-to-date per channel.
+
+    ``actuals`` is a long frame with ``channel``, ``date`` and a column named
+    like ``metric``. Both sides run through the end of ``as_of``. The plan
+    for the period containing ``as_of`` is pro-rated by the days of it that
+    have passed, so a part-way week isn't charged its whole plan. Actuals
+    dated outside the schedule's window are left out of the comparison and
+    reported per channel as 'Actual Outside Plan'.
+    """
+    planned = plan[metric]
+    periods = planned.columns
+    start, end = map(pd.Timestamp, planned.attrs.get('window', (periods[0], periods[-1] + (periods.freq or pd.Timedelta(days=1)))))
+    through = pd.Timestamp(as_of).normalize() + pd.Timedelta(days=1)
+
+    # Days of each period inside the window, and how many of them have passed
+    period_start = np.maximum(periods, start)
+    period_end = np.minimum(periods[1:].append(pd.DatetimeIndex([end])), end)
+    days = (period_end - period_start) / pd.Timedelta(days=1)
+    passed = np.clip((through - period_start) / pd.Timedelta(days=1), 0, days)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        share = np.where(days > 0, passed / days, 0.0)
+    plan_to_date = (planned * share).sum(axis=1)
+
+    dates = pd.to_datetime(actuals['date'])
+    inside = ((dates >= start) & (dates < end)).to_numpy()
+    outside = (
+        actuals.loc[~inside].groupby('channel')[metric].sum()
+        .reindex(planned.index, fill_value=0)
+    )
+    actual_to_date = (
+        actuals.loc[inside & (dates < through).to_numpy()].groupby('channel')[metric].sum()
+        .reindex(planned.index, fill_value=0)
+    )
+    with np.errstate(divide='ignore', invalid='ignore'):
+        variance = np.where(plan_to_date > 0, (actual_to_date - plan_to_date) / plan_to_date * 100, np.nan)
+    return pd.DataFrame({
+        'Plan to Date': plan_to_date,
+        'Actual to Date': actual_to_date,
+        'Variance %': variance,
+        'Plan Total': planned.sum(axis=1),
+        'Actual Outside Plan': outside
+    }).reset_index()
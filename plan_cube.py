@@ -0,0 +1,142 @@
+"""Region x product x channel planning cube.
+
+Targets, reloans and average ticket sizes are set per region and product
+cell. Every cell starts from the base channel list; overrides replace CPL,
+Conversion % or Budget % for one channel and apply, in increasing
+precedence, to every cell, a product in all regions, a region across all
+products, or a single region and product. ``ALL`` ('*') in an override's Region or
+Product column means every value, and a blank parameter inherits. Channels
+with a fitted response curve keep it in every cell, so their spend follows
+the curve rather than an overridden CPL.
+
+All leaves are planned in one engine pass. Rollups for every drill-down
+level are aggregated once from the leaves (regions and products from the
+region x product totals), so drilling down only reads stored frames.
+"""
+import numpy as np
+import pandas as pd
+
+import planning
+from planning import LAKH
+
+ALL = '*'
+
+CELL_COLUMNS = ['Region', 'Product', 'Target (₹ Lakhs)', 'Reloan (₹ Lakhs)', 'Average Ticket Size (₹ Lakhs)']
+OVERRIDE_COLUMNS = ['Region', 'Product', 'Channel', 'CPL', 'Conv %', 'Budget %']
+
+# Override column -> leaf parameter column
+PARAMETERS = {'CPL': 'CPL (₹)', 'Conv %': 'Conversion %', 'Budget %': 'Budget %'}
+
+SUM_COLUMNS = ['Amount to Disburse (₹ Lakhs)', 'Leads to Disburse', 'Leads Required', 'Marketing Spend (₹ Lakhs)']
+
+
+def resolve_leaves(cells, channels, overrides=None):
+    """One row per region x product x channel with inherited or overridden parameters"""
+    base = pd.DataFrame({
+        'Channel': [str(ch['name']) for ch in channels],
+        'CPL (₹)': [float(ch['cpl']) for ch in channels],
+        'Conversion %': [float(ch['conv']) for ch in channels],
+        'Budget %': [float(ch['budget']) for ch in channels]
+    })
+    leaves = cells[CELL_COLUMNS].astype({'Region': str, 'Product': str}).merge(base, how='cross')
+
+    if overrides is not None and len(overrides) > 0:
+        overrides = overrides[OVERRIDE_COLUMNS].astype({'Region': str, 'Product': str, 'Channel': str})
+        product_wide = overrides['Region'] == ALL
+        region_wide = overrides['Product'] == ALL
+        # Cube-wide first, then product-wide, then region-wide, then single cells win
+        for mask, keys in (
+            (product_wide & region_wide, ['Channel']),
+            (product_wide & ~region_wide, ['Product', 'Channel']),
+            (region_wide & ~product_wide, ['Region', 'Channel']),
+            (~product_wide & ~region_wide, ['Region', 'Product', 'Channel'])
+        ):
+            level = overrides.loc[mask, keys + list(PARAMETERS)].drop_duplicates(keys, keep='last')
+            if len(level) == 0:
+                continue
+            matched = leaves[keys].merge(level, on=keys, how='left')
+            for column, leaf_column in PARAMETERS.items():
+                values = pd.to_numeric(matched[column], errors='coerce').to_numpy()
+                leaves[leaf_column] = np.where(np.isnan(values), leaves[leaf_column].to_numpy(), values)
+    return leaves
+
+
+def split_errors(leaves, tolerance=1e-6):
+    """Region / product cells whose channel budget split doesn't add up to 100%"""
+    totals = leaves.groupby(['Region', 'Product'], sort=False)['Budget %'].sum().reset_index()
+    return totals[(totals['Budget %'] - 100).abs() > tolerance].reset_index(drop=True)
+
+
+def _with_ratios(df):
+    """Add ROI and blended CPL / conversion to summed rollup columns"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        spend = df['Marketing Spend (₹ Lakhs)'].to_numpy()
+        leads = df['Leads Required'].to_numpy()
+        df['ROI'] = np.where(spend > 0, df['Amount to Disburse (₹ Lakhs)'].to_numpy() / spend, np.nan)
+        df['CPL (₹)'] = np.where(leads > 0, spend * LAKH / leads, np.nan)
+        df['Conversion %'] = np.where(leads > 0, df['Leads to Disburse'].to_numpy() / leads * 100, np.nan)
+    return df
+
+
+class PlanCube:
+    """Planned leaves plus precomputed rollups for every drill-down level"""
+
+    def __init__(self, cells, channels, overrides=None):
+        leaves = resolve_leaves(cells, channels, overrides)
+        curves = planning.curve_arrays(channels)
+        if curves is not None:
+            # Leaves are cells x channels in channel order
+            cell_count = len(leaves) // max(len(channels), 1)
+            curves = (np.tile(curves[0], cell_count), np.tile(curves[1], (1, cell_count)))
+        columns = planning.compute_plan(
+            leaves['CPL (₹)'].to_numpy(),
+            leaves['Conversion %'].to_numpy(),
+            leaves['Budget %'].to_numpy(),
+            leaves['Target (₹ Lakhs)'].to_numpy(dtype=float),
+            leaves['Reloan (₹ Lakhs)'].to_numpy(dtype=float),
+            leaves['Average Ticket Size (₹ Lakhs)'].to_numpy(dtype=float),
+            curves
+        )
+        for name in SUM_COLUMNS + ['ROI', 'Cost per Disbursed Lead']:
+            leaves[name] = columns[name]
+        self.leaves = leaves.set_index(['Region', 'Product']).sort_index()
+        self.errors = split_errors(leaves)
+
+        self.rollups = {}
+        # Coarser levels aggregate the already-aggregated region x product totals
+        region_product = leaves.groupby(['Region', 'Product'])[SUM_COLUMNS].sum()
+        self.rollups[('Region', 'Product')] = region_product
+        self.rollups[('Region',)] = region_product.groupby(level='Region').sum()
+        self.rollups[('Product',)] = region_product.groupby(level='Product').sum()
+        self.rollups[('Channel',)] = leaves.groupby('Channel', sort=False)[SUM_COLUMNS].sum()
+        self.rollups[('Region', 'Channel')] = (
+            leaves.groupby(['Region', 'Channel'], sort=False)[SUM_COLUMNS].sum()
+            .sort_index(level='Region', sort_remaining=False)
+        )
+        self.total = _with_ratios(self.rollups[('Region',)].sum().to_frame().T)
+        for level, df in self.rollups.items():
+            self.rollups[level] = _with_ratios(df)
+
+    def drilldown(self, region=None, product=None):
+        """Rollup rows one level below the selection, read from the stored frames.
+
+        Nothing selected gives regions; a region gives its products; a product
+        across all regions gives its regions; a region and product give the
+        planned channel leaves of that cell, or no rows when the cube has no
+        such cell.
+        """
+        if region is not None and product is not None:
+            if (region, product) not in self.rollups[('Region', 'Product')].index:
+                return self.leaves.iloc[0:0].reset_index(drop=True)
+            return self.leaves.loc[[(region, product)]].reset_index(drop=True)
+        if region is not None:
+            return self.rollups[('Region', 'Product')].loc[region].reset_index()
+        if product is not None:
+            return self.rollups[('Region', 'Product')].xs(product, level='Product').reset_index()
+        return self.rollups[('Region',)].reset_index()
+
+    def channel_mix(self, region=None):
+        """Channel totals across the cube, or within one region"""
+        if region is None:
+            return self.rollups[('Channel',)].reset_index()
+        return self.rollups[('Region', 'Channel')].loc[region].reset_index()
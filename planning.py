@@ -0,0 +1,309 @@
+"""Streamlit-free planning engine for the Marketing Budget Calculator.
+
+All amounts are in Lakhs (₹) except CPL, which is in rupees per lead.
+"""
+import hashlib
+import json
+
+import numpy as np
+import pandas as pd
+
+LAKH = 100000
+
+# Column names shared by the app, the summary table and the charts
+RESULT_COLUMNS = [
+    'Channel',
+    'Amount to Disburse (₹ Lakhs)',
+    'Leads to Disburse',
+    'Leads Required',
+    'Marketing Spend (₹ Lakhs)',
+    'CPL (₹)',
+    'Conversion %',
+    'ROI',
+    'Cost per Disbursed Lead'
+]
+
+# Response curve type -> parameter names. Power: leads = scale * spend ** exponent.
+# Hill: leads = max_leads * spend ** shape / (spend ** shape + half_spend ** shape).
+# Spend is in ₹ Lakhs.
+CURVE_PARAMS = {
+    'power': ['scale', 'exponent'],
+    'hill': ['max_leads', 'half_spend', 'shape']
+}
+CURVE_KINDS = {'power': 1, 'hill': 2}
+
+
+def channel_arrays(channels):
+    """Split a list of channel dicts into name, CPL, conversion and budget split arrays"""
+    names = [ch['name'] for ch in channels]
+    cpl = np.fromiter((ch['cpl'] for ch in channels), dtype=float, count=len(channels))
+    conv = np.fromiter((ch['conv'] for ch in channels), dtype=float, count=len(channels))
+    split = np.fromiter((ch['budget'] for ch in channels), dtype=float, count=len(channels))
+    return names, cpl, conv, split
+
+
+def curve_arrays(channels):
+    """Response curve kind codes and a (3, n) parameter array, or None when every channel has constant CPL"""
+    if not any(ch.get('curve') for ch in channels):
+        return None
+    kind = np.zeros(len(channels), dtype=np.int64)
+    params = np.full((3, len(channels)), np.nan)
+    for i, ch in enumerate(channels):
+        curve = ch.get('curve')
+        if curve:
+            kind[i] = CURVE_KINDS[curve['type']]
+            params[:len(CURVE_PARAMS[curve['type']]), i] = [curve[name] for name in CURVE_PARAMS[curve['type']]]
+    return kind, params
+
+
+def spend_for_leads(leads, cpl, curves):
+    """Spend (₹ Lakhs) that buys ``leads`` on each channel's response curve.
+
+    Both curve types invert in closed form, so every channel is solved in
+    one vectorized pass. Channels without a curve pay a constant CPL, and a
+    Hill curve asked for leads at or above its ceiling needs infinite spend.
+    """
+    leads = np.asarray(leads, dtype=float)
+    spend = leads * cpl / LAKH
+    if curves is None:
+        return spend
+    kind, params = curves
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        power = kind == CURVE_KINDS['power']
+        spend[power] = (leads[power] / params[0, power]) ** (1 / params[1, power])
+
+        hill = kind == CURVE_KINDS['hill']
+        max_leads, half_spend, shape = params[:, hill]
+        hill_leads = leads[hill]
+        spend[hill] = np.where(
+            hill_leads < max_leads,
+            half_spend * (hill_leads / (max_leads - hill_leads)) ** (1 / shape),
+            np.inf
+        )
+    return spend
+
+
+def disbursal_leads_required(target_from_marketing, avg_ticket_size):
+    """Total disbursed leads needed for the marketing target"""
+    if target_from_marketing <= 0 or avg_ticket_size <= 0:
+        return 0
+    return int(target_from_marketing / avg_ticket_size)
+
+
+def compute_plan(cpl, conv, split, target, reloan, avg_ticket_size, curves=None):
+    """Compute every derived per-channel column in one vectorized pass.
+
+    Leads are truncated towards zero exactly like ``int()`` in the original
+    per-row loop, and ROI / cost per disbursed lead map infinities to 0.
+    ``target``, ``reloan`` and ``avg_ticket_size`` may be scalars or arrays
+    aligned with the channel arrays, so many plans can share one pass.
+    With ``curves`` (from ``curve_arrays``) spend follows each channel's
+    response curve and CPL is the resulting average cost per lead.
+    """
+    cpl = np.asarray(cpl, dtype=float)
+    conv = np.asarray(conv, dtype=float)
+    split = np.asarray(split, dtype=float)
+    target_from_marketing = np.asarray(target, dtype=float) - np.asarray(reloan, dtype=float)
+
+    channel_target = target_from_marketing * (split / 100)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        leads_to_disburse = np.where(avg_ticket_size > 0, np.trunc(channel_target / avg_ticket_size), 0)
+        leads_required = np.where(conv > 0, np.trunc(leads_to_disburse / (conv / 100)), 0)
+        amount_to_spend = spend_for_leads(leads_required, cpl, curves)
+        if curves is not None:
+            cpl = np.where((curves[0] > 0) & (leads_required > 0), amount_to_spend * LAKH / leads_required, cpl)
+
+        roi = channel_target / amount_to_spend
+        roi[np.isinf(roi)] = 0
+        cost_per_disbursed_lead = (amount_to_spend * LAKH) / (channel_target / avg_ticket_size)
+        cost_per_disbursed_lead[np.isinf(cost_per_disbursed_lead)] = 0
+        if curves is not None:
+            # Leads beyond a curve's ceiling have no spend, so no ROI either
+            unreachable = np.isinf(amount_to_spend)
+            roi[unreachable] = np.nan
+            cost_per_disbursed_lead[unreachable] = np.nan
+
+    return {
+        'Amount to Disburse (₹ Lakhs)': channel_target,
+        'Leads to Disburse': leads_to_disburse.astype(np.int64),
+        'Leads Required': leads_required.astype(np.int64),
+        'Marketing Spend (₹ Lakhs)': amount_to_spend,
+        'CPL (₹)': cpl,
+        'Conversion %': conv,
+        'ROI': roi,
+        'Cost per Disbursed Lead': cost_per_disbursed_lead
+    }
+
+
+def plan_results(channels, target, reloan, avg_ticket_size):
+    """Build the per-channel results frame for a list of channel dicts"""
+    names, cpl, conv, split = channel_arrays(channels)
+    columns = compute_plan(cpl, conv, split, target, reloan, avg_ticket_size, curve_arrays(channels))
+    columns['Channel'] = names
+    return pd.DataFrame(columns, columns=RESULT_COLUMNS)
+
+
+def _tiled_plan(targets, cpl, conv, split, avg_ticket_size, curves=None):
+    """Plan columns for one channel list at many targets from marketing, shaped (targets, channels)"""
+    targets = np.atleast_1d(np.asarray(targets, dtype=float))
+    count, width = len(targets), len(cpl)
+    tickets = np.broadcast_to(np.asarray(avg_ticket_size, dtype=float), targets.shape)
+    if curves is not None:
+        curves = (np.tile(curves[0], count), np.tile(curves[1], (1, count)))
+    columns = compute_plan(
+        np.tile(cpl, count),
+        np.tile(conv, count),
+        np.tile(split, count),
+        np.repeat(targets, width),
+        0.0,
+        np.repeat(tickets, width),
+        curves
+    )
+    return {name: values.reshape(count, width) for name, values in columns.items()}
+
+
+def spend_per_target(cpl, conv, split, avg_ticket_size):
+    """Marketing spend (₹ Lakhs) per ₹ Lakh of target from marketing at constant CPL, before lead rounding"""
+    cpl = np.asarray(cpl, dtype=float)
+    conv = np.asarray(conv, dtype=float)
+    split = np.asarray(split, dtype=float)
+    avg_ticket_size = np.asarray(avg_ticket_size, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        per_ticket = np.where(conv > 0, split * cpl / conv, 0).sum() / LAKH
+        return np.where(avg_ticket_size > 0, per_ticket / avg_ticket_size, 0.0)
+
+
+def target_for_budget(budget, cpl, conv, split, avg_ticket_size, curves=None, tolerance=1e-9):
+    """Largest target from marketing whose plan spends no more than ``budget``.
+
+    ``budget`` and ``avg_ticket_size`` may be arrays, one entry per budget
+    level. At constant CPL spend is linear in the target, so each level is
+    one division. Response curves make spend increasing but not invertible
+    across channels, so all levels are bisected together, each step one
+    engine pass over every level. Channels that spend nothing give 0.
+    """
+    budget = np.atleast_1d(np.asarray(budget, dtype=float))
+    rate = np.broadcast_to(spend_per_target(cpl, conv, split, avg_ticket_size), budget.shape)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        linear = np.where((rate > 0) & (budget > 0), budget / rate, 0.0)
+    if curves is None or len(cpl) == 0:
+        return linear
+
+    def total_spend(targets):
+        return _tiled_plan(targets, cpl, conv, split, avg_ticket_size, curves)['Marketing Spend (₹ Lakhs)'].sum(axis=1)
+
+    positive = budget > 0
+    lower = np.zeros_like(budget)
+    upper = np.where(linear > 0, linear, np.maximum(budget, 1.0))
+    # Grow the bracket until every level overspends (or a Hill ceiling is hit)
+    for _ in range(64):
+        short = positive & (total_spend(upper) <= budget)
+        if not short.any():
+            break
+        lower[short] = upper[short]
+        upper[short] *= 2
+    else:
+        # Spend never reaches these budgets
+        positive &= ~short
+    for _ in range(200):
+        if not np.any(positive & (upper - lower > tolerance * upper)):
+            break
+        middle = (lower + upper) / 2
+        within = total_spend(middle) <= budget
+        lower = np.where(within, middle, lower)
+        upper = np.where(within, upper, middle)
+    return np.where(positive, lower, 0.0)
+
+
+def budget_frontier(budgets, cpl, conv, split, reloan, avg_ticket_size, curves=None):
+    """Achievable disbursement, leads and spend at every budget level, with the current splits"""
+    budgets = np.atleast_1d(np.asarray(budgets, dtype=float))
+    targets = target_for_budget(budgets, cpl, conv, split, avg_ticket_size, curves)
+    columns = _tiled_plan(targets, cpl, conv, split, avg_ticket_size, curves)
+    disbursement = columns['Amount to Disburse (₹ Lakhs)'].sum(axis=1)
+    spend = columns['Marketing Spend (₹ Lakhs)'].sum(axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        roi = np.where(spend > 0, disbursement / spend, np.nan)
+    return pd.DataFrame({
+        'Marketing Budget (₹ Lakhs)': budgets,
+        'Disbursement from Marketing (₹ Lakhs)': disbursement,
+        'Total Disbursement (₹ Lakhs)': disbursement + reloan,
+        'Leads to Disburse': columns['Leads to Disburse'].sum(axis=1),
+        'Leads Required': columns['Leads Required'].sum(axis=1),
+        'Marketing Spend (₹ Lakhs)': spend,
+        'ROI': roi
+    })
+
+
+def value_range(start, stop, step):
+    """Inclusive range of sweep values; a non-positive step gives just ``start``"""
+    if step <= 0 or stop <= start:
+        return np.array([float(start)])
+    return np.arange(start, stop + step / 2, step, dtype=float)
+
+
+def sweep_grid(cpl, conv, split, targets, reloans, ticket_sizes, max_cells=5000000, curves=None):
+    """Leads required and marketing spend for every target x reloan x ticket size.
+
+    The whole grid is one broadcast computation over a
+    (target, reloan, ticket size, channel) array, processed in slices of the
+    target axis so at most ``max_cells`` values are alive at once. With
+    ``curves`` (from ``curve_arrays``) spend follows each channel's response
+    curve. Returns a long frame with one row per scenario.
+    """
+    cpl = np.asarray(cpl, dtype=float)
+    conv = np.asarray(conv, dtype=float)
+    split = np.asarray(split, dtype=float)
+    targets = np.asarray(targets, dtype=float)
+    reloans = np.asarray(reloans, dtype=float)
+    ticket_sizes = np.asarray(ticket_sizes, dtype=float)
+
+    shape = (len(targets), len(reloans), len(ticket_sizes))
+    leads = np.zeros(shape, dtype=np.int64)
+    spend = np.zeros(shape)
+
+    cells_per_target = max(len(reloans) * len(ticket_sizes) * len(cpl), 1)
+    chunk = max(int(max_cells // cells_per_target), 1)
+    tickets = ticket_sizes[None, None, :, None]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for start in range(0, len(targets), chunk):
+            target_from_marketing = targets[start:start + chunk, None] - reloans[None, :]
+            channel_target = target_from_marketing[:, :, None, None] * (split / 100)
+            leads_to_disburse = np.where(tickets > 0, np.trunc(channel_target / tickets), 0)
+            leads_required = np.where(conv > 0, np.trunc(leads_to_disburse / (conv / 100)), 0)
+            leads[start:start + chunk] = leads_required.sum(axis=-1)
+            if curves is None:
+                spend[start:start + chunk] = (leads_required * cpl).sum(axis=-1) / LAKH
+            else:
+                repeats = leads_required.size // max(len(cpl), 1)
+                channel_spend = spend_for_leads(
+                    leads_required.reshape(-1),
+                    np.tile(cpl, repeats),
+                    (np.tile(curves[0], repeats), np.tile(curves[1], (1, repeats)))
+                )
+                spend[start:start + chunk] = channel_spend.reshape(leads_required.shape).sum(axis=-1)
+
+    target_grid, reloan_grid, ticket_grid = np.meshgrid(targets, reloans, ticket_sizes, indexing='ij')
+    return pd.DataFrame({
+        'Target (₹ Lakhs)': target_grid.ravel(),
+        'Reloan (₹ Lakhs)': reloan_grid.ravel(),
+        'Average Ticket Size (₹ Lakhs)': ticket_grid.ravel(),
+        'Target from Marketing (₹ Lakhs)': (target_grid - reloan_grid).ravel(),
+        'Leads Required': leads.ravel(),
+        'Marketing Spend (₹ Lakhs)': spend.ravel()
+    })
+
+
+def plan_cache_key(channels, target, reloan, avg_ticket_size):
+    """Stable hash of the channel config and top-level inputs that feed a plan"""
+    payload = json.dumps([
+        [
+            # Response curves only enter the key when set, so linear plans keep their keys
+            [ch['name'], float(ch['cpl']), float(ch['conv']), float(ch['budget'])] + ([ch['curve']] if ch.get('curve') else [])
+            for ch in channels
+        ],
+        float(target),
+        float(reloan),
+        float(avg_ticket_size)
+    ])
+    return hashlib.sha256(payload.encode()).hexdigest()
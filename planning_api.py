@@ -0,0 +1,276 @@
+"""Local async HTTP/JSON API over the planning engine.
+
+Runs as its own process, separate from the Streamlit page:
+
+    python planning_api.py --port 8600
+
+Endpoints:
+
+``POST /plan``
+    ``{"target": 250, "reloan": 150, "avg_ticket_size": 0.25,
+    "channels": [{"name": "Google Ads", "cpl": 50, "conv": 9.6, "budget": 45}, ...]}``
+    or ``"channel_set": "default"`` instead of ``channels``. A channel may
+    add a fitted ``"curve"`` such as ``{"type": "hill", "max_leads": 5000,
+    "half_spend": 2.5, "shape": 1.2}``. Returns the per-channel rows and
+    totals.
+``POST /plan/batch``
+    ``{"plans": [<plan request>, ...]}``; returns ``{"plans": [...]}`` in order.
+``GET /health``
+
+Identical requests in flight share one computation, and finished responses
+are kept in an LRU cache keyed on the same hash the app's cache uses.
+"""
+import argparse
+import asyncio
+import json
+import math
+from collections import OrderedDict
+from http import HTTPStatus
+
+import channel_store
+import planning
+
+MAX_BODY_BYTES = 10 * 1024 * 1024
+
+# Same limits as the app's inputs; the ticket size floor keeps lead counts within int64
+MAX_AMOUNT = 10000000.0
+MIN_TICKET_SIZE = 0.0001
+MAX_CPL = 10000000.0
+
+
+class BadRequest(ValueError):
+    """Request payload that can't be planned"""
+
+
+def plan_response(channels, target, reloan, avg_ticket_size):
+    """JSON-ready plan with the same columns and totals as the app"""
+    results_df = planning.plan_results(channels, target, reloan, avg_ticket_size)
+    target_from_marketing = target - reloan
+    spend = float(results_df['Marketing Spend (₹ Lakhs)'].sum())
+    # NaN (no spend and no disbursement) and infinite spend (a lead count
+    # beyond a Hill curve's ceiling) aren't valid JSON
+    results_df = results_df.replace([math.inf, -math.inf], math.nan)
+    rows = results_df.astype(object).where(results_df.notna(), None).to_dict('records')
+    return {
+        'target': target,
+        'reloan': reloan,
+        'target_from_marketing': target_from_marketing,
+        'avg_ticket_size': avg_ticket_size,
+        'disbursal_leads_required': planning.disbursal_leads_required(target_from_marketing, avg_ticket_size),
+        'channels': rows,
+        'totals': {
+            'Leads Required': int(results_df['Leads Required'].sum()),
+            'Leads to Disburse': int(results_df['Leads to Disburse'].sum()),
+            'Marketing Spend (₹ Lakhs)': spend if math.isfinite(spend) else None,
+            'Amount to Disburse (₹ Lakhs)': float(results_df['Amount to Disburse (₹ Lakhs)'].sum())
+        }
+    }
+
+
+def _parse_curve(curve):
+    """Validated response curve dict, or None for constant CPL"""
+    if curve is None:
+        return None
+    if not isinstance(curve, dict) or curve.get('type') not in planning.CURVE_PARAMS:
+        raise BadRequest(f"Curve type must be one of: {', '.join(planning.CURVE_PARAMS)}")
+    names = planning.CURVE_PARAMS[curve['type']]
+    try:
+        params = {name: float(curve[name]) for name in names}
+    except (KeyError, TypeError, ValueError):
+        raise BadRequest(f"A {curve['type']} curve needs {', '.join(names)}")
+    if not all(0 < value < math.inf for value in params.values()):
+        raise BadRequest("Curve parameters must be positive and finite")
+    return {'type': curve['type'], **params}
+
+
+def parse_plan_request(payload, store_path=channel_store.DEFAULT_PATH):
+    """Validate one plan request into (channels, target, reloan, avg_ticket_size)"""
+    if not isinstance(payload, dict):
+        raise BadRequest("Plan request must be a JSON object")
+    try:
+        target = float(payload['target'])
+        reloan = float(payload.get('reloan', 0.0))
+        avg_ticket_size = float(payload['avg_ticket_size'])
+    except KeyError as e:
+        raise BadRequest(f"Missing field: {e.args[0]}")
+    except (TypeError, ValueError):
+        raise BadRequest("target, reloan and avg_ticket_size must be numbers")
+    if not (0 <= target <= MAX_AMOUNT and 0 <= reloan <= MAX_AMOUNT):
+        raise BadRequest(f"target and reloan must be between 0 and {MAX_AMOUNT:.0f}")
+    if not MIN_TICKET_SIZE <= avg_ticket_size <= MAX_AMOUNT:
+        raise BadRequest(f"avg_ticket_size must be between {MIN_TICKET_SIZE} and {MAX_AMOUNT:.0f}")
+
+    if 'channels' in payload:
+        try:
+            channels = [
+                {'name': str(ch['name']), 'cpl': float(ch['cpl']), 'conv': float(ch['conv']), 'budget': float(ch['budget']),
+                 'curve': ch.get('curve')}
+                for ch in payload['channels']
+            ]
+        except (KeyError, TypeError, ValueError, AttributeError):
+            raise BadRequest("Each channel needs name, cpl, conv and budget")
+        for ch in channels:
+            if not (0 <= ch['cpl'] <= MAX_CPL and 0.1 <= ch['conv'] <= 100 and 0 <= ch['budget'] <= 100):
+                raise BadRequest(f"Channel {ch['name']}: cpl must be 0-{MAX_CPL:.0f}, conv 0.1-100 and budget 0-100")
+            curve = _parse_curve(ch.pop('curve'))
+            if curve is not None:
+                ch['curve'] = curve
+    elif 'channel_set' in payload:
+        channels = channel_store.load_set(str(payload['channel_set']), store_path)
+        if channels is None:
+            raise BadRequest(f"Unknown channel set: {payload['channel_set']}")
+    else:
+        raise BadRequest("Provide channels or channel_set")
+    return channels, target, reloan, avg_ticket_size
+
+
+class PlanService:
+    """Plan computation with request coalescing and an LRU response cache"""
+
+    def __init__(self, cache_size=1024, store_path=channel_store.DEFAULT_PATH):
+        self.cache_size = cache_size
+        self.store_path = store_path
+        self._cache = OrderedDict()
+        self._in_flight = {}
+        self.stats = {'hits': 0, 'misses': 0, 'coalesced': 0}
+
+    async def plan(self, payload):
+        loop = asyncio.get_running_loop()
+        if isinstance(payload, dict) and 'channels' not in payload and 'channel_set' in payload:
+            # Loading a stored channel set is blocking sqlite I/O
+            parsed = await loop.run_in_executor(None, parse_plan_request, payload, self.store_path)
+        else:
+            parsed = parse_plan_request(payload, self.store_path)
+        channels, target, reloan, avg_ticket_size = parsed
+        key = planning.plan_cache_key(channels, target, reloan, avg_ticket_size)
+
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            self.stats['hits'] += 1
+            return self._cache[key]
+        if key in self._in_flight:
+            self.stats['coalesced'] += 1
+            return await asyncio.shield(self._in_flight[key])
+
+        self.stats['misses'] += 1
+        future = loop.run_in_executor(
+            None, plan_response, channels, target, reloan, avg_ticket_size
+        )
+        self._in_flight[key] = future
+        try:
+            response = await future
+        finally:
+            del self._in_flight[key]
+
+        self._cache[key] = response
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return response
+
+    async def plan_batch(self, payload):
+        plans = payload.get('plans') if isinstance(payload, dict) else None
+        if not isinstance(plans, list):
+            raise BadRequest("Batch request needs a plans list")
+        return {'plans': await asyncio.gather(*(self.plan(plan) for plan in plans))}
+
+
+async def _read_request(reader):
+    """Parse one HTTP/1.1 request into (method, path, headers, body)"""
+    request_line = await reader.readline()
+    if not request_line:
+        return None
+    method, path, _ = request_line.decode('latin-1').split(' ', 2)
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+    length = int(headers.get('content-length', 0))
+    if length > MAX_BODY_BYTES:
+        raise BadRequest("Request body too large")
+    body = await reader.readexactly(length) if length else b''
+    return method, path.split('?', 1)[0], headers, body
+
+
+def _write_response(writer, status, payload, keep_alive):
+    body = json.dumps(payload, allow_nan=False).encode('utf-8')
+    writer.write(
+        f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+        f"Content-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode('latin-1') + body
+    )
+
+
+def make_handler(service):
+    """Connection handler serving the planning endpoints with keep-alive"""
+    routes = {
+        ('POST', '/plan'): service.plan,
+        ('POST', '/plan/batch'): service.plan_batch
+    }
+
+    async def handle(reader, writer):
+        try:
+            while True:
+                try:
+                    request = await _read_request(reader)
+                except (ValueError, asyncio.IncompleteReadError):
+                    _write_response(writer, HTTPStatus.BAD_REQUEST, {'error': "Malformed request"}, False)
+                    break
+                if request is None:
+                    break
+                method, path, headers, body = request
+                keep_alive = headers.get('connection', '').lower() != 'close'
+
+                if (method, path) == ('GET', '/health'):
+                    status, payload = HTTPStatus.OK, {'status': 'ok', 'cache': service.stats}
+                elif (method, path) in routes:
+                    try:
+                        payload = await routes[(method, path)](json.loads(body or b'{}'))
+                        status = HTTPStatus.OK
+                    except json.JSONDecodeError:
+                        status, payload = HTTPStatus.BAD_REQUEST, {'error': "Body must be JSON"}
+                    except BadRequest as e:
+                        status, payload = HTTPStatus.BAD_REQUEST, {'error': str(e)}
+                    except Exception as e:
+                        status, payload = HTTPStatus.INTERNAL_SERVER_ERROR, {'error': f"{type(e).__name__}: {e}"}
+                else:
+                    status, payload = HTTPStatus.NOT_FOUND, {'error': f"No route for {method} {path}"}
+
+                _write_response(writer, status, payload, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    return handle
+
+
+async def serve(host='127.0.0.1', port=8600, cache_size=1024, store_path=channel_store.DEFAULT_PATH):
+    service = PlanService(cache_size, store_path)
+    server = await asyncio.start_server(make_handler(service), host, port)
+    print(f"Planning API listening on http://{host}:{port}")
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the marketing planning engine over HTTP/JSON.")
+    parser.add_argument('--host', default='127.0.0.1', help="Interface to bind (default: localhost only)")
+    parser.add_argument('--port', type=int, default=8600)
+    parser.add_argument('--cache-size', type=int, default=1024, help="Responses kept in the LRU cache")
+    parser.add_argument('--store', default=channel_store.DEFAULT_PATH, help="Channel store path")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.host, args.port, args.cache_size, args.store))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
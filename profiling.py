@@ -0,0 +1,106 @@
+"""Opt-in per-section timing for the planning page.
+
+The page calls ``checkpoint(name)`` where each section begins; the time up to
+the next checkpoint is charged to that section. Counters record work done
+during the rerun, such as rows computed or figures built. When profiling is
+off every call is a no-op.
+
+Setting ``MARKETING_PROFILE=1`` turns on timing and the JSON timing log for
+every session; admins can also switch it on for their own session. Logs and
+cProfile dumps go to ``MARKETING_PROFILE_DIR`` (default ``profiles/``).
+"""
+import cProfile
+import json
+import os
+import time
+import uuid
+
+PROFILE_ENV = os.environ.get('MARKETING_PROFILE', '') not in ('', '0')
+DEFAULT_DIR = os.environ.get(
+    'MARKETING_PROFILE_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'profiles')
+)
+TIMING_LOG = 'timings.jsonl'
+
+
+class RunProfile:
+    """Section timings and counters for one rerun"""
+
+    def __init__(self, enabled=False, write_log=False, cprofile=False, log_dir=DEFAULT_DIR, session=None):
+        self.enabled = enabled
+        self.write_log = enabled and write_log
+        self.log_dir = log_dir
+        self.session = session
+        self.sections = {}
+        self.counts = {}
+        self.total = None
+        self.profile_path = None
+        self._current = None
+        self._started = time.perf_counter()
+        self._section_started = self._started
+        self._cprofile = None
+        if enabled and cprofile:
+            self._cprofile = cProfile.Profile()
+            try:
+                self._cprofile.enable()
+            except ValueError:
+                # Another session's profiler is active in this interpreter
+                self._cprofile = None
+
+    def checkpoint(self, name):
+        """End the current section and start ``name``"""
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        if self._current is not None:
+            self.sections[self._current] = self.sections.get(self._current, 0.0) + now - self._section_started
+        self._current = name
+        self._section_started = now
+
+    def count(self, name, amount=1):
+        """Add to a work counter"""
+        if self.enabled:
+            self.counts[name] = self.counts.get(name, 0) + amount
+
+    def finish(self):
+        """Close the last section, stop cProfile and write the logs"""
+        if not self.enabled or self.total is not None:
+            return
+        self.checkpoint(None)
+        self.total = time.perf_counter() - self._started
+        if self._cprofile is not None:
+            self._cprofile.disable()
+            os.makedirs(self.log_dir, exist_ok=True)
+            self.profile_path = os.path.join(
+                self.log_dir, f"rerun-{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}.prof"
+            )
+            self._cprofile.dump_stats(self.profile_path)
+            self._cprofile = None
+        if self.write_log:
+            os.makedirs(self.log_dir, exist_ok=True)
+            with open(os.path.join(self.log_dir, TIMING_LOG), 'a') as f:
+                f.write(json.dumps(self.record()) + '\n')
+
+    def abandon(self):
+        """Stop cProfile for a rerun that never reached ``finish``"""
+        if self._cprofile is not None:
+            self._cprofile.disable()
+            self._cprofile = None
+
+    def record(self):
+        """Structured timing record for the log"""
+        return {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'session': self.session,
+            'total_ms': round(self.total * 1000, 3),
+            'sections_ms': {name: round(seconds * 1000, 3) for name, seconds in self.sections.items()},
+            'counts': self.counts,
+            'profile': self.profile_path
+        }
+
+    def rows(self):
+        """(section, ms, share of the rerun) rows, slowest first"""
+        return [
+            (name, seconds * 1000, seconds / self.total * 100 if self.total else 0.0)
+            for name, seconds in sorted(self.sections.items(), key=lambda item: -item[1])
+        ]
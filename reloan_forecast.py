@@ -0,0 +1,268 @@
+"""Forecast reloan disbursement from loan closure and reloan cohorts.
+
+Loans are grouped into monthly cohorts by the month they closed. Closure
+files need ``closed_at`` and ``amount``; reloan disbursal files need
+``disbursed_at``, ``amount`` and ``previous_closed_at`` (when the customer's
+previous loan closed); repayment schedule files of open loans need
+``due_at`` and ``amount``. Amounts are in ₹.
+
+Files are read in chunks and each one is reduced to per-cohort rows that are
+stored in a checkpoint directory, so later runs only read files that are
+new or changed. A schedule is a snapshot of the open book, so the schedule
+files of the latest run replace earlier ones.
+
+The forecast applies the reloan curve (reloan ₹ per ₹ closed, by months
+since closure) to every closed and scheduled cohort in one convolution.
+
+    python reloan_forecast.py --closures closures/*.parquet --reloans reloans/*.csv --schedule open_loans.csv --start 2026-11 --months 3
+"""
+import argparse
+import json
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+from ingest import read_chunks
+from planning import LAKH
+
+FILE_COLUMNS = {
+    'closure': ['closed_at', 'amount'],
+    'reloan': ['disbursed_at', 'amount', 'previous_closed_at'],
+    'scheduled': ['due_at', 'amount']
+}
+COHORT_COLUMNS = ['source', 'kind', 'cohort', 'offset', 'loans', 'amount']
+COHORT_DTYPES = {'source': str, 'kind': str, 'cohort': np.int64, 'offset': np.int64, 'loans': np.int64, 'amount': float}
+
+# Months after closure that a reloan is still counted
+MAX_OFFSET = 12
+
+DEFAULT_CHECKPOINT = os.environ.get(
+    'MARKETING_RELOAN_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'reloan_state')
+)
+
+
+def _empty_cohorts():
+    return pd.DataFrame(columns=COHORT_COLUMNS).astype(COHORT_DTYPES)
+
+
+def _month_index(timestamps):
+    """Months since year 0 for each timestamp; NaT becomes -1"""
+    timestamps = pd.to_datetime(timestamps)
+    months = timestamps.dt.year * 12 + timestamps.dt.month - 1
+    return months.fillna(-1).to_numpy(dtype=np.int64)
+
+
+def _month_start(index):
+    """First day of each month index"""
+    index = np.asarray(index, dtype=np.int64)
+    return pd.to_datetime({'year': index // 12, 'month': index % 12 + 1, 'day': 1})
+
+
+def aggregate_file(path, kind, chunk_size):
+    """Loans and amount per cohort month (and months since closure for reloans) for one file"""
+    partials = []
+    for chunk in read_chunks(path, FILE_COLUMNS[kind], chunk_size):
+        if kind == 'reloan':
+            cohort = _month_index(chunk['previous_closed_at'])
+            offset = _month_index(chunk['disbursed_at']) - cohort
+            # New customers have no previous loan; bad dates give negative offsets
+            keep = (cohort >= 0) & (offset >= 0) & (offset <= MAX_OFFSET)
+        else:
+            cohort = _month_index(chunk[FILE_COLUMNS[kind][0]])
+            offset = np.zeros(len(chunk), dtype=np.int64)
+            keep = cohort >= 0
+        grouped = pd.DataFrame({
+            'cohort': cohort[keep],
+            'offset': offset[keep],
+            'loans': 1,
+            'amount': chunk['amount'].to_numpy(dtype=float)[keep]
+        }).groupby(['cohort', 'offset'], as_index=False).sum()
+        partials.append(grouped)
+
+    if not partials:
+        return _empty_cohorts()
+    result = pd.concat(partials).groupby(['cohort', 'offset'], as_index=False).sum()
+    result.insert(0, 'kind', kind)
+    result.insert(0, 'source', os.path.abspath(path))
+    return result[COHORT_COLUMNS]
+
+
+def _file_identity(path):
+    stat = os.stat(path)
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def checkpoint_version(checkpoint_dir):
+    """Modification time of the checkpoint manifest, or None before the first run"""
+    manifest_path = os.path.join(checkpoint_dir, 'manifest.json')
+    return os.path.getmtime(manifest_path) if os.path.exists(manifest_path) else None
+
+
+def load_checkpoint(checkpoint_dir):
+    """Processed-file manifest and stored per-file cohort rows"""
+    manifest_path = os.path.join(checkpoint_dir, 'manifest.json')
+    cohorts_path = os.path.join(checkpoint_dir, 'cohorts.csv')
+    if not os.path.exists(manifest_path):
+        return {}, _empty_cohorts()
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+    return manifest, pd.read_csv(cohorts_path, dtype=COHORT_DTYPES)
+
+
+def _save_checkpoint(checkpoint_dir, manifest, cohorts):
+    """Write the checkpoint atomically so an interrupted run leaves the last good state"""
+    os.makedirs(checkpoint_dir, exist_ok=True)
+    cohorts_path = os.path.join(checkpoint_dir, 'cohorts.csv')
+    manifest_path = os.path.join(checkpoint_dir, 'manifest.json')
+    cohorts.to_csv(cohorts_path + '.tmp', index=False)
+    with open(manifest_path + '.tmp', 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(cohorts_path + '.tmp', cohorts_path)
+    os.replace(manifest_path + '.tmp', manifest_path)
+
+
+def update_cohorts(closure_files, reloan_files, schedule_files=(), checkpoint_dir=DEFAULT_CHECKPOINT, chunk_size=1000000):
+    """Fold new or changed files into the checkpoint and return all cohort rows.
+
+    Rows are kept per source file, so a file that changed since the last run
+    replaces its earlier contribution instead of double counting.
+    """
+    manifest, cohorts = load_checkpoint(checkpoint_dir)
+    files = manifest.setdefault('files', {})
+
+    if schedule_files:
+        current = {os.path.abspath(path) for path in schedule_files}
+        stale = (cohorts['kind'] == 'scheduled') & ~cohorts['source'].isin(current)
+        if stale.any():
+            for source in cohorts.loc[stale, 'source'].unique():
+                files.pop(source, None)
+            cohorts = cohorts[~stale].reset_index(drop=True)
+            _save_checkpoint(checkpoint_dir, manifest, cohorts)
+
+    for kind, paths in (('closure', closure_files), ('reloan', reloan_files), ('scheduled', schedule_files)):
+        for path in paths:
+            source = os.path.abspath(path)
+            identity = _file_identity(path)
+            if files.get(source) == identity:
+                continue
+            file_cohorts = aggregate_file(path, kind, chunk_size)
+            cohorts = pd.concat(
+                [cohorts[cohorts['source'] != source], file_cohorts],
+                ignore_index=True
+            )
+            files[source] = identity
+            _save_checkpoint(checkpoint_dir, manifest, cohorts)
+    return cohorts
+
+
+def cohort_table(cohorts):
+    """Closed amount and reloan amount by months since closure, one row per closure cohort"""
+    closed = cohorts[cohorts['kind'] == 'closure'].groupby('cohort')[['loans', 'amount']].sum()
+    reloans = (
+        cohorts[cohorts['kind'] == 'reloan']
+        .pivot_table(index='cohort', columns='offset', values='amount', aggfunc='sum', fill_value=0.0)
+        .reindex(columns=range(MAX_OFFSET + 1), fill_value=0.0)
+    )
+    table = closed.join(reloans, how='outer').fillna(0.0)
+    table.index = _month_start(table.index.to_numpy())
+    table.index.name = 'Cohort'
+    return table.rename(columns={'loans': 'Loans Closed', 'amount': 'Amount Closed (₹)'})
+
+
+def last_observed_month(cohorts):
+    """Month index of the latest closure or reloan in the data, or None without any"""
+    observed = cohorts[cohorts['kind'] != 'scheduled']
+    if len(observed) == 0:
+        return None
+    return int((observed['cohort'] + observed['offset']).max())
+
+
+def reloan_curve(cohorts):
+    """Reloan ₹ per ₹ closed by months since closure.
+
+    Each offset only uses cohorts old enough to have been observed that many
+    months after closing, so recent cohorts don't drag the curve down.
+    """
+    table = cohort_table(cohorts)
+    last = last_observed_month(cohorts)
+    offsets = np.arange(MAX_OFFSET + 1)
+    if last is None or len(table) == 0:
+        return pd.DataFrame({'Months Since Closure': offsets, 'Reloan Rate': 0.0, 'Cohorts': 0})
+
+    cohort_months = _month_index(table.index.to_series())
+    observed = cohort_months[:, None] + offsets[None, :] <= last
+    closed = table['Amount Closed (₹)'].to_numpy()
+    reloaned = table[list(offsets)].to_numpy()
+    base = (closed[:, None] * observed).sum(axis=0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rate = np.where(base > 0, (reloaned * observed).sum(axis=0) / base, 0.0)
+    return pd.DataFrame({'Months Since Closure': offsets, 'Reloan Rate': rate, 'Cohorts': observed.sum(axis=0)})
+
+
+def forecast(cohorts, start, months=1):
+    """Reloan disbursement (₹ Lakhs) per month of the planning period.
+
+    Months up to the last observed one report actual reloans. Later months
+    apply the reloan curve to every cohort: actual closures, plus scheduled
+    closures for months not yet observed.
+    """
+    start_month = int(_month_index(pd.Series([pd.Timestamp(start)]))[0])
+    months = max(int(months), 1)
+    end_month = start_month + months
+    last = last_observed_month(cohorts)
+    if last is None:
+        last = start_month - 1
+    rate = reloan_curve(cohorts)['Reloan Rate'].to_numpy()
+
+    kind = cohorts['kind'].to_numpy()
+    cohort = cohorts['cohort'].to_numpy(dtype=np.int64)
+    offset = cohorts['offset'].to_numpy(dtype=np.int64)
+    amount = cohorts['amount'].to_numpy(dtype=float)
+    first = min(int(cohort.min()) if len(cohort) else start_month, start_month)
+    length = end_month - first
+
+    # Monthly closed amounts: actual where observed, scheduled after that
+    closing = np.where(kind == 'closure', True, (kind == 'scheduled') & (cohort > last)) & (cohort < end_month)
+    closed = np.bincount(cohort[closing] - first, weights=amount[closing], minlength=length)
+    expected = np.convolve(closed, rate)[:length]
+    reloaned = kind == 'reloan'
+    disbursed = cohort[reloaned] + offset[reloaned]
+    in_range = disbursed < end_month
+    actual = np.bincount(disbursed[in_range] - first, weights=amount[reloaned][in_range], minlength=length)
+
+    period = np.arange(start_month, end_month)
+    is_actual = period <= last
+    return pd.DataFrame({
+        'Month': _month_start(period),
+        'Closures (₹ Lakhs)': closed[period - first] / LAKH,
+        'Reloan (₹ Lakhs)': np.where(is_actual, actual[period - first], expected[period - first]) / LAKH,
+        'Basis': np.where(is_actual, 'Actual', 'Forecast')
+    })
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Forecast reloan disbursement from closure and reloan cohorts.")
+    parser.add_argument('--closures', nargs='*', default=[], help="Loan closure files (CSV or Parquet)")
+    parser.add_argument('--reloans', nargs='*', default=[], help="Reloan disbursal files (CSV or Parquet)")
+    parser.add_argument('--schedule', nargs='*', default=[], help="Repayment schedule files of open loans")
+    parser.add_argument('--checkpoint', default=DEFAULT_CHECKPOINT, help="Checkpoint directory")
+    parser.add_argument('--chunk-size', type=int, default=1000000, help="Rows per chunk")
+    parser.add_argument('--start', required=True, help="First month of the planning period (YYYY-MM)")
+    parser.add_argument('--months', type=int, default=1, help="Months in the planning period")
+    args = parser.parse_args(argv)
+
+    try:
+        cohorts = update_cohorts(args.closures, args.reloans, args.schedule, args.checkpoint, args.chunk_size)
+        start = pd.Timestamp(args.start)
+    except ValueError as e:
+        sys.exit(f"error: {e}")
+    result = forecast(cohorts, start, args.months)
+    print(result.to_string(index=False))
+    print(f"Total reloan: ₹{result['Reloan (₹ Lakhs)'].sum():.2f} L")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+"""Fit per-channel diminishing-returns curves to lead log history.
+
+Each aggregation window of the ingest checkpoint is one (spend, leads)
+observation per channel. A power curve ``leads = scale * spend ** exponent``
+is fitted by least squares in log space, all channels at once from grouped
+sums. A Hill curve is fitted per channel by a vectorized grid search over
+shape and half-saturation spend, with the ceiling solved in closed form for
+every grid point. Spend is in ₹ Lakhs.
+
+Fitted curves are stored on the channel dicts under ``curve`` and used by
+``planning.compute_plan`` to solve each channel's required spend.
+"""
+import numpy as np
+import pandas as pd
+
+from planning import CURVE_PARAMS, LAKH
+
+CURVE_TYPES = list(CURVE_PARAMS)
+
+# Windows with spend and leads a channel needs before a curve is fitted
+MIN_WINDOWS = 3
+
+# Exponents are kept in (0, 1]: above 1 would mean increasing returns
+MIN_EXPONENT = 0.05
+
+HILL_SHAPES = np.array([0.5, 0.75, 1.0, 1.5, 2.0, 3.0])
+HILL_HALF_SPEND_MULTIPLES = np.geomspace(0.1, 20, 40)
+
+
+def window_history(aggregates, start=None, end=None):
+    """Per-channel, per-window spend (₹ Lakhs) and leads with both positive"""
+    leads = aggregates[aggregates['kind'] == 'lead']
+    if start is not None:
+        leads = leads[leads['window_start'] >= pd.Timestamp(start)]
+    if end is not None:
+        leads = leads[leads['window_start'] <= pd.Timestamp(end)]
+    history = leads.groupby(['channel', 'window_start'], as_index=False)[['events', 'cost']].sum()
+    history = pd.DataFrame({
+        'channel': history['channel'],
+        'spend': history['cost'].astype(float) / LAKH,
+        'leads': history['events'].astype(float)
+    })
+    return history[(history['spend'] > 0) & (history['leads'] > 0)].reset_index(drop=True)
+
+
+def fit_power(history):
+    """Power curve per channel from log-space least squares on grouped sums"""
+    logs = pd.DataFrame({'channel': history['channel'], 'x': np.log(history['spend']), 'y': np.log(history['leads'])})
+    logs['xx'] = logs['x'] ** 2
+    logs['xy'] = logs['x'] * logs['y']
+    sums = logs.groupby('channel').agg(n=('x', 'size'), x=('x', 'sum'), y=('y', 'sum'), xx=('xx', 'sum'), xy=('xy', 'sum'))
+    sums = sums[sums['n'] >= MIN_WINDOWS]
+
+    n = sums['n'].to_numpy(dtype=float)
+    variance = n * sums['xx'].to_numpy() - sums['x'].to_numpy() ** 2
+    with np.errstate(divide='ignore', invalid='ignore'):
+        slope = (n * sums['xy'].to_numpy() - sums['x'].to_numpy() * sums['y'].to_numpy()) / variance
+    # One spend level can't show diminishing returns; treat it as constant CPL
+    exponent = np.clip(np.where(variance > 1e-12, slope, 1.0), MIN_EXPONENT, 1.0)
+    scale = np.exp((sums['y'].to_numpy() - exponent * sums['x'].to_numpy()) / n)
+    return pd.DataFrame({
+        'Channel': sums.index,
+        'scale': scale,
+        'exponent': exponent,
+        'Windows': sums['n'].to_numpy()
+    })
+
+
+def fit_hill(history):
+    """Hill curve per channel by grid search over shape and half-saturation spend"""
+    rows = []
+    for channel, group in history.groupby('channel'):
+        if len(group) < MIN_WINDOWS:
+            continue
+        spend = group['spend'].to_numpy()
+        leads = group['leads'].to_numpy()
+        half_spends = np.median(spend) * HILL_HALF_SPEND_MULTIPLES
+
+        # (shape, half spend, window) saturation fractions for the whole grid
+        powered = spend[None, None, :] ** HILL_SHAPES[:, None, None]
+        fraction = powered / (powered + half_spends[None, :, None] ** HILL_SHAPES[:, None, None])
+        # Best ceiling for each grid point is linear least squares
+        fit = fraction @ leads
+        max_leads = fit / (fraction ** 2).sum(axis=-1)
+        error = (leads ** 2).sum() - max_leads * fit
+        shape_index, half_index = np.unravel_index(np.argmin(error), error.shape)
+        rows.append({
+            'Channel': channel,
+            'max_leads': max_leads[shape_index, half_index],
+            'half_spend': half_spends[half_index],
+            'shape': HILL_SHAPES[shape_index],
+            'Windows': len(group)
+        })
+    return pd.DataFrame(rows, columns=['Channel', 'max_leads', 'half_spend', 'shape', 'Windows'])
+
+
+def fit_curves(aggregates, kind='power', start=None, end=None):
+    """Fitted curve parameters per channel as a frame with the curve type's parameter columns"""
+    if kind not in CURVE_TYPES:
+        raise ValueError(f"Unknown curve type: {kind}")
+    history = window_history(aggregates, start, end)
+    return fit_power(history) if kind == 'power' else fit_hill(history)
+
+
+def apply_to_channels(channels, fitted, kind):
+    """Channel dicts with ``curve`` set where a curve was fitted for that channel name"""
+    curves = {
+        row['Channel']: {'type': kind, **{name: float(row[name]) for name in CURVE_PARAMS[kind]}}
+        for row in fitted.to_dict('records')
+    }
+    return [dict(ch, curve=curves[ch['name']]) if ch['name'] in curves else ch for ch in channels]
+
+
+def clear_curves(channels):
+    """Channel dicts back on constant CPL"""
+    return [{k: v for k, v in ch.items() if k != 'curve'} if 'curve' in ch else ch for ch in channels]
@@ -0,0 +1,212 @@
+"""Versioned, content-addressed plan snapshots.
+
+A snapshot is a plan's inputs and per-channel results. Its id is the same
+hash the caches use (``planning.plan_cache_key``), so saving an unchanged
+plan again adds a version but stores nothing new. Channel rows are stored
+once per distinct content and shared by every snapshot that contains them;
+a snapshot keeps only its inputs and the packed 64-bit hashes of its rows in
+channel order. Named plans get numbered versions pointing at snapshots.
+
+Snapshots live in the channel store's SQLite file.
+"""
+import json
+import time
+from contextlib import closing
+
+import numpy as np
+import pandas as pd
+
+import channel_store
+import planning
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshot_rows (
+    row_hash INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    cpl REAL NOT NULL,
+    conv REAL NOT NULL,
+    budget REAL NOT NULL,
+    leads_to_disburse INTEGER NOT NULL,
+    leads_required INTEGER NOT NULL,
+    spend REAL NOT NULL,
+    amount REAL NOT NULL,
+    roi REAL,
+    cost_per_lead REAL
+);
+CREATE TABLE IF NOT EXISTS snapshots (
+    snapshot_id TEXT PRIMARY KEY,
+    target REAL NOT NULL,
+    reloan REAL NOT NULL,
+    avg_ticket_size REAL NOT NULL,
+    created_at REAL NOT NULL,
+    row_hashes BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS plan_versions (
+    plan_name TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    snapshot_id TEXT NOT NULL REFERENCES snapshots(snapshot_id),
+    saved_at REAL NOT NULL,
+    PRIMARY KEY (plan_name, version)
+);
+"""
+
+# Stored row column -> results frame column
+ROW_COLUMNS = {
+    'name': 'Channel',
+    'cpl': 'CPL (₹)',
+    'conv': 'Conversion %',
+    'budget': 'Budget %',
+    'leads_to_disburse': 'Leads to Disburse',
+    'leads_required': 'Leads Required',
+    'spend': 'Marketing Spend (₹ Lakhs)',
+    'amount': 'Amount to Disburse (₹ Lakhs)',
+    'roi': 'ROI',
+    'cost_per_lead': 'Cost per Disbursed Lead'
+}
+
+# Columns compared by the diff view
+DIFF_COLUMNS = ['CPL (₹)', 'Conversion %', 'Budget %', 'Leads Required', 'Marketing Spend (₹ Lakhs)']
+
+
+def connect(path=channel_store.DEFAULT_PATH):
+    conn = channel_store.connect(path)
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def _row_frame(channels, results_df):
+    """Stored row columns for one plan"""
+    rows = pd.DataFrame({
+        'name': results_df['Channel'].astype(str).to_numpy(),
+        'cpl': results_df['CPL (₹)'].to_numpy(dtype=float),
+        'conv': results_df['Conversion %'].to_numpy(dtype=float),
+        'budget': np.fromiter((ch['budget'] for ch in channels), dtype=float, count=len(channels)),
+        'leads_to_disburse': results_df['Leads to Disburse'].to_numpy(dtype=np.int64),
+        'leads_required': results_df['Leads Required'].to_numpy(dtype=np.int64),
+        'spend': results_df['Marketing Spend (₹ Lakhs)'].to_numpy(dtype=float),
+        'amount': results_df['Amount to Disburse (₹ Lakhs)'].to_numpy(dtype=float),
+        'roi': results_df['ROI'].to_numpy(dtype=float),
+        'cost_per_lead': results_df['Cost per Disbursed Lead'].to_numpy(dtype=float)
+    })
+    # 64-bit content hash per row; viewed as signed to fit an SQLite INTEGER
+    rows.insert(0, 'row_hash', pd.util.hash_pandas_object(rows, index=False).to_numpy().view(np.int64))
+    return rows
+
+
+def save_snapshot(plan_name, channels, target, reloan, avg_ticket_size, path=channel_store.DEFAULT_PATH):
+    """Record the plan as the next version of ``plan_name``; returns (version, snapshot_id)"""
+    snapshot_id = planning.plan_cache_key(channels, target, reloan, avg_ticket_size)
+    with closing(connect(path)) as conn, conn:
+        if conn.execute("SELECT 1 FROM snapshots WHERE snapshot_id = ?", (snapshot_id,)).fetchone() is None:
+            rows = _row_frame(channels, planning.plan_results(channels, target, reloan, avg_ticket_size))
+            # NaN ROI / cost per lead (no spend and no disbursement) is stored as NULL
+            values = rows.astype(object).where(rows.notna(), None)
+            conn.executemany(
+                f"INSERT OR IGNORE INTO snapshot_rows VALUES ({', '.join('?' * len(rows.columns))})",
+                values.itertuples(index=False, name=None)
+            )
+            conn.execute(
+                "INSERT INTO snapshots VALUES (?, ?, ?, ?, ?, ?)",
+                (snapshot_id, float(target), float(reloan), float(avg_ticket_size), time.time(),
+                 rows['row_hash'].to_numpy(dtype=np.int64).tobytes())
+            )
+        version = conn.execute(
+            "SELECT COALESCE(MAX(version), 0) + 1 FROM plan_versions WHERE plan_name = ?", (plan_name,)
+        ).fetchone()[0]
+        conn.execute("INSERT INTO plan_versions VALUES (?, ?, ?, ?)", (plan_name, version, snapshot_id, time.time()))
+    return version, snapshot_id
+
+
+def list_plans(path=channel_store.DEFAULT_PATH):
+    """Plan names with saved versions"""
+    with closing(connect(path)) as conn:
+        return [row[0] for row in conn.execute("SELECT DISTINCT plan_name FROM plan_versions ORDER BY plan_name")]
+
+
+def list_versions(plan_name, path=channel_store.DEFAULT_PATH):
+    """Version, save time, snapshot and inputs of every saved version, newest first"""
+    with closing(connect(path)) as conn:
+        return pd.read_sql_query(
+            "SELECT v.version, v.saved_at, v.snapshot_id, s.target, s.reloan, s.avg_ticket_size "
+            "FROM plan_versions v JOIN snapshots s USING (snapshot_id) "
+            "WHERE v.plan_name = ? ORDER BY v.version DESC",
+            conn,
+            params=(plan_name,)
+        )
+
+
+def load_snapshot(snapshot_id, path=channel_store.DEFAULT_PATH):
+    """Per-channel rows of a snapshot in channel order, or None if it doesn't exist"""
+    with closing(connect(path)) as conn:
+        row = conn.execute("SELECT row_hashes FROM snapshots WHERE snapshot_id = ?", (snapshot_id,)).fetchone()
+        if row is None:
+            return None
+        row_hashes = np.frombuffer(row[0], dtype=np.int64)
+        rows = pd.read_sql_query(
+            f"SELECT row_hash, {', '.join(ROW_COLUMNS)} FROM snapshot_rows "
+            "WHERE row_hash IN (SELECT value FROM json_each(?))",
+            conn,
+            params=(json.dumps(np.unique(row_hashes).tolist()),)
+        )
+    # Back to channel order, repeating rows that occur more than once
+    return rows.set_index('row_hash').loc[row_hashes].reset_index(drop=True).rename(columns=ROW_COLUMNS)
+
+
+def load_version(plan_name, version, path=channel_store.DEFAULT_PATH):
+    """Rows of one saved version, or None if it doesn't exist"""
+    with closing(connect(path)) as conn:
+        row = conn.execute(
+            "SELECT snapshot_id FROM plan_versions WHERE plan_name = ? AND version = ?", (plan_name, version)
+        ).fetchone()
+    return None if row is None else load_snapshot(row[0], path)
+
+
+def diff_frames(old, new):
+    """Channels whose inputs or results differ between two snapshot frames.
+
+    Rows are joined on channel name plus its occurrence number, so repeated
+    names still pair up. Rows follow the newer plan's channel order. Status
+    is 'added', 'removed' or 'changed'; each compared column gets old, new
+    and change columns.
+    """
+    def keyed(df):
+        return df[['Channel'] + DIFF_COLUMNS].assign(
+            occurrence=df.groupby('Channel').cumcount(),
+            position=np.arange(len(df))
+        )
+
+    merged = keyed(old).merge(
+        keyed(new),
+        on=['Channel', 'occurrence'],
+        how='outer',
+        suffixes=(' (old)', ' (new)'),
+        indicator=True
+    )
+    # Newer channel order first, then channels that were removed
+    merged = merged.sort_values(['position (new)', 'position (old)'], kind='stable').reset_index(drop=True)
+    changed = np.zeros(len(merged), dtype=bool)
+    result = {'Channel': merged['Channel']}
+    for column in DIFF_COLUMNS:
+        before, after = merged[f'{column} (old)'], merged[f'{column} (new)']
+        result[f'{column} (old)'] = before
+        result[f'{column} (new)'] = after
+        result[f'{column} Δ'] = after - before
+        changed |= ~np.isclose(before.to_numpy(dtype=float), after.to_numpy(dtype=float), equal_nan=True)
+
+    status = np.select(
+        [merged['_merge'] == 'left_only', merged['_merge'] == 'right_only', changed],
+        ['removed', 'added', 'changed'],
+        default='unchanged'
+    )
+    diff = pd.DataFrame(result)
+    diff.insert(1, 'Status', status)
+    return diff[diff['Status'] != 'unchanged'].reset_index(drop=True)
+
+
+def diff_versions(plan_name, old_version, new_version, path=channel_store.DEFAULT_PATH):
+    """Channel-level diff between two saved versions of a plan"""
+    old = load_version(plan_name, old_version, path)
+    new = load_version(plan_name, new_version, path)
+    if old is None or new is None:
+        raise ValueError(f"Unknown version of '{plan_name}'")
+    return diff_frames(old, new)
@@ -0,0 +1,158 @@
+"""Lightweight renderer for the Channel Performance Summary table.
+
+The typed frame keeps numeric dtypes, and the TOTAL row lives in a separate
+footer instead of mixing '-' strings into numeric columns. Display strings
+and row styles are computed a column at a time and emitted as plain HTML,
+one page of rows at a time.
+"""
+from functools import reduce
+
+import numpy as np
+import pandas as pd
+
+from formatting import format_indian_array
+
+SUMMARY_COLUMNS = [
+    'S.No',
+    'Channel',
+    'CPL (₹)',
+    'Conversion %',
+    'Leads Required',
+    'Leads to Disburse',
+    'Marketing Spend (₹ Lakhs)',
+    'Amount to Disburse (₹ Lakhs)',
+    'ROI',
+    'Cost per Disbursed Lead'
+]
+
+# Columns summed into the TOTAL footer; every other column shows '-'
+TOTAL_COLUMNS = [
+    'Leads Required',
+    'Leads to Disburse',
+    'Marketing Spend (₹ Lakhs)',
+    'Amount to Disburse (₹ Lakhs)'
+]
+
+PAGE_SIZE = 100
+
+TABLE_CSS = """
+<style>
+    .summary-table-wrap {
+        max-height: 640px;
+        overflow: auto;
+        border: 1px solid #dee2e6;
+        border-radius: 8px;
+    }
+    .summary-table {
+        width: 100%;
+        border-collapse: collapse;
+    }
+    .summary-table th, .summary-table td {
+        text-align: center;
+        vertical-align: middle;
+        padding: 12px;
+        border: 1px solid #dee2e6;
+    }
+    .summary-table thead th {
+        position: sticky;
+        top: 0;
+        background-color: #1565c0;
+        color: white;
+        font-weight: bold;
+        border: 1px solid #1565c0;
+    }
+    .summary-table tr.row-even td {
+        background-color: #f8f9fa;
+    }
+    .summary-table tr.row-odd td {
+        background-color: white;
+    }
+    .summary-table tfoot td {
+        position: sticky;
+        bottom: 0;
+        font-weight: bold;
+        background-color: #e3f2fd;
+        color: #1565c0;
+    }
+</style>
+"""
+
+
+def summary_frame(results_df):
+    """Typed Channel Performance Summary frame, one row per channel"""
+    detailed_df = results_df.copy()
+
+    # ROI and Cost per Disbursed Lead come from the planning engine
+    detailed_df['ROI'] = detailed_df['ROI'].round(2)
+    detailed_df['Cost per Disbursed Lead'] = detailed_df['Cost per Disbursed Lead'].round(0)  # Round to whole number
+
+    # Add serial number column starting from 1
+    detailed_df.insert(0, 'S.No', np.arange(1, len(detailed_df) + 1))
+
+    return detailed_df[SUMMARY_COLUMNS]
+
+
+def summary_totals(detailed_df):
+    """Totals for the summed columns"""
+    return {column: detailed_df[column].sum() for column in TOTAL_COLUMNS}
+
+
+def _escape(values):
+    """HTML-escape a column of strings"""
+    values = pd.Series(values, dtype=object).astype(str)
+    for char, entity in (('&', '&amp;'), ('<', '&lt;'), ('>', '&gt;'), ('"', '&quot;')):
+        values = values.str.replace(char, entity, regex=False)
+    return values.to_numpy(dtype=str)
+
+
+def _with_dash(values, text):
+    """Show '-' wherever the numeric value is missing"""
+    return np.where(pd.isna(values), '-', text)
+
+
+def display_strings(detailed_df, escape=True):
+    """Display strings for every cell, computed a column at a time"""
+    roi = detailed_df['ROI'].to_numpy(dtype=float)
+    cost = detailed_df['Cost per Disbursed Lead'].to_numpy(dtype=float)
+    return pd.DataFrame({
+        'S.No': detailed_df['S.No'].astype(str).to_numpy(),
+        'Channel': _escape(detailed_df['Channel']) if escape else detailed_df['Channel'].astype(str).to_numpy(),
+        'CPL (₹)': np.char.add('₹', detailed_df['CPL (₹)'].astype(str).to_numpy(dtype=str)),
+        'Conversion %': np.char.add(detailed_df['Conversion %'].astype(str).to_numpy(dtype=str), '%'),
+        'Leads Required': format_indian_array(detailed_df['Leads Required'].to_numpy()),
+        'Leads to Disburse': format_indian_array(detailed_df['Leads to Disburse'].to_numpy()),
+        'Marketing Spend (₹ Lakhs)': np.char.mod('₹%.2f L', detailed_df['Marketing Spend (₹ Lakhs)'].to_numpy(dtype=float)),
+        'Amount to Disburse (₹ Lakhs)': np.char.mod('₹%.1f L', detailed_df['Amount to Disburse (₹ Lakhs)'].to_numpy(dtype=float)),
+        'ROI': _with_dash(roi, np.char.add(roi.astype(str), 'x')),
+        'Cost per Disbursed Lead': _with_dash(cost, np.char.add('₹', np.nan_to_num(cost).astype(np.int64).astype(str)))
+    }, columns=SUMMARY_COLUMNS)
+
+
+def footer_strings(totals):
+    """Display strings for the pinned TOTAL footer"""
+    footer = dict.fromkeys(SUMMARY_COLUMNS, '-')
+    footer['Channel'] = 'TOTAL'
+    footer['Leads Required'] = format_indian_array([totals['Leads Required']])[0]
+    footer['Leads to Disburse'] = format_indian_array([totals['Leads to Disburse']])[0]
+    footer['Marketing Spend (₹ Lakhs)'] = f"₹{totals['Marketing Spend (₹ Lakhs)']:.2f} L"
+    footer['Amount to Disburse (₹ Lakhs)'] = f"₹{totals['Amount to Disburse (₹ Lakhs)']:.1f} L"
+    return footer
+
+
+def summary_html(display_df, footer, start=0, stop=None):
+    """HTML for rows ``start:stop`` of the table with the header and TOTAL footer pinned"""
+    page = display_df.iloc[start:stop]
+    cells = [np.char.add(np.char.add('<td>', page[column].to_numpy(dtype=str)), '</td>') for column in SUMMARY_COLUMNS]
+    row_class = np.where(np.arange(start, start + len(page)) % 2 == 0, '<tr class="row-even">', '<tr class="row-odd">')
+    rows = np.char.add(reduce(np.char.add, cells, row_class), '</tr>') if len(page) else []
+
+    header = ''.join(f'<th>{column}</th>' for column in SUMMARY_COLUMNS)
+    footer_row = ''.join(f'<td>{footer[column]}</td>' for column in SUMMARY_COLUMNS)
+    return (
+        TABLE_CSS
+        + '<div class="summary-table-wrap"><table class="summary-table">'
+        + f'<thead><tr>{header}</tr></thead>'
+        + f'<tbody>{"".join(rows)}</tbody>'
+        + f'<tfoot><tr>{footer_row}</tr></tfoot>'
+        + '</table></div>'
+    )